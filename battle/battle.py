@@ -2,8 +2,9 @@ from collections import Counter
 
 from engine.engine import Engine, create_engine
 from engine.engine_choice import EngineChoice
+from engine.parallel_mode import ParallelMode
 from game.board import Board
-from game.game import Game, GameState, generate_moves
+from game.game import Game, GameState
 from game.game_choice import GameChoice
 from game.piece import Piece
 from game.player import Player
@@ -18,6 +19,12 @@ def do_battle(
     p2_engine: EngineChoice = EngineChoice.WINIBETAMAXER,
     p2_plies: int | None = None,
     quiet: bool = False,
+    use_game_tree: bool = False,
+    hash_mb: float | None = None,
+    time_limit_ms: int | None = None,
+    max_nodes: int | None = None,
+    workers: int | None = None,
+    parallel_mode: ParallelMode = ParallelMode.ROOT_SPLIT,
 ):
     """Have two engines play each other
 
@@ -25,6 +32,13 @@ def do_battle(
     :param p1_plies: how deep player 1 searches
     :param p2_plies: how deep player 2 searches
     :param quiet: just show stats at the end
+    :param use_game_tree: have engines build a GameTree rather than searching
+    the game directly, slower but useful for debugging
+    :param hash_mb: size of each engine's transposition table, 0 disables it
+    :param time_limit_ms: how long each engine may think per move
+    :param max_nodes: how many positions each engine may visit per move
+    :param workers: how many processes each engine searches with
+    :param parallel_mode: how the engines split their search across workers
     """
 
     params = game_choice.parameters()
@@ -36,12 +50,34 @@ def do_battle(
 
     # Player 1 engine
     p1_eng_cls = p1_engine.engine()
-    p1_eng = create_engine(p1_eng_cls, g, Player.P1, max_plies=p1_plies)
+    p1_eng = create_engine(
+        p1_eng_cls,
+        g,
+        Player.P1,
+        max_plies=p1_plies,
+        use_game_tree=use_game_tree,
+        hash_mb=hash_mb,
+        time_limit_ms=time_limit_ms,
+        max_nodes=max_nodes,
+        workers=workers,
+        parallel_mode=parallel_mode,
+    )
     eng_map[Player.P1] = p1_eng
 
     # Player 2 engine
     p2_eng_cls = p2_engine.engine()
-    p2_eng = create_engine(p2_eng_cls, g, Player.P2, max_plies=p2_plies)
+    p2_eng = create_engine(
+        p2_eng_cls,
+        g,
+        Player.P2,
+        max_plies=p2_plies,
+        use_game_tree=use_game_tree,
+        hash_mb=hash_mb,
+        time_limit_ms=time_limit_ms,
+        max_nodes=max_nodes,
+        workers=workers,
+        parallel_mode=parallel_mode,
+    )
     eng_map[Player.P2] = p2_eng
 
     result_stats: Counter = Counter()
@@ -51,11 +87,6 @@ def do_battle(
         g.reset()
         g.choose_player1_piece(Piece.X)
 
-        # Generate the game tree once a piece has been selected
-        gFn = generate_moves
-        p1_eng.generate_game_tree(gFn)
-        p2_eng.generate_game_tree(gFn)
-
         # Play until each game is done
         while g.state != GameState.FINISHED:
             eng = eng_map[g.cur_player]
@@ -73,6 +104,9 @@ def do_battle(
             print(f"Game {game_num}/{num_games} result: {g.result}")
         result_stats[g.result] += 1
 
+    p1_eng.close()
+    p2_eng.close()
+
     print("=== Stats ===")
     print_result_stat(result_stats, Result.PLAYER1_VICTORY, num_games)
     print_result_stat(result_stats, Result.PLAYER2_VICTORY, num_games)
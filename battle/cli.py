@@ -1,5 +1,6 @@
 from battle.battle import do_battle
 from engine.engine_choice import EngineChoice
+from engine.parallel_mode import ParallelMode
 from game.game_choice import GameChoice
 
 
@@ -48,6 +49,19 @@ def _add_engine_options(parser) -> None:
     )
 
 
+def _add_budget_options(parser) -> None:
+    parser.add_argument(
+        "--time-limit-ms",
+        type=int,
+        help="how long each engine may think per move, searches as deep as it can",
+    )
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        help="how many positions each engine may visit per move",
+    )
+
+
 def _battle(args) -> None:
     game_choice = _parse_game_choice(args.game)
     p1_engine = EngineChoice.from_str(args.p1_engine)
@@ -61,6 +75,12 @@ def _battle(args) -> None:
         p2_engine=p2_engine,
         p2_plies=args.p2_plies,
         quiet=args.quiet,
+        use_game_tree=args.game_tree,
+        hash_mb=args.hash_mb,
+        time_limit_ms=args.time_limit_ms,
+        max_nodes=args.max_nodes,
+        workers=args.workers,
+        parallel_mode=ParallelMode.from_str(args.parallel),
     )
 
 
@@ -83,3 +103,31 @@ def add_subparser(subparsers) -> None:
     )
 
     _add_engine_options(p)
+
+    p.add_argument(
+        "--game-tree",
+        action="store_true",
+        help="build a full game tree before searching (slow, for debugging)",
+    )
+
+    p.add_argument(
+        "--hash-mb",
+        type=float,
+        help="size of each engine's transposition table in MB, 0 disables it",
+    )
+
+    _add_budget_options(p)
+
+    p.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        help="how many processes each engine searches with, default is 1",
+    )
+
+    p.add_argument(
+        "--parallel",
+        default=ParallelMode.ROOT_SPLIT.pretty(),
+        choices=[x.pretty() for x in ParallelMode],
+        help="how engines split their search across workers",
+    )
@@ -1,19 +1,45 @@
 import logging
 
-from engine.game_tree import EvalFn, Node
-
+from engine.game_tree import Node
+from engine.move_ordering import order_moves
+from engine.search_context import SearchContext
+from engine.search_stats import SearchStats
+from engine.transposition_table import Bound, score_bound
+from engine.typedefs import EvalFn
+from game.game import Game, GameState
+from game.move import Move, NULL_MOVE
 
 logger = logging.getLogger(__name__)
+DEBUG = logger.debug
 
 
 def _alphabeta(
-    node: Node, depth: int, alpha: float, beta: float, maximizer: bool, fn: EvalFn
+    node: Node,
+    depth: int,
+    alpha: float,
+    beta: float,
+    maximizer: bool,
+    fn: EvalFn,
+    stats: SearchStats,
 ) -> float:
-    """Apply the minimax algorithm to the game tree with alpha beta pruning."""
+    """Apply the minimax algorithm to the game tree with alpha beta pruning.
+
+    `alpha` is the score the maximizer is already assured of and `beta` is the
+    score the minimizer is already assured of. Once a node's score falls
+    outside of that window, the player choosing at the parent would never let
+    play reach this node, so its remaining children can be skipped.
+
+    This is the 'fail-soft' variant: when we cut off, we return the best score
+    seen rather than clamping it to the window. The score is then a bound on
+    the node's true value rather than the value itself, so pruned children
+    don't get a score.
+    """
+    stats.nodes += 1
+
     # Leaf (or hit depth stop)
     if depth == 0 or len(node.children) == 0:
         assert node.move is not None
-        score = fn(node, depth, maximizer)
+        score = fn(node.game, depth, maximizer)
         node.set_score(score)
         return score
 
@@ -21,9 +47,14 @@ def _alphabeta(
     if maximizer:
         value = float("-inf")
         for child in node.children:
-            value = max(value, _alphabeta(child, depth - 1, alpha, beta, False, fn))
-            if value > beta:
-                break  # beta pruning
+            score = _alphabeta(child, depth - 1, alpha, beta, False, fn, stats)
+            value = max(value, score)
+
+            if value >= beta:
+                stats.cutoffs += 1
+                break  # beta cutoff
+
+            alpha = max(alpha, value)
 
         node.set_score(value)
         return value
@@ -31,17 +62,180 @@ def _alphabeta(
     # Minimizer
     value = float("inf")
     for child in node.children:
-        value = min(value, _alphabeta(child, depth - 1, alpha, beta, True, fn))
+        score = _alphabeta(child, depth - 1, alpha, beta, True, fn, stats)
+        value = min(value, score)
+
+        if value <= alpha:
+            stats.cutoffs += 1
+            break  # alpha cutoff
 
-        if value < alpha:
-            break  # alpha pruning
+        beta = min(beta, value)
 
     node.set_score(value)
     return value
 
 
-def alphabeta(node: Node, depth: int, maximizer: bool, fn: EvalFn) -> float:
-    """Kickoff function for minimax with alpha beta pruning"""
+def alphabeta(
+    node: Node,
+    depth: int,
+    maximizer: bool,
+    fn: EvalFn,
+    stats: SearchStats | None = None,
+) -> float:
+    """Kickoff function for minimax with alpha beta pruning
+
+    :param stats: if provided, counts of nodes visited and cutoffs are added
+    to it
+    """
+    if stats is None:
+        stats = SearchStats()
+
+    alpha = float("-inf")
+    beta = float("inf")
+    score = _alphabeta(node, depth, alpha, beta, maximizer, fn, stats)
+
+    DEBUG(f"alphabeta: {depth=} nodes={stats.nodes} cutoffs={stats.cutoffs}")
+
+    return score
+
+
+def _search_alphabeta(
+    g: Game,
+    depth: int,
+    alpha: float,
+    beta: float,
+    maximizer: bool,
+    ctx: SearchContext,
+) -> float:
+    """Like `_alphabeta` but generates the children of each position as it
+    goes by making and unmaking moves on the game.
+
+    Pruned subtrees are never generated at all and the only memory used is
+    the recursion itself.
+
+    If the context has a transposition table, positions already searched at
+    least as deep are answered from the table and the best move found
+    previously is tried first. If it has a MoveOrdering, the remaining moves
+    are ordered by it and cutoffs are recorded in it.
+    """
+    ctx.stats.nodes += 1
+
+    if ctx.budget is not None:
+        ctx.budget.check(ctx.stats)
+
+    # Leaf (or hit depth stop)
+    if depth == 0 or g.state == GameState.FINISHED:
+        return ctx.eval_fn(g, depth, maximizer)
+
+    tt = ctx.tt
+    key = 0
+    tt_move = None
+    if tt is not None:
+        key = g.position_key
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_move = entry.move
+            if entry.depth >= depth and entry.settles(alpha, beta):
+                ctx.stats.tt_hits += 1
+                return entry.score
+
+    alpha_orig = alpha
+    beta_orig = beta
+    best_move = None
+
+    # Maximizer
+    if maximizer:
+        value = float("-inf")
+        for m in order_moves(g, ctx, tt_move):
+            g.apply_move(m)
+            score = _search_alphabeta(g, depth - 1, alpha, beta, False, ctx)
+            g.undo_move()
+
+            if score > value:
+                value = score
+                best_move = m
+
+            if value >= beta:
+                ctx.stats.cutoffs += 1
+                if ctx.ordering is not None:
+                    ctx.ordering.record_cutoff(g, m, depth)
+                break  # beta cutoff
+
+            alpha = max(alpha, value)
+
+    # Minimizer
+    else:
+        value = float("inf")
+        for m in order_moves(g, ctx, tt_move):
+            g.apply_move(m)
+            score = _search_alphabeta(g, depth - 1, alpha, beta, True, ctx)
+            g.undo_move()
+
+            if score < value:
+                value = score
+                best_move = m
+
+            if value <= alpha:
+                ctx.stats.cutoffs += 1
+                if ctx.ordering is not None:
+                    ctx.ordering.record_cutoff(g, m, depth)
+                break  # alpha cutoff
+
+            beta = min(beta, value)
+
+    if tt is not None:
+        bound = score_bound(value, alpha_orig, beta_orig)
+        tt.store(key, depth, value, bound, best_move)
+
+    return value
+
+
+def search_alphabeta(
+    g: Game, depth: int, maximizer: bool, ctx: SearchContext
+) -> tuple[float, Move]:
+    """Kickoff function for alpha beta directly on a game, conforms to
+    SearchFn
+    """
+    ctx.stats.nodes += 1
+
     alpha = float("-inf")
     beta = float("inf")
-    return _alphabeta(node, depth, alpha, beta, maximizer, fn)
+
+    best_score = alpha if maximizer else beta
+    best_move = NULL_MOVE
+
+    tt = ctx.tt
+    first = ctx.first_move
+    if first is None and tt is not None:
+        entry = tt.probe(g.position_key)
+        if entry is not None:
+            first = entry.move
+
+    for m in order_moves(g, ctx, first):
+        g.apply_move(m)
+        score = _search_alphabeta(g, depth - 1, alpha, beta, not maximizer, ctx)
+        g.undo_move()
+
+        # Strict comparison so that ties go to the earliest move, later moves
+        # which tie may only have been scored with a bound
+        better = score > best_score if maximizer else score < best_score
+        if better or best_move is NULL_MOVE:
+            best_score = score
+            best_move = m
+
+        if maximizer:
+            alpha = max(alpha, best_score)
+        else:
+            beta = min(beta, best_score)
+
+    # The root is searched with a full window so its score is exact
+    if tt is not None:
+        tt.store(g.position_key, depth, best_score, Bound.EXACT, best_move)
+
+    stats = ctx.stats
+    DEBUG(
+        f"alphabeta: {depth=} nodes={stats.nodes} cutoffs={stats.cutoffs}"
+        f" tt_hits={stats.tt_hits}"
+    )
+
+    return best_score, best_move
@@ -0,0 +1,140 @@
+"""
+Random playouts run in batches with NumPy.
+
+Playing a random game one `Game.apply_move` at a time spends nearly all of
+its time in the interpreter. Here N copies of the position are kept as rows
+of one array and every game makes its move at once: a random legal move is
+drawn for each row with a single call, and wins are checked for every row
+against the board's windows through the cells just played.
+
+The games all start from the same position and move in lock-step, so at
+any step it's the same player's turn in every game still going.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from game.game import Game, GameState
+from game.line_table import LineTable
+from game.placement_rule import PlacementRule
+from game.player import Player
+from game.result import Result
+
+# Cells hold 0 when empty, otherwise the player's number
+EMPTY = 0
+PLAYER_VALUES = {Player.P1: 1, Player.P2: 2}
+
+_geometry: dict[tuple, tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _window_geometry(tbl: LineTable) -> tuple[np.ndarray, np.ndarray]:
+    """Return the windows as a (windows + 1, k) array of cell indexes, and
+    the windows through each cell as a (cells, max windows) array of window
+    ids
+
+    Cells are in fewer windows near the edges, so their rows are padded with
+    an extra window made up of a sentinel cell past the end of the board.
+    Boards get a column for the sentinel which is always empty, so the padding
+    window can never be won.
+    """
+    key = (tbl.size, tbl.win_count)
+    geometry = _geometry.get(key)
+    if geometry is not None:
+        return geometry
+
+    num_cells = len(tbl.cells)
+    pad = len(tbl.windows)
+
+    windows = np.array(tbl.windows + [(num_cells,) * tbl.win_count], dtype=np.intp)
+
+    max_windows = max(len(x) for x in tbl.cell_windows)
+    cell_windows = np.full((num_cells, max_windows), pad, dtype=np.intp)
+    for idx, ws in enumerate(tbl.cell_windows):
+        cell_windows[idx, : len(ws)] = ws
+
+    geometry = (windows, cell_windows)
+    _geometry[key] = geometry
+    return geometry
+
+
+def batch_playouts(
+    g: Game, n: int, rng: np.random.Generator | None = None
+) -> Counter[Result]:
+    """Play `n` random games to the end from the game's current position and
+    return how many ended in each result
+
+    The game itself isn't changed.
+    """
+    results: Counter[Result] = Counter()
+    if g.state == GameState.FINISHED:
+        results[g.result] = n
+        return results
+
+    if rng is None:
+        rng = np.random.default_rng()
+
+    b = g.board
+    tbl = b.line_table
+    rows, cols = b.size
+    num_cells = rows * cols
+    windows, cell_windows = _window_geometry(tbl)
+
+    start = np.zeros(num_cells + 1, dtype=np.int8)
+    for player, value in PLAYER_VALUES.items():
+        piece = g.piece_for_player(player)
+        for idx, cell in enumerate(tbl.cells):
+            if b.cell_value(cell) == piece:
+                start[idx] = value
+
+    boards = np.tile(start, (n, 1))
+    column_stack = b.placement_rule == PlacementRule.COLUMN_STACK
+    if column_stack:
+        heights = np.tile(
+            (start[:num_cells].reshape(rows, cols) != EMPTY).sum(axis=0), (n, 1)
+        )
+
+    # Rows of `boards` for the games still going
+    active = np.arange(n)
+    player = g.cur_player
+
+    for _ in range(b.num_empty_cells()):
+        value = PLAYER_VALUES[player]
+        num_active = len(active)
+
+        # A random legal move for each game: score every candidate randomly,
+        # knock out the illegal ones and take the best
+        if column_stack:
+            keys = rng.random((num_active, cols))
+            keys[heights[active] >= rows] = -1.0
+            col = keys.argmax(axis=1)
+            row = rows - 1 - heights[active, col]
+            heights[active, col] += 1
+            played = row * cols + col
+        else:
+            keys = rng.random((num_active, num_cells))
+            keys[boards[active, :num_cells] != EMPTY] = -1.0
+            played = keys.argmax(axis=1)
+
+        boards[active, played] = value
+
+        # Any win must run through the cell just played
+        cells = windows[cell_windows[played]]
+        won = (boards[active[:, None, None], cells] == value).all(axis=2).any(axis=1)
+
+        num_won = int(won.sum())
+        if num_won:
+            if player == Player.P1:
+                results[Result.PLAYER1_VICTORY] += num_won
+            else:
+                results[Result.PLAYER2_VICTORY] += num_won
+            active = active[~won]
+            if not len(active):
+                break
+
+        player = Player.P2 if player == Player.P1 else Player.P1
+    else:
+        # Every game still going when the board filled up is a draw
+        results[Result.DRAW] += len(active)
+
+    return results
@@ -0,0 +1,294 @@
+"""
+A Connect Four engine which searches bitboards rather than Games.
+
+A position is two integers. Each column gets `rows + 1` bits, bottom to top,
+the extra bit always empty so lines can't wrap from one column into the
+next:
+
+- `mask` has a bit set for every piece on the board
+- `current` has a bit set for every piece of the player on-move
+
+Playing in a column is one addition: adding the column's bottom bit to
+`mask` carries up to the first empty cell. Whether a player has four in a
+row is a few shifts and ANDs. `current + mask` identifies the position, so
+it serves as the transposition table key without any Zobrist hashing.
+"""
+
+import logging
+from math import inf
+
+from engine.engine import Engine
+from engine.exceptions import EngineException, SearchAborted
+from engine.search_budget import SearchBudget
+from engine.search_stats import SearchStats
+from engine.transposition_table import TranspositionTable, score_bound
+from engine.typedefs import MoveGenFn
+from game.board import Board
+from game.game import Game
+from game.move import Move
+from game.piece import Piece
+from game.placement_rule import PlacementRule
+from game.player import Player
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# Shifts and ANDs only find this many in a row
+WIN_COUNT = 4
+
+# Both masks, plus the padding bit per column, must fit in 64 bits
+MAX_BITS = 64
+
+
+class BitSearch:
+    """
+    Negamax alpha-beta over bitboards for one board size.
+
+    Scores are from the point of view of the player on-move. A win is worth
+    more the sooner it comes: `(cells + 1 - moves) // 2`, where `moves` is
+    the number of pieces on the board when the winning piece is played. A
+    position the search can't see the end of scores 0.
+    """
+
+    def __init__(
+        self,
+        size: tuple[int, int],
+        tt: TranspositionTable | None = None,
+        budget: SearchBudget | None = None,
+    ) -> None:
+        rows, cols = size
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.tt = tt
+        self.budget = budget
+        self.stats = SearchStats()
+
+        h1 = rows + 1
+        self.bottom = [1 << (col * h1) for col in range(cols)]
+        self.top = [1 << (rows - 1 + col * h1) for col in range(cols)]
+        self.column = [((1 << rows) - 1) << (col * h1) for col in range(cols)]
+
+        # |, -, / and \
+        self.shifts = (1, h1, h1 + 1, h1 - 1)
+
+        # Center columns take part in the most lines, so try them first
+        center = (cols - 1) / 2
+        self.order = sorted(range(cols), key=lambda col: abs(col - center))
+
+    @classmethod
+    def from_board(cls, b: Board) -> "BitSearch":
+        rows, cols = b.size
+        if b.placement_rule != PlacementRule.COLUMN_STACK:
+            raise EngineException("bitboard search needs a COLUMN_STACK board")
+        elif b.win_count != WIN_COUNT:
+            raise EngineException(f"bitboard search needs a win count of {WIN_COUNT}")
+        elif (rows + 1) * cols > MAX_BITS:
+            raise EngineException(f"board too large for {MAX_BITS}-bit masks")
+        return cls(b.size)
+
+    def encode(self, g: Game) -> tuple[int, int, int]:
+        """Return `current`, `mask` and the number of moves for the game's
+        position
+        """
+        b = g.board
+        h1 = self.rows + 1
+        piece = g.cur_piece
+
+        current = 0
+        mask = 0
+        for row in range(self.rows):
+            for col in range(self.cols):
+                cell_piece = b.cell_value((row, col))
+                if cell_piece == Piece._:
+                    continue
+
+                # Rows count down from the top of the board, bits count up
+                # from the bottom of the column
+                bit = 1 << (col * h1 + self.rows - 1 - row)
+                mask |= bit
+                if cell_piece == piece:
+                    current |= bit
+
+        return current, mask, len(g.move_history)
+
+    def _aligned(self, pos: int) -> bool:
+        """Return True if `pos` has four in a row"""
+        for shift in self.shifts:
+            m = pos & (pos >> shift)
+            if m & (m >> (2 * shift)):
+                return True
+        return False
+
+    def can_play(self, mask: int, col: int) -> bool:
+        return mask & self.top[col] == 0
+
+    def is_winning_move(self, current: int, mask: int, col: int) -> bool:
+        pos = current | ((mask + self.bottom[col]) & self.column[col])
+        return self._aligned(pos)
+
+    def negamax(
+        self,
+        current: int,
+        mask: int,
+        moves: int,
+        depth: int,
+        alpha: float,
+        beta: float,
+    ) -> float:
+        stats = self.stats
+        stats.nodes += 1
+        if self.budget is not None:
+            self.budget.check(stats)
+
+        if moves == self.cells:
+            return 0
+
+        for col in range(self.cols):
+            if self.can_play(mask, col) and self.is_winning_move(current, mask, col):
+                return (self.cells + 1 - moves) // 2
+
+        if depth == 0:
+            return 0
+
+        # We can't win this move, so the best we can hope for is winning
+        # with our next one
+        best_possible = (self.cells - 1 - moves) // 2
+        if beta > best_possible:
+            beta = best_possible
+            if alpha >= beta:
+                return beta
+
+        key = current + mask
+        tt = self.tt
+        if tt is not None:
+            entry = tt.probe(key)
+            if (
+                entry is not None
+                and entry.depth >= depth
+                and entry.settles(alpha, beta)
+            ):
+                stats.tt_hits += 1
+                return entry.score
+
+        alpha_orig = alpha
+        value = -inf
+        for col in self.order:
+            if not self.can_play(mask, col):
+                continue
+
+            # Play for the current player, then swap sides
+            child_mask = mask | (mask + self.bottom[col])
+            score = -self.negamax(
+                current ^ mask, child_mask, moves + 1, depth - 1, -beta, -alpha
+            )
+
+            value = max(value, score)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                stats.cutoffs += 1
+                break
+
+        if tt is not None:
+            tt.store(key, depth, value, score_bound(value, alpha_orig, beta), None)
+
+        return value
+
+    def search(
+        self, current: int, mask: int, moves: int, depth: int
+    ) -> tuple[float, int]:
+        """Search the position to `depth` plies, return the score and the
+        best column
+        """
+        self.stats.nodes += 1
+
+        playable = [col for col in self.order if self.can_play(mask, col)]
+        for col in playable:
+            if self.is_winning_move(current, mask, col):
+                return (self.cells + 1 - moves) // 2, col
+
+        best_col = playable[0]
+        best_score = -inf
+        alpha = -inf
+        beta = inf
+        for col in playable:
+            child_mask = mask | (mask + self.bottom[col])
+            score = -self.negamax(
+                current ^ mask, child_mask, moves + 1, depth - 1, -beta, -alpha
+            )
+            if score > best_score:
+                best_score = score
+                best_col = col
+            alpha = max(alpha, score)
+
+        return best_score, best_col
+
+
+class Bitmaxer(Engine):
+    """
+    Bitmaxer plays Connect Four, searching bitboards with negamax alpha-beta
+    (see `BitSearch`) rather than Games. It plays any COLUMN_STACK board with
+    a win count of 4 which fits in 64 bits, including standard Connect Four.
+
+    Each search deepens one ply at a time up to `max_plies`, or for as long
+    as the budget allows, sharing the engine's transposition table.
+    """
+
+    DEFAULT_PLIES: int = 10
+
+    # BitSearch runs in this process only
+    USES_WORKERS: bool = False
+
+    def __init__(self, g: Game, p: Player, *args, **kwargs) -> None:
+        self.bit_search = BitSearch.from_board(g.board)
+        super().__init__(g, p, *args, **kwargs)
+
+    def generate_game_tree(self, fn: MoveGenFn) -> None:
+        """The Bitmaxer engine doesn't use a Game Tree"""
+        pass
+
+    def propose_move(self) -> Move:
+        s = self.bit_search
+        s.tt = self.tt
+        s.budget = self.budget
+        s.stats = SearchStats()
+
+        if self.tt is not None:
+            self.tt.new_search()
+
+        current, mask, moves = s.encode(self.game)
+        max_depth = min(self.max_plies, s.cells - moves)
+
+        if self.budget is not None:
+            self.budget.start()
+
+        best_col = None
+        for depth in range(1, max_depth + 1):
+            try:
+                score, col = s.search(current, mask, moves, depth)
+            except SearchAborted:
+                # Always finish at least one search
+                if best_col is None:
+                    s.budget = None
+                    score, col = s.search(current, mask, moves, depth)
+                    best_col = col
+                break
+
+            best_col = col
+            s.stats.depth = depth
+
+            # Found a forced win or loss, searching deeper won't change that
+            if score != 0:
+                break
+
+        assert best_col is not None
+
+        stats = s.stats
+        DEBUG(
+            f"bitmaxer: depth={stats.depth} nodes={stats.nodes}"
+            f" cutoffs={stats.cutoffs} tt_hits={stats.tt_hits}"
+        )
+
+        row = self.game.board.top_empty_row_for_column(best_col)
+        return Move.of((row, best_col), self.game.cur_piece)
@@ -1,31 +1,133 @@
-from engine.alphabeta import alphabeta
-from engine.game_tree import EvalFn, GameTree, MoveGenFn, MinimaxFn
+import logging
+
+from engine.alphabeta import alphabeta, search_alphabeta
+from engine.game_tree import GameTree, MinimaxFn
+from engine.iterative_deepening import iterative_deepening
 from engine.mnk.heuristics import eval_end_state
+from engine.move_ordering import MoveOrdering
+from engine.lazy_smp import LazySMPSearch
+from engine.parallel import ParallelSearch
+from engine.parallel_mode import ParallelMode
+from engine.search_budget import SearchBudget
+from engine.search_context import SearchContext, SearchFn
+from engine.threaded import ThreadedSearch, gil_enabled
+from engine.transposition_table import DEFAULT_HASH_MB, TranspositionTable
+from engine.typedefs import EvalFn, MoveGenFn
 from game.game import Game, GameEvent, generate_moves
 from game.move import Move
 from game.player import Player
 
+logger = logging.getLogger(__name__)
+WARNING = logger.warning
+
 
 class Engine:
     """
     Abstract base class for an engine capable of playing an m,n,k game
+
+    By default, engines search the game directly with SEARCH_FN, generating
+    positions as they go. Passing `use_game_tree=True` instead builds out a
+    full GameTree and evaluates it with MINIMAX_FN, which is much slower but
+    leaves the tree around for debugging and visualization. The tree is kept
+    between moves, re-rooted at each move played and extended to full depth
+    before the next search.
+
+    Searches share a transposition table across moves, sized by `hash_mb`.
+    Pass `hash_mb=0` to search without one.
+
+    Given a `time_limit_ms` or `max_nodes` budget, engines search with
+    iterative deepening and play the best move from the deepest search that
+    finished in time. Without `max_plies` they then go as deep as the budget
+    allows. Budgets don't apply when building a game tree.
+
+    With `workers` greater than 1, searches use that many worker processes.
+    By default each searches some of the root moves (`ParallelSearch`), with
+    `ParallelMode.LAZY_SMP` they all search the whole tree and share a
+    transposition table (`LazySMPSearch`). On a free-threaded build of Python
+    with the GIL disabled, Lazy SMP runs on threads instead, sharing the
+    engine's own transposition table (`ThreadedSearch`). Call `close` to stop
+    the workers when done with the engine.
+
+    Engines which pick their moves some other way turn off USES_TT and
+    USES_WORKERS for whatever they don't use, so that nothing is allocated
+    for it. Asking them for it anyway logs a warning.
     """
 
     DEFAULT_PLIES: int = 2
     EVAL_FN: EvalFn = eval_end_state
     MINIMAX_FN: MinimaxFn = alphabeta
-
-    def __init__(self, g: Game, p: Player, max_plies: int | None = None) -> None:
+    SEARCH_FN: SearchFn = search_alphabeta
+
+    USES_TT: bool = True
+    USES_WORKERS: bool = True
+
+    def __init__(
+        self,
+        g: Game,
+        p: Player,
+        max_plies: int | None = None,
+        use_game_tree: bool = False,
+        hash_mb: float | None = None,
+        time_limit_ms: int | None = None,
+        max_nodes: int | None = None,
+        workers: int | None = None,
+        parallel_mode: ParallelMode = ParallelMode.ROOT_SPLIT,
+    ) -> None:
         self.game = g
         self.player = p
         self.tree: GameTree | None = None
+        self.use_game_tree = use_game_tree
 
-        if max_plies is None:
-            self.max_plies = self.DEFAULT_PLIES
-        else:
+        cls = self.__class__
+        if hash_mb is None:
+            hash_mb = DEFAULT_HASH_MB if cls.USES_TT else 0
+        elif hash_mb > 0 and not cls.USES_TT:
+            WARNING(
+                f"{cls.__name__} doesn't use a transposition table, ignoring {hash_mb=}"
+            )
+            hash_mb = 0
+
+        if workers is not None and workers > 1 and not cls.USES_WORKERS:
+            WARNING(f"{cls.__name__} doesn't search with workers, ignoring {workers=}")
+            workers = None
+
+        self.tt: TranspositionTable | None = None
+        if hash_mb > 0:
+            self.tt = TranspositionTable(hash_mb)
+
+        self.parallel: ParallelSearch | LazySMPSearch | ThreadedSearch | None = None
+        if workers is not None and workers > 1:
+            if parallel_mode == ParallelMode.LAZY_SMP and not gil_enabled():
+                self.parallel = ThreadedSearch(workers, cls.SEARCH_FN, hash_mb=hash_mb)
+            elif parallel_mode == ParallelMode.LAZY_SMP:
+                self.parallel = LazySMPSearch(workers, cls.SEARCH_FN, hash_mb=hash_mb)
+            else:
+                self.parallel = ParallelSearch(workers, cls.SEARCH_FN, hash_mb=hash_mb)
+
+        self.budget: SearchBudget | None = None
+        if time_limit_ms is not None or max_nodes is not None:
+            self.budget = SearchBudget(time_limit_ms=time_limit_ms, max_nodes=max_nodes)
+
+        if max_plies is not None:
             self.max_plies = max_plies
+        elif self.budget is not None:
+            rows, cols = g.board.size
+            self.max_plies = rows * cols
+        else:
+            self.max_plies = self.DEFAULT_PLIES
+
+    def close(self) -> None:
+        """Release any resources held by the engine, like worker processes"""
+        if self.parallel is not None:
+            self.parallel.shutdown()
 
     def generate_game_tree(self, fn: MoveGenFn) -> None:
+        if self.tree is not None:
+            # Reuse what we built for earlier moves, just add the plies played
+            # since then
+            self.tree.build(self.max_plies, fn)
+            return
+
         t = GameTree.generate(self.game, self.max_plies, fn)
         self.tree = t
 
@@ -36,10 +138,57 @@ class Engine:
 
     def on_game_event(self, evt: GameEvent) -> None:
         """Callback for anytime a GameEvent occurs"""
-        pass
+        if self.tree is None:
+            return
+
+        if evt == GameEvent.MOVE:
+            m = self.game.move_history[-1]
+            if not self.tree.reroot(m):
+                self.tree = None
+        else:
+            # A reset or undo takes us back to a position the tree doesn't
+            # cover
+            self.tree = None
 
     def propose_move(self) -> Move:
         """Produce the next move"""
+        if self.use_game_tree:
+            return self._propose_move_from_game_tree()
+
+        # If we access these function using `self` then it will be treated as
+        # a bound method and we'll have `self` passsed in implicitly which is
+        # not what we want. Referencing it via a class member avoids binding
+        # the function to the instance so the function arity is unchanged
+        cls = self.__class__
+        eFn = cls.EVAL_FN
+        sFn = cls.SEARCH_FN
+        if self.parallel is not None:
+            sFn = self.parallel.search
+
+        if self.tt is not None:
+            self.tt.new_search()
+
+        ctx = SearchContext(
+            eval_fn=eFn,
+            move_gen=generate_moves,
+            tt=self.tt,
+            budget=self.budget,
+            ordering=MoveOrdering(),
+        )
+
+        # Search a private copy so our make/unmake moves aren't broadcast to
+        # the game's event listeners
+        g = self.game.copy()
+        maximizer = g.cur_player == Player.P1
+
+        if self.budget is not None:
+            _, m = iterative_deepening(g, self.max_plies, maximizer, ctx, sFn)
+        else:
+            _, m = sFn(g, self.max_plies, maximizer, ctx)
+
+        return m
+
+    def _propose_move_from_game_tree(self) -> Move:
         gFn = generate_moves
         self.generate_game_tree(gFn)
 
@@ -47,10 +196,6 @@ class Engine:
 
         assert t is not None
 
-        # If we access these function using `self` then it will be treated as
-        # a bound method and we'll have `self` passsed in implicitly which is
-        # not what we want. Referencing it via a class member avoids binding
-        # the function to the instance so the function arity is unchanged
         cls = self.__class__
         eFn = cls.EVAL_FN
         mFn = cls.MINIMAX_FN
@@ -63,12 +208,31 @@ class Engine:
 
 
 def create_engine(
-    cls: type[Engine], g: Game, p: Player, max_plies: int | None = None
+    cls: type[Engine],
+    g: Game,
+    p: Player,
+    max_plies: int | None = None,
+    use_game_tree: bool = False,
+    hash_mb: float | None = None,
+    time_limit_ms: int | None = None,
+    max_nodes: int | None = None,
+    workers: int | None = None,
+    parallel_mode: ParallelMode = ParallelMode.ROOT_SPLIT,
 ) -> Engine:
     """Convenient factory function for creating an engine
 
     Importantly, this sets up move listening.
     """
-    eng = cls(g, p, max_plies=max_plies)
+    eng = cls(
+        g,
+        p,
+        max_plies=max_plies,
+        use_game_tree=use_game_tree,
+        hash_mb=hash_mb,
+        time_limit_ms=time_limit_ms,
+        max_nodes=max_nodes,
+        workers=workers,
+        parallel_mode=parallel_mode,
+    )
     eng.listen_for_game_events()
     return eng
@@ -8,6 +8,11 @@ class EngineChoice(Enum):
     RANDIMAXER = auto()
     WINIMAXER = auto()
     WINIBETAMAXER = auto()
+    SCOUTMAXER = auto()
+    MTDF = auto()
+    MCTS = auto()
+    ORACLE = auto()
+    BITMAXER = auto()
 
     def engine(self) -> type[Engine]:
         if self == EngineChoice.DUMMY:
@@ -26,6 +31,26 @@ class EngineChoice(Enum):
             from engine.mnk.winibetamaxer import Winibetamaxer
 
             return Winibetamaxer
+        elif self == EngineChoice.SCOUTMAXER:
+            from engine.mnk.scoutmaxer import Scoutmaxer
+
+            return Scoutmaxer
+        elif self == EngineChoice.MTDF:
+            from engine.mnk.mtdfmaxer import Mtdfmaxer
+
+            return Mtdfmaxer
+        elif self == EngineChoice.MCTS:
+            from engine.mnk.montecarlo import Montecarlo
+
+            return Montecarlo
+        elif self == EngineChoice.ORACLE:
+            from engine.t3.oracle import Oracle
+
+            return Oracle
+        elif self == EngineChoice.BITMAXER:
+            from engine.c4.bitmaxer import Bitmaxer
+
+            return Bitmaxer
 
         raise ValueError("unknown engine choice")
 
@@ -38,6 +63,16 @@ class EngineChoice(Enum):
             return "winimaxer"
         elif self == EngineChoice.WINIBETAMAXER:
             return "winibetamaxer"
+        elif self == EngineChoice.SCOUTMAXER:
+            return "scoutmaxer"
+        elif self == EngineChoice.MTDF:
+            return "mtdf"
+        elif self == EngineChoice.MCTS:
+            return "mcts"
+        elif self == EngineChoice.ORACLE:
+            return "oracle"
+        elif self == EngineChoice.BITMAXER:
+            return "bitmaxer"
 
     @classmethod
     def from_str(cls, s: str) -> "EngineChoice":
@@ -49,5 +84,15 @@ class EngineChoice(Enum):
             return cls.WINIMAXER
         elif s == "winibetamaxer":
             return cls.WINIBETAMAXER
+        elif s == "scoutmaxer":
+            return cls.SCOUTMAXER
+        elif s == "mtdf":
+            return cls.MTDF
+        elif s == "mcts":
+            return cls.MCTS
+        elif s == "oracle":
+            return cls.ORACLE
+        elif s == "bitmaxer":
+            return cls.BITMAXER
 
         raise ValueError(f"unknown engine choice: {s}")
@@ -0,0 +1,8 @@
+class EngineException(Exception):
+    pass
+
+
+class SearchAborted(EngineException):
+    """Raised from deep within a search when its budget runs out"""
+
+    pass
@@ -1,38 +1,29 @@
 import logging
 from dataclasses import dataclass, field
 from collections.abc import Callable
-from typing import Generator, List
+from typing import List
 
+from engine.typedefs import EvalFn, MoveGenFn
 from game.game import Game, GameState
 from game.move import Move, NULL_MOVE
 from game.player import Player
 
-
 logger = logging.getLogger(__name__)
 INFO = logger.info
 
 
-# This function evaluates the position after a given move
-#
-# fn(node, depth, maximizer) -> score
-type EvalFn = Callable[[Node, int, bool], float]
-
 # This function applies minimax (or a variant) to the game tree
 #
 # fn(node, depth, maximizer, evalFn) -> score
 type MinimaxFn = Callable[[Node, int, bool, EvalFn], float]
 
-# A move generator is a function that given a Game produces Moves
-#
-# It's more efficient if the move generator emits promising moves first
-#
-# fn(game) -> Gen(Move, ...)
-type MoveGenFn = Callable[[Game], Generator[Move]]
-
 
 @dataclass
 class Node:
-    """A game tree node for use in a minimax algorithm"""
+    """A game tree node for use in a minimax algorithm
+
+    The node's game is the position after its move has been played.
+    """
 
     game: Game = field(repr=False)
     move: Move
@@ -79,9 +70,30 @@ class GameTree:
     root: Node
 
     def build(self, max_plies: int, fn: MoveGenFn) -> None:
-        """Build out the subtree underneath the root"""
+        """Build out the subtree underneath the root
+
+        Nodes which already have children are kept, so this can also be used
+        to extend an existing tree to a new depth.
+        """
         _build_subtree(self.root, max_plies, fn)
 
+    def reroot(self, m: Move) -> bool:
+        """Make the child reached by playing `m` the new root, discarding its
+        siblings.
+
+        The new root's subtree is kept as is, one ply shallower than before,
+        so that `build` only needs to add a ply rather than start over.
+
+        Returns False if there's no such child, in which case the tree is left
+        unchanged.
+        """
+        for child in self.root.children:
+            if child.move == m:
+                child.move = NULL_MOVE
+                self.root = child
+                return True
+        return False
+
     def evaluate(self, max_plies: int, eFn: EvalFn, mFn: MinimaxFn) -> float:
         """Evaluate the game tree using minimax"""
         r = self.root
@@ -94,10 +106,14 @@ class GameTree:
 
         scores = []
         for idx, child in enumerate(children):
+            assert child.score is not None
             scores.append((child.score, idx))
 
+        # Ties go to the earliest child. With alpha-beta, a later child that
+        # ties may only have been scored with a bound, so its true score could
+        # be worse
         if self.root.is_maximizer():
-            scores.sort(reverse=True)
+            scores.sort(key=lambda x: (-x[0], x[1]))
         else:
             scores.sort()
 
@@ -130,27 +146,18 @@ def _build_subtree(cur_node: Node, num_plies: int, move_generator: MoveGenFn) ->
 
     g = cur_node.game
 
-    is_root = cur_node.is_root()
-
-    if not is_root:
-        g_p = g.cur_piece
-        n_p = cur_node.move.piece
-        assert cur_node.move.piece == g.cur_piece, f"{n_p=} != {g_p=}"
-
-        if g.state != GameState.FINISHED:
-            g.apply_move(cur_node.move)
-
     if g.state == GameState.FINISHED:
         return
 
-    p = g.cur_piece
-
-    if not is_root:
-        cur_node_piece = cur_node.move.piece
-        assert p != cur_node.move.piece, f"{p=} should not equal {cur_node_piece=}"
+    # Children are generated all at once, so a node which has any already has
+    # them all, left over from a previous build
+    if not cur_node.children:
+        for m in move_generator(g):
+            child_game = g.copy()
+            child_game.apply_move(m)
 
-    for m in move_generator(g):
-        child = Node(g.copy(), m)
-        cur_node.add_child(child)
+            child = Node(child_game, m)
+            cur_node.add_child(child)
 
+    for child in cur_node.children:
         _build_subtree(child, num_plies - 1, move_generator)
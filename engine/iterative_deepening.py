@@ -0,0 +1,61 @@
+import logging
+
+from engine.exceptions import SearchAborted
+from engine.search_context import SearchContext, SearchFn
+from game.game import Game
+from game.move import Move
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+def iterative_deepening(
+    g: Game, max_depth: int, maximizer: bool, ctx: SearchContext, fn: SearchFn
+) -> tuple[float, Move]:
+    """Search to depth 1, then 2, then 3 and so on up to `max_depth` until the
+    context's budget runs out, returning the result of the deepest search
+    which completed.
+
+    Each iteration tries the previous iteration's best move first. Together
+    with the transposition table, this usually makes the shallower iterations
+    pay for themselves by improving pruning in the deeper ones.
+
+    The first iteration always runs to completion so that there is a move to
+    return, regardless of the budget.
+    """
+    budget = ctx.budget
+    if budget is not None:
+        budget.start()
+
+    # Searching deeper than the number of moves left can't change the result
+    max_depth = min(max_depth, g.board.num_empty_cells())
+
+    num_moves = len(g.move_history)
+
+    ctx.budget = None
+    score, m = fn(g, 1, maximizer, ctx)
+    ctx.stats.depth = 1
+    ctx.budget = budget
+
+    for depth in range(2, max_depth + 1):
+        ctx.first_move = m
+        try:
+            score, m = fn(g, depth, maximizer, ctx)
+        except SearchAborted as e:
+            DEBUG(f"iterative_deepening: {depth=} aborted: {e}")
+
+            # The search was interrupted mid-move, put the game back
+            while len(g.move_history) > num_moves:
+                g.undo_move()
+            break
+
+        ctx.stats.depth = depth
+
+    ctx.first_move = None
+
+    DEBUG(
+        f"iterative_deepening: depth={ctx.stats.depth} nodes={ctx.stats.nodes}"
+        f" {score=} move={m}"
+    )
+
+    return score, m
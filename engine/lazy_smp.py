@@ -0,0 +1,286 @@
+"""
+Lazy SMP: several processes search the same position, sharing one
+transposition table.
+
+Rather than carefully dividing up the work, every worker searches the whole
+tree. They only help one another through the table: whatever one worker has
+already searched, the others find there and skip. Varying the move order
+between workers keeps them from all searching the same subtrees in
+lockstep.
+"""
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from ctypes import c_int64
+from multiprocessing.sharedctypes import RawValue
+from random import Random
+
+from engine.exceptions import SearchAborted
+from engine.move_ordering import MoveOrdering
+from engine.parallel import Position
+from engine.search_budget import SearchBudget
+from engine.search_context import SearchContext, SearchFn
+from engine.search_stats import SearchStats
+from engine.shared_tt import SharedTranspositionTable
+from engine.transposition_table import DEFAULT_HASH_MB, Bound
+from engine.typedefs import EvalFn, MoveGenFn
+from game.game import Game, generate_moves
+from game.move import Move
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# The table each worker attaches to, shared by every search the pool runs,
+# None when searching without one
+_worker_tt: SharedTranspositionTable | None = None
+
+# The id of the search workers should be working on, anything else has been
+# called off
+_worker_search_id: c_int64 | None = None
+
+
+def _init_worker(tt_name: str | None, search_id: c_int64) -> None:
+    global _worker_tt, _worker_search_id
+    if tt_name is not None:
+        _worker_tt = SharedTranspositionTable.attach(tt_name)
+    _worker_search_id = search_id
+
+
+class _StoppableBudget(SearchBudget):
+    """A budget which also runs out once `stopped` returns True, so the
+    searches which are no longer needed can be called off
+    """
+
+    def __init__(
+        self, budget: SearchBudget | None, stopped: Callable[[], bool]
+    ) -> None:
+        if budget is None:
+            super().__init__()
+        else:
+            super().__init__(
+                time_limit_ms=budget.time_limit_ms, max_nodes=budget.max_nodes
+            )
+        self.stopped = stopped
+
+    def check(self, stats: SearchStats) -> None:
+        if self.stopped():
+            raise SearchAborted("search stopped")
+        super().check(stats)
+
+
+def _shuffled_moves(rng: Random) -> MoveGenFn:
+    """Return a move generator which yields moves in a random order
+
+    The killer, history and transposition table moves are still tried first,
+    this only shakes up the order of moves we know nothing about.
+    """
+
+    def gen(g: Game):
+        moves = list(generate_moves(g))
+        rng.shuffle(moves)
+        yield from moves
+
+    return gen
+
+
+def _search_worker(
+    pos: Position,
+    depth: int,
+    maximizer: bool,
+    search_fn: SearchFn,
+    eval_fn: EvalFn,
+    budget: SearchBudget | None,
+    first_move: Move | None,
+    seed: int | None,
+    search_id: int,
+) -> tuple[float, Move, SearchStats]:
+    """Runs in a worker: search the whole position"""
+    current = _worker_search_id
+    assert current is not None
+
+    # Reading a shared int is cheap enough to do at every node
+    stoppable = _StoppableBudget(budget, lambda: current.value != search_id)
+    stoppable.start()
+
+    move_gen: MoveGenFn = generate_moves
+    if seed is not None:
+        move_gen = _shuffled_moves(Random(seed))
+
+    if first_move is not None:
+        first_move = Move.of(first_move.cell, first_move.piece)
+
+    g = pos.game()
+    ctx = SearchContext(
+        eval_fn=eval_fn,
+        move_gen=move_gen,
+        tt=_worker_tt,
+        budget=stoppable,
+        first_move=first_move,
+        ordering=MoveOrdering(),
+    )
+    score, m = search_fn(g, depth, maximizer, ctx)
+
+    return score, m, ctx.stats
+
+
+class LazySMPSearch:
+    """
+    Runs the same search in a pool of worker processes which share a
+    SharedTranspositionTable, and takes the result of the first search to
+    finish.
+
+    Worker 0 searches exactly as a single process would, every other worker
+    shuffles its move order. They all search to the same depth, so any of
+    their results will do and once one finishes the rest are called off. The
+    helpers' job is to fill the table with the subtrees worker 0 hasn't got
+    to yet, not to find a result of their own.
+
+    Workers try the context's first move, or else the best move from its
+    table, first. The context's table can't be shared with other processes,
+    so beyond that the workers only use the shared one, and the result is
+    stored back in the context's table for the next search. With `hash_mb=0`
+    there's no shared table and the workers search independently.
+
+    Like ParallelSearch the pool, and the table, are created on first use and
+    kept until `shutdown`. `search` conforms to SearchFn.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        search_fn: SearchFn,
+        hash_mb: float = DEFAULT_HASH_MB,
+    ) -> None:
+        self.workers = workers
+        self.search_fn = search_fn
+        self.hash_mb = hash_mb
+        self._executor: ProcessPoolExecutor | None = None
+        self._tt: SharedTranspositionTable | None = None
+        self._search_id = 0
+
+        # Which search the workers should be working on, see `_search_worker`
+        self._current = RawValue(c_int64, 0)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            tt_name = None
+            if self.hash_mb > 0:
+                self._tt = SharedTranspositionTable(self.hash_mb)
+                tt_name = self._tt.name
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(tt_name, self._current),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+        # Only once the workers are gone is it safe to free the table
+        if self._tt is not None:
+            self._tt.close()
+            self._tt.unlink()
+            self._tt = None
+
+    def search(
+        self, g: Game, depth: int, maximizer: bool, ctx: SearchContext
+    ) -> tuple[float, Move]:
+        """Search the game with every worker at once, conforms to SearchFn"""
+        pool = self._pool()
+        if self._tt is not None:
+            self._tt.new_search()
+        self._search_id += 1
+        self._current.value = self._search_id
+
+        pos = Position.from_game(g)
+        budget = ctx.budget
+
+        first = ctx.first_move
+        if first is None and ctx.tt is not None:
+            entry = ctx.tt.probe(g.position_key)
+            if entry is not None:
+                first = entry.move
+
+        pending: dict[Future, int] = {}
+        for i in range(self.workers):
+            seed = None if i == 0 else self._search_id * self.workers + i
+
+            # Every worker counts its own nodes, so split the nodes left
+            # between them
+            task_budget = None
+            if budget is not None:
+                task_budget = budget.remaining(ctx.stats, parts=self.workers)
+
+            fut = pool.submit(
+                _search_worker,
+                pos,
+                depth,
+                maximizer,
+                self.search_fn,
+                ctx.eval_fn,
+                task_budget,
+                first,
+                seed,
+                self._search_id,
+            )
+            pending[fut] = i
+
+        # worker -> result of each search which finished
+        results: dict[int, tuple[float, Move]] = {}
+
+        # Wait for the first search to finish, or for time to run out
+        while pending and not results:
+            timeout = None if budget is None else budget.remaining_s()
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                break
+
+            for fut in done:
+                i = pending.pop(fut)
+                try:
+                    score, m, stats = fut.result()
+                except SearchAborted:
+                    continue
+                ctx.stats.merge(stats)
+                results[i] = (score, m)
+
+        # Call off the rest. They notice within a node, but one may still
+        # finish in the meantime, so wait for them and keep whatever they
+        # found. Waiting also leaves the pool free for the next search.
+        self._current.value = 0
+        for fut, i in pending.items():
+            try:
+                score, m, stats = fut.result()
+            except SearchAborted:
+                continue
+            ctx.stats.merge(stats)
+            results[i] = (score, m)
+
+        if not results:
+            raise SearchAborted("no worker finished its search")
+
+        # They all searched to the same depth, prefer worker 0's result since
+        # it's what a single process would have found
+        best_worker = min(results)
+        score, m = results[best_worker]
+
+        # Moves come back from workers as copies, swap in our shared instance
+        m = Move.of(m.cell, m.piece)
+
+        if ctx.tt is not None:
+            ctx.tt.store(g.position_key, depth, score, Bound.EXACT, m)
+
+        stats = ctx.stats
+        DEBUG(
+            f"lazy_smp: {depth=} {best_worker=}"
+            f" workers={self.workers} nodes={stats.nodes}"
+        )
+
+        return score, m
@@ -0,0 +1,289 @@
+"""
+Monte Carlo tree search.
+
+Rather than evaluating positions with a heuristic, MCTS estimates how good a
+move is by playing random games from it and counting how often they're won.
+The tree grows one node per playout, towards the moves which have done best
+so far, so the estimates for good moves are refined the most.
+
+Which child to follow is decided by UCT, which balances a child's win rate
+against how rarely it's been tried compared to its siblings.
+"""
+
+import logging
+from array import array
+from collections import Counter
+from math import inf, log, sqrt
+from random import Random
+
+import numpy as np
+
+from engine.batch_playouts import batch_playouts
+from game.game import Game, GameState
+from game.line_table import LineTable
+from game.move import Move
+from game.player import Player
+from game.result import Result
+from game.typedefs import Cell
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# How much UCT favors rarely tried children over ones with a good win rate
+UCT_C = sqrt(2)
+
+# visits, first_child, num_children and cell are 32-bit, wins is a double
+NODE_BYTES = 4 * 4 + 8
+
+# Sizes the tree when an engine isn't given one
+DEFAULT_TREE_MB = 16.0
+
+# A playout's reward to the player who made the move into a node
+WIN_REWARD = 1.0
+DRAW_REWARD = 0.5
+
+
+def random_playout(g: Game, rng: Random) -> Result:
+    """Play random moves until the game is over and return the result
+
+    The moves are taken back again afterwards, leaving the game as it was.
+    """
+    num_moves = 0
+    while g.state != GameState.FINISHED:
+        moves = list(g.generate_moves())
+        g.apply_move(rng.choice(moves))
+        num_moves += 1
+
+    result = g.result
+
+    for _ in range(num_moves):
+        g.undo_move()
+
+    return result
+
+
+class MCTSTree:
+    """
+    The statistics for every node of the tree, kept in flat arrays indexed
+    by node number rather than in an object per node like GameTree's Node.
+
+    Node 0 is the root. A node's children are allocated together when it's
+    expanded, so they occupy a contiguous block of `num_children[n]` nodes
+    starting at `first_child[n]`, which is -1 until then.
+
+    `cell[n]` is the flat index (`row * cols + col`) of the move into node
+    `n`. The piece isn't stored, it's whoever was on-move in the parent.
+    `wins[n]` is the total reward of playouts through `n` to the player who
+    made that move.
+
+    The arrays are allocated up front. Once they're full the tree stops
+    growing, and playouts start from the deepest node already there.
+    """
+
+    def __init__(self, capacity: int, line_table: LineTable) -> None:
+        self.capacity = max(1, capacity)
+        self.line_table = line_table
+        self.cells = line_table.cells
+        _, self.cols = line_table.size
+
+        self.visits = array("i", bytes(4 * self.capacity))
+        self.wins = array("d", bytes(8 * self.capacity))
+        self.first_child = array("i", [-1]) * self.capacity
+        self.num_children = array("i", bytes(4 * self.capacity))
+        self.cell = array("i", bytes(4 * self.capacity))
+
+        self.size = 1
+
+        # The position the root stands for, see `matches`
+        self.root_key: int | None = None
+
+    @classmethod
+    def for_game(cls, g: Game, size_mb: float = DEFAULT_TREE_MB) -> "MCTSTree":
+        capacity = int(size_mb * 1024 * 1024 / NODE_BYTES)
+        t = cls(capacity, g.board.line_table)
+        t.root_key = g.position_key
+        return t
+
+    def matches(self, g: Game) -> bool:
+        """Return whether the root of the tree is the game's current position"""
+        return self.root_key == g.position_key
+
+    def _cell_index(self, cell: Cell) -> int:
+        row, col = cell
+        return row * self.cols + col
+
+    def _init_node(self, n: int, cell_idx: int) -> None:
+        self.visits[n] = 0
+        self.wins[n] = 0.0
+        self.first_child[n] = -1
+        self.num_children[n] = 0
+        self.cell[n] = cell_idx
+
+    def _expand(self, n: int, g: Game) -> bool:
+        """Add a child to `n` for every move, if there's room"""
+        moves = list(g.generate_moves())
+        first = self.size
+        if first + len(moves) > self.capacity:
+            return False
+
+        for i, m in enumerate(moves):
+            self._init_node(first + i, self._cell_index(m.cell))
+
+        self.first_child[n] = first
+        self.num_children[n] = len(moves)
+        self.size += len(moves)
+        return True
+
+    def _select_child(self, n: int) -> int:
+        """Return the child of `n` with the best UCT score
+
+        Children which have never been visited come first, in order.
+        """
+        visits = self.visits
+        wins = self.wins
+        first = self.first_child[n]
+
+        log_parent = log(max(1, visits[n]))
+        best = first
+        best_score = -inf
+        for c in range(first, first + self.num_children[n]):
+            v = visits[c]
+            if v == 0:
+                return c
+
+            score = wins[c] / v + UCT_C * sqrt(log_parent / v)
+            if score > best_score:
+                best = c
+                best_score = score
+
+        return best
+
+    def _move(self, n: int, g: Game) -> Move:
+        """Return the move into child `n` of the current position"""
+        return Move.of(self.cells[self.cell[n]], g.cur_piece)
+
+    def playout(self, g: Game, rng: Random, batch: int = 1) -> None:
+        """Run one iteration of MCTS from the game's current position, which
+        must be the root of the tree
+
+        Selection walks down the tree by UCT, expansion adds the children of
+        the node it ends on and picks the first of them, a random playout
+        finishes the game from there and backpropagation credits the result
+        to every node on the way.
+
+        :param batch: how many random playouts to run from the node, more
+        than 1 runs them together with `batch_playouts`
+        """
+        # Nobody moved into the root, its wins are never looked at anyway
+        path = [0]
+        movers = [g.cur_piece]
+        n = 0
+
+        while self.first_child[n] != -1 and g.state != GameState.FINISHED:
+            n = self._select_child(n)
+            m = self._move(n, g)
+            movers.append(m.piece)
+            g.apply_move(m)
+            path.append(n)
+
+        if g.state != GameState.FINISHED and self._expand(n, g):
+            n = self._select_child(n)
+            m = self._move(n, g)
+            movers.append(m.piece)
+            g.apply_move(m)
+            path.append(n)
+
+        if batch > 1:
+            np_rng = np.random.default_rng(rng.getrandbits(64))
+            results = batch_playouts(g, batch, np_rng)
+        else:
+            results = Counter([random_playout(g, rng)])
+
+        # Each player's reward from the playouts
+        p1_piece = g.piece_for_player(Player.P1)
+        p2_piece = g.piece_for_player(Player.P2)
+        draws = results[Result.DRAW] * DRAW_REWARD
+        rewards = {
+            p1_piece: results[Result.PLAYER1_VICTORY] * WIN_REWARD + draws,
+            p2_piece: results[Result.PLAYER2_VICTORY] * WIN_REWARD + draws,
+        }
+
+        for n, mover in zip(path, movers):
+            self.visits[n] += batch
+            self.wins[n] += rewards[mover]
+
+        # The root has no move into it
+        for _ in range(len(path) - 1):
+            g.undo_move()
+
+    def best_move(self, g: Game) -> Move:
+        """Return the most visited move from the root
+
+        Visits rather than win rate, since a rarely tried move with a high
+        win rate is mostly luck.
+        """
+        first = self.first_child[0]
+        assert first != -1, "search before asking for the best move"
+
+        children = range(first, first + self.num_children[0])
+        best = max(children, key=lambda c: self.visits[c])
+        return self._move(best, g)
+
+    def reroot(self, g: Game) -> bool:
+        """Make the child reached by the game's last move the new root,
+        discarding the rest of the tree
+
+        The kept subtree is copied into fresh arrays so that its nodes are
+        packed at the front and the space the rest of the tree used is free
+        again.
+
+        Returns False if the root has no such child.
+        """
+        first = self.first_child[0]
+        if first == -1:
+            return False
+
+        idx = self._cell_index(g.move_history[-1].cell)
+        children = range(first, first + self.num_children[0])
+        new_root = next((c for c in children if self.cell[c] == idx), None)
+        if new_root is None:
+            return False
+
+        t = MCTSTree(self.capacity, self.line_table)
+        t._init_node(0, 0)
+        t.visits[0] = self.visits[new_root]
+        t.wins[0] = self.wins[new_root]
+
+        # (old node, new node) whose children still need copying. Children
+        # are copied a block at a time so they stay contiguous
+        queue = [(new_root, 0)]
+        while queue:
+            old, new = queue.pop()
+            old_first = self.first_child[old]
+            if old_first == -1:
+                continue
+
+            count = self.num_children[old]
+            new_first = t.size
+            t.first_child[new] = new_first
+            t.num_children[new] = count
+            t.size += count
+
+            for i in range(count):
+                t._init_node(new_first + i, self.cell[old_first + i])
+                t.visits[new_first + i] = self.visits[old_first + i]
+                t.wins[new_first + i] = self.wins[old_first + i]
+                queue.append((old_first + i, new_first + i))
+
+        self.visits = t.visits
+        self.wins = t.wins
+        self.first_child = t.first_child
+        self.num_children = t.num_children
+        self.cell = t.cell
+        self.size = t.size
+        self.root_key = g.position_key
+
+        DEBUG(f"mcts: rerooted, kept {self.size} nodes")
+
+        return True
@@ -1,7 +1,12 @@
 import logging
 
-from engine.game_tree import EvalFn, Node
-
+from engine.game_tree import Node
+from engine.move_ordering import order_moves
+from engine.search_context import SearchContext
+from engine.transposition_table import Bound
+from engine.typedefs import EvalFn
+from game.game import Game, GameState
+from game.move import Move, NULL_MOVE
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +26,7 @@ def minimax(node: Node, depth: int, maximizer: bool, fn: EvalFn) -> float:
     # Leaf (or hit depth stop)
     if depth == 0 or len(node.children) == 0:
         assert node.move is not None
-        score = fn(node, depth, maximizer)
+        score = fn(node.game, depth, maximizer)
         node.set_score(score)
         return score
 
@@ -39,3 +44,70 @@ def minimax(node: Node, depth: int, maximizer: bool, fn: EvalFn) -> float:
         minv = min(minv, minimax(child, depth - 1, True, fn))
     node.set_score(minv)
     return minv
+
+
+def _search_minimax(g: Game, depth: int, maximizer: bool, ctx: SearchContext) -> float:
+    """Like `minimax` but generates the children of each position as it goes
+    by making and unmaking moves on the game.
+
+    If the context has a transposition table, positions already searched at
+    least as deep are answered from the table.
+    """
+    ctx.stats.nodes += 1
+
+    if ctx.budget is not None:
+        ctx.budget.check(ctx.stats)
+
+    # Leaf (or hit depth stop)
+    if depth == 0 or g.state == GameState.FINISHED:
+        return ctx.eval_fn(g, depth, maximizer)
+
+    tt = ctx.tt
+    key = 0
+    if tt is not None:
+        key = g.position_key
+        entry = tt.probe(key)
+        if entry is not None and entry.depth >= depth:
+            ctx.stats.tt_hits += 1
+            return entry.score
+
+    best = float("-inf") if maximizer else float("inf")
+    best_move = None
+    for m in ctx.move_gen(g):
+        g.apply_move(m)
+        score = _search_minimax(g, depth - 1, not maximizer, ctx)
+        g.undo_move()
+
+        better = score > best if maximizer else score < best
+        if better:
+            best = score
+            best_move = m
+
+    # Minimax never prunes so every score is exact
+    if tt is not None:
+        tt.store(key, depth, best, Bound.EXACT, best_move)
+
+    return best
+
+
+def search_minimax(
+    g: Game, depth: int, maximizer: bool, ctx: SearchContext
+) -> tuple[float, Move]:
+    """Kickoff function for minimax directly on a game, conforms to SearchFn"""
+    ctx.stats.nodes += 1
+
+    best_score = float("-inf") if maximizer else float("inf")
+    best_move = NULL_MOVE
+
+    for m in order_moves(g, ctx, ctx.first_move):
+        g.apply_move(m)
+        score = _search_minimax(g, depth - 1, not maximizer, ctx)
+        g.undo_move()
+
+        # Strict comparison so that ties go to the earliest move
+        better = score > best_score if maximizer else score < best_score
+        if better or best_move is NULL_MOVE:
+            best_score = score
+            best_move = m
+
+    return best_score, best_move
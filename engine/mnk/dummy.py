@@ -1,7 +1,7 @@
 from random import choice
 
 from engine.engine import Engine
-from engine.game_tree import MoveGenFn
+from engine.typedefs import MoveGenFn
 from game.game import generate_moves
 from game.move import Move
 
@@ -17,6 +17,9 @@ class Dummy(Engine):
     from the top-most empty cells across the board.
     """
 
+    USES_TT: bool = False
+    USES_WORKERS: bool = False
+
     def generate_game_tree(self, fn: MoveGenFn) -> None:
         """The Dummy engine doesn't use a Game Tree"""
         pass
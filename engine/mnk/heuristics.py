@@ -1,19 +1,24 @@
 import logging
 from random import uniform
 
-from engine.game_tree import Node
-from game.game import GameState
+from game.game import Game, GameState
+from game.player import Player
 from game.result import Result
 
 logger = logging.getLogger(__name__)
 DEBUG = logger.debug
 
 
-def depth_penalty(depth: int, maximizer: bool, penalty=0.01) -> float:
+def speed_bonus(empty_cells: int, maximizer: bool, bonus=0.01) -> float:
     """
-    How much each ply reduces the score, i.e. the sooner the win, the better
+    How much each cell left empty adds to the score of whoever just moved,
+    i.e. the sooner the win, the better.
+
+    Counting empty cells rather than plies from the root of the search means
+    a position's score doesn't depend on how deep the search started, so it
+    can be reused from a transposition table by any search.
     """
-    magnitude = penalty * (depth - 1)
+    magnitude = bonus * empty_cells
     return -magnitude if maximizer else magnitude
 
 
@@ -28,19 +33,18 @@ def score_result(r: Result, victory=1.0) -> float:
         raise Exception("unknown result")
 
 
-def eval_end_state(cur_node: Node, depth: int, maximizer: bool) -> float:
-    g = cur_node.game
+def eval_end_state(g: Game, depth: int, maximizer: bool) -> float:
     if g.state != GameState.FINISHED:
         return 0.0
 
     score = 0.0
     score += score_result(g.result)
-    score += depth_penalty(depth, maximizer)
+    score += speed_bonus(g.board.num_empty_cells(), maximizer)
 
     return score
 
 
-def eval_rand(cur_node: Node, depth: int, maximizer: bool) -> float:
+def eval_rand(g: Game, depth: int, maximizer: bool) -> float:
     """This is in 'piece' units; so 2.0 is like player 1 having an extra
     piece. Likewise, -1.5 is like player 2 having the equivalent of an
     extra piece an a half.
@@ -48,3 +52,39 @@ def eval_rand(cur_node: Node, depth: int, maximizer: bool) -> float:
     ~0.0 is considered draw-ish.
     """
     return uniform(-1.0, 1.0)
+
+
+# Each extra piece in a window open for a player makes it this much more of a
+# threat
+WINDOW_GROWTH = 4.0
+
+# Positional scores are squashed into (-WINDOW_SCALE, WINDOW_SCALE) so that
+# they never outweigh an actual win
+WINDOW_SCALE = 0.5
+
+
+def eval_windows(g: Game, depth: int, maximizer: bool) -> float:
+    """Score unfinished positions by the win-line windows still open to each
+    player, weighting windows closer to being filled more heavily.
+
+    Finished positions are scored like `eval_end_state`.
+
+    The counts come from the board's `WindowTally`, which is updated as moves
+    are made, so this only costs O(k) rather than a scan of the board.
+    """
+    if g.state == GameState.FINISHED:
+        return eval_end_state(g, depth, maximizer)
+
+    b = g.board
+    k = b.win_count
+    open_windows = b.window_tally().open_windows
+    p1_open = open_windows[g.piece_for_player(Player.P1)]
+    p2_open = open_windows[g.piece_for_player(Player.P2)]
+
+    score = 0.0
+    for n in range(1, k):
+        score += WINDOW_GROWTH ** (n - 1) * (p1_open[n] - p2_open[n])
+
+    # Scale by the best case, every window one piece shy of a win
+    best = len(b.line_table.windows) * WINDOW_GROWTH ** (k - 2)
+    return WINDOW_SCALE * score / best
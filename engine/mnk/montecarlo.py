@@ -0,0 +1,92 @@
+import logging
+from random import Random
+
+from engine.engine import Engine
+from engine.exceptions import SearchAborted
+from engine.mcts import MCTSTree
+from engine.search_budget import SearchBudget
+from engine.search_stats import SearchStats
+from engine.typedefs import MoveGenFn
+from game.game import GameEvent
+from game.move import Move
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+class Montecarlo(Engine):
+    """
+    Montecarlo picks moves with Monte Carlo tree search (see `MCTSTree`)
+    rather than minimax, so it needs no evaluation function and its cost
+    doesn't grow exponentially with depth. That makes it the engine to use
+    on boards too large for minimax, like 15x15 with k=5.
+
+    Given a budget, `max_nodes` limits the number of playouts and
+    `time_limit_ms` the time spent on them. Without one it runs
+    PLAYOUTS_PER_PLY playouts for each of its plies, so difficulty still
+    means something.
+
+    Playouts are run PLAYOUT_BATCH at a time with NumPy.
+
+    The tree is kept between moves, re-rooted at each move played so the
+    playouts already spent on the position aren't wasted.
+    """
+
+    DEFAULT_PLIES: int = 4
+    PLAYOUTS_PER_PLY: int = 2000
+
+    # Playouts run together from each new node, see `batch_playouts`. Fewer
+    # nodes get added to the tree in the same time, but the far cheaper
+    # playouts more than make up for it
+    PLAYOUT_BATCH: int = 32
+
+    # Playouts are already batched with NumPy, and there's nothing to look up
+    # in a transposition table
+    USES_TT: bool = False
+    USES_WORKERS: bool = False
+
+    mcts: MCTSTree | None = None
+
+    def generate_game_tree(self, fn: MoveGenFn) -> None:
+        """The Montecarlo engine doesn't use a Game Tree"""
+        pass
+
+    def on_game_event(self, evt: GameEvent) -> None:
+        super().on_game_event(evt)
+
+        if self.mcts is None:
+            return
+
+        if evt == GameEvent.MOVE:
+            if not self.mcts.reroot(self.game):
+                self.mcts = None
+        else:
+            self.mcts = None
+
+    def propose_move(self) -> Move:
+        # Search a private copy so our playouts aren't broadcast to the game's
+        # event listeners
+        g = self.game.copy()
+
+        if self.mcts is None or not self.mcts.matches(g):
+            self.mcts = MCTSTree.for_game(g)
+        t = self.mcts
+
+        budget = self.budget
+        if budget is None:
+            budget = SearchBudget(max_nodes=self.max_plies * self.PLAYOUTS_PER_PLY)
+        budget.start()
+
+        rng = Random()
+        stats = SearchStats()
+        try:
+            while True:
+                t.playout(g, rng, self.PLAYOUT_BATCH)
+                stats.nodes += self.PLAYOUT_BATCH
+                budget.check_now(stats)
+        except SearchAborted:
+            pass
+
+        DEBUG(f"montecarlo: playouts={stats.nodes} tree_size={t.size}")
+
+        return t.best_move(g)
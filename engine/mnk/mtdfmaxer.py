@@ -0,0 +1,38 @@
+from engine.alphabeta import alphabeta
+from engine.engine import Engine
+from engine.game_tree import MinimaxFn
+from engine.mnk.heuristics import eval_windows
+from engine.mtdf import search_mtdf
+from engine.search_context import SearchFn
+from engine.typedefs import EvalFn
+
+
+class Mtdfmaxer(Engine):
+    """
+    Mtdfmaxer searches with MTD(f), see `search_mtdf`
+
+    Rather than one search with a wide window, MTD(f) drives a series of
+    zero-window alpha-beta searches, each of which only answers whether the
+    score is above or below a bound, until the bounds meet. Searching the
+    same tree that many times is only affordable because each pass replays
+    what the earlier ones stored in the transposition table, so with
+    `hash_mb=0` it still makes a small table of its own for every search.
+
+    The number of passes depends on the first guess. Mtdfmaxer guesses the
+    score the table already holds for the position, which under iterative
+    deepening is the previous iteration's answer.
+
+    MTD(f) only searches the game directly, with `use_game_tree` it plays
+    plain alpha-beta instead.
+
+    Positions at the search horizon are scored with `eval_windows`. Its
+    scores are far finer grained than the draws `eval_end_state` gives, so
+    the bounds take more passes to meet, roughly 8 rather than 2 on Connect
+    Four, in exchange for actually telling positions apart.
+    """
+
+    DEFAULT_PLIES: int = 7
+    EVAL_FN: EvalFn = eval_windows
+
+    MINIMAX_FN: MinimaxFn = alphabeta
+    SEARCH_FN: SearchFn = search_mtdf
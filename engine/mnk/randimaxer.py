@@ -1,7 +1,9 @@
 from engine.engine import Engine
-from engine.game_tree import EvalFn, MinimaxFn
-from engine.minimax import minimax
+from engine.game_tree import MinimaxFn
+from engine.minimax import minimax, search_minimax
 from engine.mnk.heuristics import eval_rand
+from engine.search_context import SearchFn
+from engine.typedefs import EvalFn
 
 
 class Randimaxer(Engine):
@@ -13,3 +15,4 @@ class Randimaxer(Engine):
     DEFAULT_PLIES: int = 2
     EVAL_FN: EvalFn = eval_rand
     MINIMAX_FN: MinimaxFn = minimax
+    SEARCH_FN: SearchFn = search_minimax
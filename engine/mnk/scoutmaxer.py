@@ -0,0 +1,32 @@
+from engine.alphabeta import alphabeta
+from engine.engine import Engine
+from engine.game_tree import MinimaxFn
+from engine.mnk.heuristics import eval_windows
+from engine.pvs import search_pvs
+from engine.search_context import SearchFn
+from engine.typedefs import EvalFn
+
+
+class Scoutmaxer(Engine):
+    """
+    Like Winibetamaxer but uses principal variation search (NegaScout)
+
+    PVS bets that the first move it searches is the best one, so it only
+    bothers proving the remaining moves are worse using cheap null-window
+    searches. The better the move ordering, the more often the bet pays off,
+    so Scoutmaxer does best with iterative deepening and a transposition
+    table.
+
+    PVS only searches the game directly, with `use_game_tree` it falls back
+    to plain alpha-beta.
+
+    Positions at the search horizon are scored with `eval_windows`, which
+    gives the first move a real score for the scouts to test against rather
+    than a draw that every sibling ties.
+    """
+
+    DEFAULT_PLIES: int = 7
+    EVAL_FN: EvalFn = eval_windows
+
+    MINIMAX_FN: MinimaxFn = alphabeta
+    SEARCH_FN: SearchFn = search_pvs
@@ -1,6 +1,7 @@
-from engine.alphabeta import alphabeta
+from engine.alphabeta import alphabeta, search_alphabeta
 from engine.engine import Engine
 from engine.game_tree import MinimaxFn
+from engine.search_context import SearchFn
 
 
 class Winibetamaxer(Engine):
@@ -11,3 +12,4 @@ class Winibetamaxer(Engine):
     DEFAULT_PLIES: int = 7
 
     MINIMAX_FN: MinimaxFn = alphabeta
+    SEARCH_FN: SearchFn = search_alphabeta
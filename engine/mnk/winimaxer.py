@@ -1,6 +1,7 @@
 from engine.engine import Engine
 from engine.game_tree import MinimaxFn
-from engine.minimax import minimax
+from engine.minimax import minimax, search_minimax
+from engine.search_context import SearchFn
 
 
 class Winimaxer(Engine):
@@ -27,3 +28,4 @@ class Winimaxer(Engine):
 
     # Use naive minimax w/o alpha/beta pruning
     MINIMAX_FN: MinimaxFn = minimax
+    SEARCH_FN: SearchFn = search_minimax
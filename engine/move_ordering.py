@@ -0,0 +1,85 @@
+from typing import TYPE_CHECKING
+
+from game.game import Game
+from game.move import Move
+
+# SearchContext holds a MoveOrdering, so only import it for type checking to
+# avoid an import cycle
+if TYPE_CHECKING:
+    from engine.search_context import SearchContext
+
+
+class MoveOrdering:
+    """
+    Remembers which moves caused cutoffs so they can be tried first elsewhere
+    in the search.
+
+    Alpha-beta prunes the most when the best move is searched first. We can't
+    know the best move without searching, but a move which refuted one
+    position often refutes its neighbors too:
+
+    - Killer moves: the last few moves to cause a cutoff at each ply. Sibling
+      positions tend to share refutations, like a threat the opponent must
+      block regardless of where they played last.
+
+    - History: how often, and how deeply, each move has caused a cutoff
+      anywhere in the search. A Move identifies both the piece and the cell,
+      so each player keeps their own history.
+    """
+
+    NUM_KILLERS = 2
+
+    def __init__(self) -> None:
+        # Keyed by ply, the number of moves made in the game so far
+        self.killers: dict[int, list[Move]] = {}
+        self.history: dict[Move, int] = {}
+
+    def record_cutoff(self, g: Game, m: Move, depth: int) -> None:
+        """Note that playing `m` in the current position caused a cutoff
+
+        :param depth: remaining depth of the search, cutoffs found by deeper
+        searches are more trustworthy and weigh more
+        """
+        ply = len(g.move_history)
+        killers = self.killers.setdefault(ply, [])
+        if m not in killers:
+            killers.insert(0, m)
+            del killers[self.NUM_KILLERS :]
+
+        self.history[m] = self.history.get(m, 0) + depth * depth
+
+    def sort(self, g: Game, moves: list[Move]) -> None:
+        """Sort moves in place, killers first then by history
+
+        The sort is stable so moves we know nothing about keep the move
+        generator's order.
+        """
+        killers = self.killers.get(len(g.move_history), [])
+        history = self.history
+
+        def rank(m: Move) -> tuple[int, int]:
+            if m in killers:
+                return (0, killers.index(m))
+            return (1, -history.get(m, 0))
+
+        moves.sort(key=rank)
+
+
+def order_moves(g: Game, ctx: "SearchContext", first: Move | None = None) -> list[Move]:
+    """Return the moves for the position, most promising first
+
+    If the context has a MoveOrdering, it decides the order.
+
+    :param first: a move to try before the others, typically the best move
+    from a previous search of the position. Ignored if it isn't legal here.
+    """
+    moves = list(ctx.move_gen(g))
+
+    if ctx.ordering is not None:
+        ctx.ordering.sort(g, moves)
+
+    if first is not None and first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+
+    return moves
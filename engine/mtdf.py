@@ -0,0 +1,116 @@
+import logging
+from math import inf, nextafter
+
+from engine.alphabeta import _search_alphabeta
+from engine.move_ordering import order_moves
+from engine.search_context import SearchContext
+from engine.transposition_table import Bound, TranspositionTable
+from game.game import Game
+from game.move import Move, NULL_MOVE
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# Used when the context doesn't provide a transposition table, MTD(f) is
+# hopeless without one
+FALLBACK_HASH_MB = 1.0
+
+
+def _null_window_root(
+    g: Game,
+    depth: int,
+    beta: float,
+    maximizer: bool,
+    ctx: SearchContext,
+    first: Move | None,
+) -> tuple[float, Move]:
+    """Search the root with the null window just below `beta`, which only
+    answers whether the score is at least `beta`.
+
+    Returns the fail-soft score along with the move which proved it, if any.
+    """
+    alpha = nextafter(beta, -inf)
+
+    value = -inf if maximizer else inf
+    best_move = NULL_MOVE
+
+    for m in order_moves(g, ctx, first):
+        g.apply_move(m)
+        score = _search_alphabeta(g, depth - 1, alpha, beta, not maximizer, ctx)
+        g.undo_move()
+
+        better = score > value if maximizer else score < value
+        if better or best_move is NULL_MOVE:
+            value = score
+            best_move = m
+
+        if (maximizer and value >= beta) or (not maximizer and value <= alpha):
+            break
+
+    return value, best_move
+
+
+def search_mtdf(
+    g: Game, depth: int, maximizer: bool, ctx: SearchContext
+) -> tuple[float, Move]:
+    """MTD(f), conforms to SearchFn
+
+    Rather than one search with a wide window, MTD(f) zeroes in on the score
+    with a series of null-window alpha-beta searches. Each one only answers
+    whether the score is above or below a guess, which prunes heavily, and
+    narrows the range the score can be in until it's pinned down.
+
+    Searching the same tree over and over is only cheap because each pass
+    reuses what earlier passes stored in the transposition table.
+
+    The first guess is the score stored for the position by an earlier
+    search, typically the previous iteration of iterative deepening.
+    """
+    ctx.stats.nodes += 1
+
+    if ctx.tt is None:
+        ctx.tt = TranspositionTable(FALLBACK_HASH_MB)
+    tt = ctx.tt
+
+    key = g.position_key
+
+    guess = 0.0
+    first = ctx.first_move
+    entry = tt.probe(key)
+    if entry is not None:
+        guess = entry.score
+        if first is None:
+            first = entry.move
+
+    lower = -inf
+    upper = inf
+    best_move = NULL_MOVE
+    passes = 0
+
+    while lower < upper:
+        beta = guess if guess > lower else nextafter(lower, inf)
+
+        guess, m = _null_window_root(g, depth, beta, maximizer, ctx, first)
+        passes += 1
+
+        if guess < beta:
+            upper = guess
+            # A minimizer's best move is the one which proved the upper bound
+            if not maximizer:
+                best_move = m
+        else:
+            lower = guess
+            # A maximizer's best move is the one which proved the lower bound
+            if maximizer:
+                best_move = m
+
+    tt.store(key, depth, guess, Bound.EXACT, best_move)
+
+    stats = ctx.stats
+    DEBUG(
+        f"mtdf: {depth=} {passes=} nodes={stats.nodes} cutoffs={stats.cutoffs}"
+        f" tt_hits={stats.tt_hits}"
+    )
+
+    return guess, best_move
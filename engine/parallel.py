@@ -0,0 +1,303 @@
+"""
+Searching root moves in parallel across worker processes.
+
+Each root move's subtree is independent, so the moves can be handed out to
+a pool of processes and searched at the same time. What's lost is pruning:
+searched one after another, each move is searched with the bound set by the
+moves before it. To keep most of that, the first (most promising) move is
+searched on its own to establish a bound, and as results come back the
+improved bound is handed to each move submitted after that.
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from math import inf
+
+from engine.alphabeta import _search_alphabeta, search_alphabeta
+from engine.exceptions import SearchAborted
+from engine.move_ordering import MoveOrdering, order_moves
+from engine.search_budget import SearchBudget
+from engine.search_context import SearchContext, SearchFn
+from engine.search_stats import SearchStats
+from engine.transposition_table import (
+    DEFAULT_HASH_MB,
+    Bound,
+    TranspositionTable,
+)
+from engine.typedefs import EvalFn
+from game.board import Board
+from game.game import Game, generate_moves
+from game.move import Move
+from game.piece import Piece
+from game.placement_rule import PlacementRule
+from game.player import Player
+from game.typedefs import BoardSize
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+@dataclass(frozen=True)
+class Position:
+    """
+    Enough to rebuild a Game in another process.
+
+    This is much cheaper to send than a pickled Game, which would drag along
+    its Zobrist and line tables. Workers build those once and cache them.
+    """
+
+    board_cls: type[Board]
+    size: BoardSize
+    win_count: int
+    placement_rule: PlacementRule
+    player1_piece: Piece
+    moves: tuple[Move, ...]
+
+    @classmethod
+    def from_game(cls, g: Game) -> "Position":
+        b = g.board
+        return cls(
+            board_cls=b.__class__,
+            size=b.size,
+            win_count=b.win_count,
+            placement_rule=b.placement_rule,
+            player1_piece=g.piece_for_player(Player.P1),
+            moves=tuple(g.move_history),
+        )
+
+    def game(self) -> Game:
+        b = self.board_cls(
+            size=self.size,
+            win_count=self.win_count,
+            placement_rule=self.placement_rule,
+        )
+        g = Game(b)
+        g.choose_player1_piece(self.player1_piece)
+        for m in self.moves:
+            g.apply_move(Move.of(m.cell, m.piece))
+        return g
+
+
+# Each worker keeps its own transposition table for as long as the pool
+# lives, so it stays warm from one move to the next
+_worker_tt: TranspositionTable | None = None
+_worker_search_id = 0
+
+
+def _init_worker(hash_mb: float) -> None:
+    global _worker_tt
+    if hash_mb > 0:
+        _worker_tt = TranspositionTable(hash_mb)
+
+
+def _search_root_move(
+    pos: Position,
+    m: Move,
+    depth: int,
+    alpha: float,
+    beta: float,
+    maximizer: bool,
+    search_fn: SearchFn,
+    eval_fn: EvalFn,
+    budget: SearchBudget | None,
+    search_id: int,
+) -> tuple[float, SearchStats]:
+    """Runs in a worker: search the subtree under one root move"""
+    global _worker_search_id
+    if _worker_tt is not None and search_id != _worker_search_id:
+        _worker_tt.new_search()
+        _worker_search_id = search_id
+
+    if budget is not None:
+        budget.start()
+
+    g = pos.game()
+    g.apply_move(Move.of(m.cell, m.piece))
+
+    ctx = SearchContext(
+        eval_fn=eval_fn,
+        move_gen=generate_moves,
+        tt=_worker_tt,
+        budget=budget,
+        ordering=MoveOrdering(),
+    )
+    if search_fn is search_alphabeta:
+        # Only alpha-beta can take the bound set by the moves already searched
+        score = _search_alphabeta(g, depth - 1, alpha, beta, not maximizer, ctx)
+    else:
+        score, _ = search_fn(g, depth - 1, not maximizer, ctx)
+
+    return score, ctx.stats
+
+
+class ParallelSearch:
+    """
+    Splits the root moves of an alpha-beta search across a pool of worker
+    processes.
+
+    The pool is started on first use and reused by every search after that,
+    since starting processes costs far more than a typical search. Call
+    `shutdown` when done with it.
+
+    `search` conforms to SearchFn, so it can be used anywhere a SearchFn
+    can, including with iterative deepening. Workers search each root move
+    with `search_fn`. Only alpha-beta is handed the bound from the moves
+    searched before, any other SearchFn searches its move with a full window.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        search_fn: SearchFn = search_alphabeta,
+        hash_mb: float = DEFAULT_HASH_MB,
+    ) -> None:
+        self.workers = workers
+        self.search_fn = search_fn
+        self.hash_mb = hash_mb
+        self._executor: ProcessPoolExecutor | None = None
+        self._search_id = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.hash_mb,),
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def search(
+        self, g: Game, depth: int, maximizer: bool, ctx: SearchContext
+    ) -> tuple[float, Move]:
+        """Search the game with root moves split across the pool, conforms to
+        SearchFn
+        """
+        first = ctx.first_move
+        if first is None and ctx.tt is not None:
+            entry = ctx.tt.probe(g.position_key)
+            if entry is not None:
+                first = entry.move
+
+        moves = order_moves(g, ctx, first)
+
+        # Not worth the overhead
+        if depth <= 1 or len(moves) == 1:
+            return self.search_fn(g, depth, maximizer, ctx)
+
+        ctx.stats.nodes += 1
+        self._search_id += 1
+
+        pool = self._pool()
+        pos = Position.from_game(g)
+        budget = ctx.budget
+
+        # The best score so far, which bounds the moves submitted after it
+        bound = -inf if maximizer else inf
+
+        # Moves along with the bound they were searched with
+        pending: dict[Future, tuple[Move, float]] = {}
+
+        # Moves whose score beat the bound they were searched with, and so is
+        # exact, keyed by their position in `moves`
+        exact: dict[int, float] = {}
+
+        # Nodes promised to the moves still being searched, so that between
+        # them they stay within the budget
+        promised: dict[Future, int] = {}
+
+        def submit(m: Move, parts: int) -> None:
+            if maximizer:
+                alpha, beta = bound, inf
+            else:
+                alpha, beta = -inf, bound
+
+            # Share the nodes not already promised to other moves between
+            # this move and the `parts - 1` others about to be submitted
+            task_budget = None
+            if budget is not None:
+                task_budget = budget.remaining(
+                    ctx.stats, reserved=sum(promised.values()), parts=parts
+                )
+
+            fut = pool.submit(
+                _search_root_move,
+                pos,
+                m,
+                depth,
+                alpha,
+                beta,
+                maximizer,
+                self.search_fn,
+                ctx.eval_fn,
+                task_budget,
+                self._search_id,
+            )
+            pending[fut] = (m, bound)
+            if task_budget is not None and task_budget.max_nodes is not None:
+                promised[fut] = task_budget.max_nodes
+
+        # Search the first move on its own so the rest have a bound to work
+        # with. Only once it's back do we hand out the others
+        remaining = iter(moves)
+        submit(next(remaining), 1)
+
+        try:
+            while pending:
+                timeout = None if budget is None else budget.remaining_s()
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for fut in done:
+                    m, searched_bound = pending.pop(fut)
+                    promised.pop(fut, None)
+                    score, stats = fut.result()
+                    ctx.stats.merge(stats)
+
+                    # A score which didn't beat the bound it was searched with is
+                    # only a bound itself, the move is no better than one we
+                    # already have
+                    if maximizer:
+                        beat = score > searched_bound
+                    else:
+                        beat = score < searched_bound
+
+                    if beat:
+                        exact[moves.index(m)] = score
+                        bound = max(bound, score) if maximizer else min(bound, score)
+
+                if budget is not None:
+                    budget.check_now(ctx.stats)
+
+                # Keep every worker busy
+                while len(pending) < self.workers:
+                    next_move = next(remaining, None)
+                    if next_move is None:
+                        break
+                    submit(next_move, self.workers - len(pending))
+        except SearchAborted:
+            for fut in pending:
+                fut.cancel()
+            raise
+
+        # Ties go to the earliest move, like the sequential search, so the
+        # result doesn't depend on which worker finished first
+        sign = 1 if maximizer else -1
+        best_idx = min(exact, key=lambda idx: (-sign * exact[idx], idx))
+        best_score = exact[best_idx]
+        best_move = moves[best_idx]
+
+        if ctx.tt is not None:
+            ctx.tt.store(g.position_key, depth, best_score, Bound.EXACT, best_move)
+
+        stats = ctx.stats
+        DEBUG(
+            f"parallel: {depth=} workers={self.workers} nodes={stats.nodes}"
+            f" cutoffs={stats.cutoffs}"
+        )
+
+        return best_score, best_move
@@ -0,0 +1,29 @@
+from enum import Enum, auto
+
+
+class ParallelMode(Enum):
+    """How an engine spreads its search across worker processes"""
+
+    # Each worker searches some of the root moves, see `ParallelSearch`
+    ROOT_SPLIT = auto()
+
+    # Every worker searches the whole tree, sharing a transposition table,
+    # see `LazySMPSearch`
+    LAZY_SMP = auto()
+
+    def pretty(self) -> str:
+        if self == ParallelMode.ROOT_SPLIT:
+            return "root-split"
+        elif self == ParallelMode.LAZY_SMP:
+            return "lazy-smp"
+
+        raise ValueError("unknown parallel mode")
+
+    @classmethod
+    def from_str(cls, s: str) -> "ParallelMode":
+        if s == "root-split":
+            return cls.ROOT_SPLIT
+        elif s == "lazy-smp":
+            return cls.LAZY_SMP
+
+        raise ValueError(f"unknown parallel mode: {s}")
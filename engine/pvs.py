@@ -0,0 +1,152 @@
+import logging
+from math import inf, nextafter
+
+from engine.move_ordering import order_moves
+from engine.search_context import SearchContext
+from engine.transposition_table import Bound, score_bound
+from game.game import Game, GameState
+from game.move import Move, NULL_MOVE
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+def _above(score: float) -> float:
+    """Return the smallest score greater than `score`
+
+    Scores are floats, so a null window around `alpha` is `(alpha,
+    _above(alpha))`: any score better than alpha fails high.
+    """
+    return nextafter(score, inf)
+
+
+def _pvs(
+    g: Game,
+    depth: int,
+    alpha: float,
+    beta: float,
+    color: int,
+    ctx: SearchContext,
+) -> float:
+    """Principal variation search, also known as NegaScout.
+
+    This is negamax: rather than separate maximizer and minimizer cases,
+    scores are from the point of view of the player on-move, `color` is 1 for
+    player 1 and -1 for player 2, and a child's score is negated to get ours.
+
+    We expect the first move to be the best since moves are ordered, so only
+    it is searched with the full window. Every other move is searched with a
+    null window which can only tell us whether it's better than alpha, which
+    is cheap since so much gets pruned. The rare move which turns out to be
+    better is then searched again with the full window to learn its score.
+    """
+    ctx.stats.nodes += 1
+
+    if ctx.budget is not None:
+        ctx.budget.check(ctx.stats)
+
+    # Leaf (or hit depth stop)
+    if depth == 0 or g.state == GameState.FINISHED:
+        return color * ctx.eval_fn(g, depth, color == 1)
+
+    tt = ctx.tt
+    key = 0
+    tt_move = None
+    if tt is not None:
+        key = g.position_key
+        entry = tt.probe(key)
+        if entry is not None:
+            tt_move = entry.move
+            if entry.depth >= depth and entry.settles(alpha, beta):
+                ctx.stats.tt_hits += 1
+                return entry.score
+
+    alpha_orig = alpha
+
+    value = -inf
+    best_move = None
+    for i, m in enumerate(order_moves(g, ctx, tt_move)):
+        g.apply_move(m)
+        if i == 0:
+            score = -_pvs(g, depth - 1, -beta, -alpha, -color, ctx)
+        else:
+            score = -_pvs(g, depth - 1, -_above(alpha), -alpha, -color, ctx)
+            if alpha < score < beta:
+                ctx.stats.researches += 1
+                score = -_pvs(g, depth - 1, -beta, -alpha, -color, ctx)
+        g.undo_move()
+
+        if score > value:
+            value = score
+            best_move = m
+
+        if value >= beta:
+            ctx.stats.cutoffs += 1
+            if ctx.ordering is not None:
+                ctx.ordering.record_cutoff(g, m, depth)
+            break
+
+        alpha = max(alpha, value)
+
+    if tt is not None:
+        bound = score_bound(value, alpha_orig, beta)
+        tt.store(key, depth, value, bound, best_move)
+
+    return value
+
+
+def search_pvs(
+    g: Game, depth: int, maximizer: bool, ctx: SearchContext
+) -> tuple[float, Move]:
+    """Kickoff function for principal variation search, conforms to SearchFn
+
+    The score returned is from player 1's point of view like every other
+    SearchFn, even though the search itself is negamax.
+    """
+    ctx.stats.nodes += 1
+
+    color = 1 if maximizer else -1
+
+    alpha = -inf
+    beta = inf
+
+    best_score = -inf
+    best_move = NULL_MOVE
+
+    tt = ctx.tt
+    first = ctx.first_move
+    if first is None and tt is not None:
+        entry = tt.probe(g.position_key)
+        if entry is not None:
+            first = entry.move
+
+    for m in order_moves(g, ctx, first):
+        g.apply_move(m)
+        if best_move is NULL_MOVE:
+            score = -_pvs(g, depth - 1, -beta, -alpha, -color, ctx)
+        else:
+            score = -_pvs(g, depth - 1, -_above(alpha), -alpha, -color, ctx)
+            if score > alpha:
+                ctx.stats.researches += 1
+                score = -_pvs(g, depth - 1, -beta, -alpha, -color, ctx)
+        g.undo_move()
+
+        # Strict comparison so that ties go to the earliest move, later moves
+        # which tie have only been scored with a bound
+        if score > best_score or best_move is NULL_MOVE:
+            best_score = score
+            best_move = m
+
+        alpha = max(alpha, best_score)
+
+    # The root is searched with a full window so its score is exact
+    if tt is not None:
+        tt.store(g.position_key, depth, best_score, Bound.EXACT, best_move)
+
+    stats = ctx.stats
+    DEBUG(
+        f"pvs: {depth=} nodes={stats.nodes} cutoffs={stats.cutoffs}"
+        f" researches={stats.researches} tt_hits={stats.tt_hits}"
+    )
+
+    return color * best_score, best_move
@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+from time import monotonic
+
+from engine.exceptions import SearchAborted
+from engine.search_stats import SearchStats
+
+# Reading the clock costs more than visiting a node, so only look at it every
+# so often
+CLOCK_CHECK_NODES = 1024
+
+
+@dataclass
+class SearchBudget:
+    """Limits on how much work a search may do, either may be left unset"""
+
+    time_limit_ms: int | None = None
+    max_nodes: int | None = None
+
+    _deadline: float | None = field(default=None, init=False, repr=False)
+
+    def start(self) -> None:
+        """Start the clock, call before each search"""
+        if self.time_limit_ms is None:
+            self._deadline = None
+        else:
+            self._deadline = monotonic() + self.time_limit_ms / 1000
+
+    def check(self, stats: SearchStats) -> None:
+        """Raise SearchAborted if the search has used up its budget
+
+        Cheap enough to call at every node, the clock is only read every
+        CLOCK_CHECK_NODES nodes.
+        """
+        if self.max_nodes is not None and stats.nodes > self.max_nodes:
+            raise SearchAborted(f"node limit of {self.max_nodes} reached")
+
+        if self._deadline is not None and stats.nodes % CLOCK_CHECK_NODES == 0:
+            self._check_clock()
+
+    def check_now(self, stats: SearchStats) -> None:
+        """Like `check` but always reads the clock"""
+        if self.max_nodes is not None and stats.nodes > self.max_nodes:
+            raise SearchAborted(f"node limit of {self.max_nodes} reached")
+
+        if self._deadline is not None:
+            self._check_clock()
+
+    def _check_clock(self) -> None:
+        assert self._deadline is not None
+        if monotonic() > self._deadline:
+            raise SearchAborted(f"time limit of {self.time_limit_ms}ms reached")
+
+    def remaining_s(self) -> float | None:
+        """Return the seconds left before the time limit, if there is one"""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - monotonic())
+
+    def remaining(
+        self, stats: SearchStats, reserved: int = 0, parts: int = 1
+    ) -> "SearchBudget":
+        """Return a budget for a sub-search, such as one run in another
+        process, which ends when this one does. The caller must `start` it.
+
+        Sub-searches run at the same time each count their own nodes, so to
+        keep them within the node limit between them, the nodes left are
+        split: `reserved` nodes already promised to sub-searches still
+        running are held back, and what's left is divided into `parts`.
+        """
+        time_limit_ms = None
+        remaining_s = self.remaining_s()
+        if remaining_s is not None:
+            time_limit_ms = int(remaining_s * 1000)
+
+        max_nodes = None
+        if self.max_nodes is not None:
+            max_nodes = max(0, self.max_nodes - stats.nodes - reserved) // parts
+
+        return SearchBudget(time_limit_ms=time_limit_ms, max_nodes=max_nodes)
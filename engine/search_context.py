@@ -0,0 +1,41 @@
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from engine.move_ordering import MoveOrdering
+from engine.search_budget import SearchBudget
+from engine.search_stats import SearchStats
+from engine.transposition_table import TranspositionTable
+from engine.typedefs import EvalFn, MoveGenFn
+from game.game import Game
+from game.move import Move
+
+
+@dataclass
+class SearchContext:
+    """Everything a search needs besides the position being searched"""
+
+    eval_fn: EvalFn
+    move_gen: MoveGenFn
+    stats: SearchStats = field(default_factory=SearchStats)
+
+    # Searches that support it will cache results here when provided
+    tt: TranspositionTable | None = None
+
+    # Searches that support it will raise SearchAborted once this runs out
+    budget: SearchBudget | None = None
+
+    # A move for the root to try before the others, such as the best move
+    # from the previous iteration of iterative deepening
+    first_move: Move | None = None
+
+    # Searches that support it will order moves by, and record cutoffs in,
+    # these killer and history tables
+    ordering: MoveOrdering | None = None
+
+
+# This function searches a game directly, making and unmaking moves on it in
+# place rather than building a GameTree first. The game is left as it was
+# found.
+#
+# fn(game, depth, maximizer, ctx) -> (score, best move)
+type SearchFn = Callable[[Game, int, bool, SearchContext], tuple[float, Move]]
@@ -0,0 +1,30 @@
+from dataclasses import dataclass, fields
+
+
+@dataclass
+class SearchStats:
+    """Counters describing how much work a search did"""
+
+    # Positions visited, including leaves
+    nodes: int = 0
+
+    # Times a node stopped searching its children early due to pruning
+    cutoffs: int = 0
+
+    # Times a transposition table entry settled a node without searching it
+    tt_hits: int = 0
+
+    # Deepest search completed, only set by iterative deepening
+    depth: int = 0
+
+    # Times a null-window search failed high and had to be searched again
+    # with a full window, only counted by PVS
+    researches: int = 0
+
+    def merge(self, other: "SearchStats") -> None:
+        """Add the counts from another search, such as one run in another
+        process, to ours. `depth` is left alone since it isn't a count.
+        """
+        for f in fields(self):
+            if f.name != "depth":
+                setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
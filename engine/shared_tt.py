@@ -0,0 +1,199 @@
+"""
+A transposition table which lives in shared memory so that several processes
+can search with it at once.
+"""
+
+import struct
+from multiprocessing.shared_memory import SharedMemory
+
+from engine.transposition_table import (
+    DEFAULT_HASH_MB,
+    Bound,
+    TranspositionTable,
+    TTEntry,
+)
+from game.move import Move
+from game.piece import Piece
+
+# Each slot is three 64-bit words: check, score, meta. See `_pack_meta`.
+SLOT_WORDS = 3
+WORD_BYTES = 8
+
+# Word 0 holds the generation and word 1 the capacity, slots follow
+HEADER_WORDS = 2
+
+_BOUNDS = list(Bound)
+_PIECES = {p.value: p for p in Piece}
+
+
+def _score_bits(score: float) -> int:
+    return struct.unpack("<Q", struct.pack("<d", score))[0]
+
+
+def _bits_score(bits: int) -> float:
+    return struct.unpack("<d", struct.pack("<Q", bits))[0]
+
+
+def _pack_meta(depth: int, bound: Bound, move: Move | None, generation: int) -> int:
+    """Pack everything but the key and score into a 64-bit word
+
+    bits 0-7 depth, 8-9 bound, 10-17 generation, 18-25 move row + 1 (0 for no
+    move), 26-33 move column, 34-35 move piece
+    """
+    meta = depth & 0xFF
+    meta |= _BOUNDS.index(bound) << 8
+    meta |= (generation & 0xFF) << 10
+    if move is not None:
+        row, col = move.cell
+        meta |= (row + 1) << 18
+        meta |= col << 26
+        meta |= move.piece.value << 34
+    return meta
+
+
+def _unpack_meta(meta: int) -> tuple[int, Bound, Move | None, int]:
+    depth = meta & 0xFF
+    bound = _BOUNDS[(meta >> 8) & 0x3]
+    generation = (meta >> 10) & 0xFF
+
+    move = None
+    row = (meta >> 18) & 0xFF
+    if row:
+        col = (meta >> 26) & 0xFF
+        piece = _PIECES[(meta >> 34) & 0x3]
+        move = Move.of((row - 1, col), piece)
+
+    return depth, bound, move, generation
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    A TranspositionTable stored as a fixed-size array of packed entries in
+    `multiprocessing.shared_memory`, so worker processes can share what they
+    learn.
+
+    Writes don't take a lock. Instead each slot stores `key ^ score ^ meta`
+    rather than the key itself. If two processes write a slot at the same
+    time and the words of their entries get mixed up, the check no longer
+    matches the key and the slot reads as empty. Racing writers can cost us
+    an entry but never give us a wrong one.
+
+    Generations are kept modulo 256.
+
+    The creating process owns the memory. Other processes `attach` to it by
+    name, and the owner must `unlink` it when everyone is done.
+    """
+
+    def __init__(
+        self,
+        size_mb: float = DEFAULT_HASH_MB,
+        name: str | None = None,
+    ) -> None:
+        if name is None:
+            slot_bytes = SLOT_WORDS * WORD_BYTES
+            capacity = max(1, int(size_mb * 1024 * 1024 / slot_bytes))
+            nbytes = (HEADER_WORDS + capacity * SLOT_WORDS) * WORD_BYTES
+            self._shm = SharedMemory(create=True, size=nbytes)
+            self.owner = True
+        else:
+            # The owner is responsible for cleaning up, so don't let this
+            # process' resource tracker unlink it when we exit
+            self._shm = SharedMemory(name=name, track=False)
+            self.owner = False
+
+        buf = self._shm.buf
+        assert buf is not None
+        self._words = buf.cast("Q")
+
+        # New shared memory is already zero filled, which is an empty table
+        if self.owner:
+            self._words[1] = capacity
+
+        # The mapping may be rounded up to a page, so attaching processes
+        # can't work out the capacity from its size
+        self.capacity = self._words[1]
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedTranspositionTable":
+        """Open a table created by another process"""
+        return cls(name=name)
+
+    @property  # type: ignore[override]
+    def generation(self) -> int:
+        return self._words[0]
+
+    @generation.setter
+    def generation(self, value: int) -> None:
+        self._words[0] = value & 0xFF
+
+    def clear(self) -> None:
+        self._words[0] = 0
+
+        # One slice assignment rather than a loop over millions of words
+        buf = self._shm.buf
+        assert buf is not None
+        start = HEADER_WORDS * WORD_BYTES
+        buf[start:] = bytes(len(buf) - start)
+
+    def new_search(self) -> None:
+        self.generation = self.generation + 1
+
+    def probe(self, key: int) -> TTEntry | None:
+        words = self._words
+        offset = HEADER_WORDS + (key % self.capacity) * SLOT_WORDS
+        check = words[offset]
+        score_bits = words[offset + 1]
+        meta = words[offset + 2]
+
+        if check == 0 or check ^ score_bits ^ meta != key:
+            return None
+
+        depth, bound, move, generation = _unpack_meta(meta)
+        return TTEntry(key, depth, _bits_score(score_bits), bound, move, generation)
+
+    def store(
+        self, key: int, depth: int, score: float, bound: Bound, move: Move | None
+    ) -> None:
+        words = self._words
+        offset = HEADER_WORDS + (key % self.capacity) * SLOT_WORDS
+        generation = self.generation
+
+        # Depth-preferred replacement, as in TranspositionTable
+        entry = self._probe_slot(offset)
+        if entry is not None and entry.generation == generation and entry.depth > depth:
+            return
+
+        score_bits = _score_bits(score)
+        meta = _pack_meta(depth, bound, move, generation)
+
+        words[offset] = key ^ score_bits ^ meta
+        words[offset + 1] = score_bits
+        words[offset + 2] = meta
+
+    def _probe_slot(self, offset: int) -> TTEntry | None:
+        """Return whatever entry is in the slot, whatever its key"""
+        words = self._words
+        check = words[offset]
+        if check == 0:
+            return None
+
+        score_bits = words[offset + 1]
+        meta = words[offset + 2]
+        key = check ^ score_bits ^ meta
+        depth, bound, move, generation = _unpack_meta(meta)
+        return TTEntry(key, depth, _bits_score(score_bits), bound, move, generation)
+
+    def close(self) -> None:
+        """Stop using the shared memory from this process"""
+        self._words.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory, only the owner should call this once every
+        process is done with it
+        """
+        self._shm.unlink()
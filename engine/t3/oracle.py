@@ -0,0 +1,186 @@
+"""
+Tic-tac-toe, solved.
+
+There are only 5,478 positions reachable in tic-tac-toe, 765 once positions
+which are rotations or reflections of each other are counted once. That's
+few enough to solve every one of them up front and look up the best move
+rather than search for it.
+
+Positions are solved retrograde: first every position is found by playing
+forward from the empty board, one ply at a time, and then the plies are
+solved in reverse. A finished game's value is its result. Every other
+position's value follows from its children, which sit one ply further on and
+so have already been solved.
+"""
+
+import logging
+
+from engine.engine import Engine
+from engine.exceptions import EngineException
+from engine.typedefs import MoveGenFn
+from game.board import Board
+from game.game import Game, GameState
+from game.game_choice import GameChoice
+from game.move import Move
+from game.piece import Piece
+from game.player import Player
+from game.result import Result
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# Entries pack a position's value with its best move, see `_pack`
+NO_MOVE = 0xFF
+VALUE_OFFSET = 0x10
+
+# Solved positions, keyed by canonical position key. Keys include whose turn
+# it is and which piece they play, so tables for either choice of player 1
+# piece can share one dict.
+_table: dict[int, int] = {}
+_solved: set[Piece] = set()
+
+
+def _pack(value: int, cell_idx: int) -> int:
+    """Pack a position's value and the flat index of its best move, in the
+    canonical frame, into one int
+
+    The value is from player 1's point of view: 0 for a draw, positive for a
+    win and negative for a loss, larger the sooner the game is won.
+    """
+    return ((value + VALUE_OFFSET) << 8) | cell_idx
+
+
+def _unpack(entry: int) -> tuple[int, int]:
+    return (entry >> 8) - VALUE_OFFSET, entry & 0xFF
+
+
+def _terminal_value(g: Game) -> int:
+    # Counting the empty cells left makes quicker wins worth more
+    margin = 1 + g.board.num_empty_cells()
+    if g.result == Result.PLAYER1_VICTORY:
+        return margin
+    elif g.result == Result.PLAYER2_VICTORY:
+        return -margin
+    return 0
+
+
+def _new_game(player1_piece: Piece) -> Game:
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(player1_piece)
+    return g
+
+
+def solve(player1_piece: Piece) -> None:
+    """Solve every position reachable with player 1 playing `player1_piece`,
+    if we haven't already
+    """
+    if player1_piece in _solved:
+        return
+
+    g = _new_game(player1_piece)
+    _, cols = g.board.size
+
+    # Play forward, keeping one representative of each canonical position
+    # per ply
+    key, _ = g.canonical_position_key()
+    plies: list[dict[int, Game]] = [{key: g}]
+    while plies[-1]:
+        layer: dict[int, Game] = {}
+        for pos in plies[-1].values():
+            if pos.state == GameState.FINISHED:
+                continue
+            for m in list(pos.generate_moves()):
+                pos.apply_move(m)
+                key, _ = pos.canonical_position_key()
+                if key not in layer:
+                    layer[key] = pos.copy()
+                pos.undo_move()
+        plies.append(layer)
+
+    # Solve backwards from the last ply
+    for layer in reversed(plies):
+        for key, pos in layer.items():
+            if pos.state == GameState.FINISHED:
+                _table[key] = _pack(_terminal_value(pos), NO_MOVE)
+                continue
+
+            _, sym = pos.canonical_position_key()
+            maximizer = pos.cur_player == Player.P1
+
+            best_value = 0
+            best_move: Move | None = None
+            for m in list(pos.generate_moves()):
+                pos.apply_move(m)
+                child_key, _ = pos.canonical_position_key()
+                pos.undo_move()
+
+                value, _ = _unpack(_table[child_key])
+                better = value > best_value if maximizer else value < best_value
+                if best_move is None or better:
+                    best_value = value
+                    best_move = m
+
+            assert best_move is not None
+            row, col = sym.transform_cell(best_move.cell, pos.board.size)
+            _table[key] = _pack(best_value, row * cols + col)
+
+    _solved.add(player1_piece)
+
+    num_positions = sum(len(x) for x in plies)
+    DEBUG(f"oracle: solved {num_positions} positions for {player1_piece}")
+
+
+def lookup(g: Game) -> tuple[int, Move | None]:
+    """Return the value of the game's position with perfect play, from
+    player 1's point of view, and the best move, if the game isn't over
+    """
+    solve(g.piece_for_player(Player.P1))
+
+    key, sym = g.canonical_position_key()
+    value, cell_idx = _unpack(_table[key])
+    if cell_idx == NO_MOVE:
+        return value, None
+
+    size = g.board.size
+    _, cols = size
+    cell = sym.inverse().transform_cell(divmod(cell_idx, cols), size)
+    return value, Move.of(cell, g.cur_piece)
+
+
+class Oracle(Engine):
+    """
+    Oracle plays perfect tic-tac-toe by looking up each move in a table of
+    every position, solved the first time it's needed. It never loses, and
+    wins as quickly as it can when its opponent slips.
+
+    It only knows standard tic-tac-toe.
+    """
+
+    USES_TT: bool = False
+    USES_WORKERS: bool = False
+
+    def __init__(self, g: Game, p: Player, *args, **kwargs) -> None:
+        params = GameChoice.TIC_TAC_TOE.parameters()
+        assert params is not None
+
+        b = g.board
+        if (b.size, b.win_count, b.placement_rule) != (
+            params.size,
+            params.win_count,
+            params.placement_rule,
+        ):
+            raise EngineException("oracle only plays tic-tac-toe")
+
+        super().__init__(g, p, *args, **kwargs)
+
+    def generate_game_tree(self, fn: MoveGenFn) -> None:
+        """The Oracle engine doesn't use a Game Tree"""
+        pass
+
+    def propose_move(self) -> Move:
+        _, m = lookup(self.game)
+        assert m is not None, "game is already over"
+        return m
@@ -0,0 +1,193 @@
+"""
+Lazy SMP on threads, for free-threaded builds of Python.
+
+With the GIL disabled threads really do run at the same time, and unlike
+processes they can share ordinary objects. Workers search copies of the
+Game directly rather than rebuilding it from a Position, and share the
+engine's own transposition table and move history rather than copies of
+them.
+
+With the GIL enabled threads would take turns on one core, so engines use
+`LazySMPSearch` and its processes instead, see `gil_enabled`.
+"""
+
+import logging
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from random import Random
+from threading import Event
+
+from engine.exceptions import SearchAborted
+from engine.lazy_smp import _shuffled_moves, _StoppableBudget
+from engine.move_ordering import MoveOrdering
+from engine.search_context import SearchContext, SearchFn
+from engine.search_stats import SearchStats
+from engine.transposition_table import DEFAULT_HASH_MB, TranspositionTable
+from engine.typedefs import MoveGenFn
+from game.game import Game, generate_moves
+from game.move import Move
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+def gil_enabled() -> bool:
+    """Return whether the GIL is enabled, which it always is before 3.13 and
+    on builds without free-threading support
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    if is_gil_enabled is None:
+        return True
+    return is_gil_enabled()
+
+
+class ThreadedSearch:
+    """
+    Runs the same search in a pool of worker threads which share one
+    TranspositionTable and one move history, and takes the result of the
+    first search to finish.
+
+    As in LazySMPSearch every worker searches to the same depth and all but
+    the first shuffle their move order, so once one finishes the rest are
+    called off.
+
+    The table is the context's, if it has one, and otherwise one kept by the
+    search, unless `hash_mb=0` in which case workers search without. Entries are only ever
+    replaced whole, never changed in place, so threads can share it without
+    a lock. Racing updates to the history can lose a bonus, which costs
+    nothing but a slightly worse move order.
+
+    The pool is created on first use and kept until `shutdown`. `search`
+    conforms to SearchFn.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        search_fn: SearchFn,
+        hash_mb: float = DEFAULT_HASH_MB,
+    ) -> None:
+        self.workers = workers
+        self.search_fn = search_fn
+        self.hash_mb = hash_mb
+        self._executor: ThreadPoolExecutor | None = None
+
+        # Only used when the context doesn't bring a table of its own
+        self._tt: TranspositionTable | None = None
+        self._search_id = 0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def _search_worker(
+        self,
+        g: Game,
+        depth: int,
+        maximizer: bool,
+        ctx: SearchContext,
+    ) -> tuple[float, Move, SearchStats]:
+        """Runs in a worker thread: search the whole position"""
+        assert ctx.budget is not None
+        ctx.budget.start()
+        score, m = self.search_fn(g, depth, maximizer, ctx)
+        return score, m, ctx.stats
+
+    def search(
+        self, g: Game, depth: int, maximizer: bool, ctx: SearchContext
+    ) -> tuple[float, Move]:
+        """Search the game with every worker at once, conforms to SearchFn"""
+        pool = self._pool()
+        self._search_id += 1
+
+        tt = ctx.tt
+        if tt is None and self.hash_mb > 0:
+            if self._tt is None:
+                self._tt = TranspositionTable(self.hash_mb)
+            tt = self._tt
+            tt.new_search()
+
+        history = {} if ctx.ordering is None else ctx.ordering.history
+        budget = ctx.budget
+        stop = Event()
+
+        pending: dict[Future, int] = {}
+        for i in range(self.workers):
+            move_gen: MoveGenFn = generate_moves
+            if i > 0:
+                move_gen = _shuffled_moves(Random(self._search_id * self.workers + i))
+
+            # Every worker counts its own nodes, so split the nodes left
+            # between them
+            task_budget = None
+            if budget is not None:
+                task_budget = budget.remaining(ctx.stats, parts=self.workers)
+            ordering = MoveOrdering()
+            ordering.history = history
+
+            task_ctx = SearchContext(
+                eval_fn=ctx.eval_fn,
+                move_gen=move_gen,
+                tt=tt,
+                budget=_StoppableBudget(task_budget, stop.is_set),
+                first_move=ctx.first_move,
+                ordering=ordering,
+            )
+            fut = pool.submit(
+                self._search_worker, g.copy(), depth, maximizer, task_ctx
+            )
+            pending[fut] = i
+
+        # worker -> result of each search which finished
+        results: dict[int, tuple[float, Move]] = {}
+
+        # Wait for the first search to finish, or for time to run out
+        while pending and not results:
+            timeout = None if budget is None else budget.remaining_s()
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                break
+
+            for fut in done:
+                i = pending.pop(fut)
+                try:
+                    score, m, stats = fut.result()
+                except SearchAborted:
+                    continue
+                ctx.stats.merge(stats)
+                results[i] = (score, m)
+
+        # Call off the rest. They notice within a node, but one may still
+        # finish in the meantime, so wait for them and keep whatever they
+        # found.
+        stop.set()
+        for fut, i in pending.items():
+            try:
+                score, m, stats = fut.result()
+            except SearchAborted:
+                continue
+            ctx.stats.merge(stats)
+            results[i] = (score, m)
+
+        if not results:
+            raise SearchAborted("no worker finished its search")
+
+        # They all searched to the same depth, prefer worker 0's result since
+        # it's what a single thread would have found
+        best_worker = min(results)
+        score, m = results[best_worker]
+
+        stats = ctx.stats
+        DEBUG(
+            f"threaded: {depth=} {best_worker=}"
+            f" workers={self.workers} nodes={stats.nodes}"
+        )
+
+        return score, m
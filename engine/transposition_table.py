@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+
+from game.move import Move
+
+# Rough CPython footprint of one slot: the TTEntry object with its fields plus
+# the list pointer to it. Only used to turn a memory cap into a slot count.
+ENTRY_BYTES = 160
+
+DEFAULT_HASH_MB = 16.0
+
+
+class Bound(Enum):
+    """How a stored score relates to the position's true score.
+
+    With alpha-beta a search that falls outside of its window only proves a
+    bound: failing high proves the score is at least the stored score, failing
+    low proves it is at most the stored score.
+    """
+
+    EXACT = auto()
+    LOWER = auto()
+    UPPER = auto()
+
+
+@dataclass(slots=True)
+class TTEntry:
+    key: int
+    depth: int
+    score: float
+    bound: Bound
+    move: Move | None
+
+    # Which search stored this entry, see `TranspositionTable.new_search`
+    generation: int
+
+    def settles(self, alpha: float, beta: float) -> bool:
+        """Return True if the stored score is enough to answer a search with
+        the given window without searching
+        """
+        if self.bound == Bound.EXACT:
+            return True
+        elif self.bound == Bound.LOWER:
+            return self.score >= beta
+        elif self.bound == Bound.UPPER:
+            return self.score <= alpha
+        return False
+
+
+def score_bound(score: float, alpha: float, beta: float) -> Bound:
+    """Return what a fail-soft score from a search with the given window
+    proves about the true score
+    """
+    if score <= alpha:
+        return Bound.UPPER
+    elif score >= beta:
+        return Bound.LOWER
+    return Bound.EXACT
+
+
+class TranspositionTable:
+    """
+    A fixed-size cache of search results keyed by `Game.position_key`.
+
+    In tic-tac-toe and Connect Four the same position is reached by many move
+    orders. Caching what we learned about a position means each is only
+    searched once.
+
+    The table has a fixed number of slots and a key maps to exactly one of
+    them. When two positions collide on a slot, the one searched deeper is
+    kept since it represents more work, unless the existing entry is left over
+    from a previous search in which case it's always replaced.
+    """
+
+    def __init__(self, size_mb: float = DEFAULT_HASH_MB) -> None:
+        self.capacity = max(1, int(size_mb * 1024 * 1024 / ENTRY_BYTES))
+        self._slots: list[TTEntry | None] = [None for _ in range(self.capacity)]
+        self.generation = 0
+
+    def clear(self) -> None:
+        self._slots = [None for _ in range(self.capacity)]
+
+    def new_search(self) -> None:
+        """Mark existing entries as stale so they are the first to be replaced.
+
+        Stale entries are still returned by `probe` since a position's score
+        doesn't depend on which search found it.
+        """
+        self.generation += 1
+
+    def probe(self, key: int) -> TTEntry | None:
+        """Return the entry for the position, if we have one"""
+        entry = self._slots[key % self.capacity]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(
+        self, key: int, depth: int, score: float, bound: Bound, move: Move | None
+    ) -> None:
+        idx = key % self.capacity
+        entry = self._slots[idx]
+
+        # Depth-preferred replacement
+        if (
+            entry is not None
+            and entry.generation == self.generation
+            and entry.depth > depth
+        ):
+            return
+
+        self._slots[idx] = TTEntry(key, depth, score, bound, move, self.generation)
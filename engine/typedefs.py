@@ -0,0 +1,17 @@
+from collections.abc import Callable
+from typing import Generator
+
+from game.game import Game
+from game.move import Move
+
+# This function evaluates a position, typically right after a move
+#
+# fn(game, depth, maximizer) -> score
+type EvalFn = Callable[[Game, int, bool], float]
+
+# A move generator is a function that given a Game produces Moves
+#
+# It's more efficient if the move generator emits promising moves first
+#
+# fn(game) -> Gen(Move, ...)
+type MoveGenFn = Callable[[Game], Generator[Move]]
@@ -0,0 +1,277 @@
+from collections.abc import Generator
+
+from game.board import Board
+from game.exceptions import CellBoundsException, IllegalMove
+from game.move import Move
+from game.piece import Piece
+from game.placement_rule import PlacementRule
+from game.typedefs import BoardSize, Cell
+from game.win_detector import WinDetector
+
+
+class BitBoard(Board):
+    """
+    A Board which stores its pieces as one integer bitmask per piece.
+
+    Cells are laid out row-major with one extra, always empty, padding column
+    at the end of each row. The padding means that shifting a mask in any of
+    the four line directions can never wrap a run of pieces from one row onto
+    the next, so win detection is a handful of shifts and ANDs.
+
+    The masks are plain int attributes, `_x` and `_o`, rather than a mapping
+    keyed by Piece, since `cell_value` is called for nearly every node of a
+    search.
+
+    Moves, copies and the list of playable cells all work from the masks and
+    column heights, so none of them go through the table Board's per-cell
+    bookkeeping. The Zobrist key is still kept incrementally, one XOR per
+    move, since the transposition table reads it at every node; the symmetry
+    keys and window tally stay lazy, as they are for the table Board.
+
+    This makes a board cheap, but a search still pays for the Game, Move and
+    evaluation around it, which is where most of a node's time goes. Engines
+    that want raw bitboard speed, like Bitmaxer, search the masks directly.
+    """
+
+    def __init__(
+        self,
+        size: BoardSize = (3, 3),
+        win_count: int = 3,
+        placement_rule: PlacementRule = PlacementRule.ANYWHERE,
+    ) -> None:
+        rows, cols = size
+        self._stride: int = cols + 1
+
+        # -, |, \ and /
+        stride = self._stride
+        self._shifts: tuple[int, ...] = (1, stride, stride + 1, stride - 1)
+
+        # Every cell which isn't padding
+        row_mask = (1 << cols) - 1
+        self._full_mask: int = 0
+        for row in range(rows):
+            self._full_mask |= row_mask << (row * stride)
+
+        # Cell for each bit index, None for the padding column
+        self._bit_cells: list[Cell | None] = []
+        for row in range(rows):
+            self._bit_cells.extend((row, col) for col in range(cols))
+            self._bit_cells.append(None)
+
+        super().__init__(size=size, win_count=win_count, placement_rule=placement_rule)
+
+        # Looked up once, hashing a Piece to index `zobrist.piece_keys` isn't
+        # free
+        self._x_keys: list[int] = self.zobrist.piece_keys[Piece.X]
+        self._o_keys: list[int] = self.zobrist.piece_keys[Piece.O]
+
+    def cell_value(self, cell: Cell) -> Piece:
+        """Return the piece at the given cell location"""
+        row, col = cell
+        bit = 1 << (row * self._stride + col)
+        if self._x & bit:
+            return Piece.X
+        elif self._o & bit:
+            return Piece.O
+        return Piece._
+
+    def _remove_pieces_from_board(self) -> None:
+        self._x: int = 0
+        self._o: int = 0
+
+    def _reset_bookkeeping(self) -> None:
+        """Reset the running counts, the masks stand in for the table Board's
+        set of playable cells
+        """
+        _, cols = self.size
+
+        self._num_pieces: int = 0
+        self.hash_key: int = 0
+        self._sym_keys: list[int] | None = None
+        self._heights: list[int] = [0 for _ in range(cols)]
+        self._tally = None
+
+    def _set_cell_value(self, cell: Cell, piece: Piece) -> None:
+        """Store the piece at the given cell location, no rules are checked"""
+        row, col = cell
+        bit = 1 << (row * self._stride + col)
+        if piece is Piece.X:
+            self._x |= bit
+        else:
+            self._o |= bit
+
+    def _clear_cell_value(self, cell: Cell) -> None:
+        """Remove the piece at the given cell location, no rules are checked"""
+        row, col = cell
+        bit = ~(1 << (row * self._stride + col))
+        self._x &= bit
+        self._o &= bit
+
+    def full(self) -> bool:
+        """Return True if the board is full of pieces"""
+        return (self._x | self._o) == self._full_mask
+
+    def win(self) -> bool:
+        """Return True if a winning sequence is present"""
+        shifts = self._shifts
+        k = self.win_count
+        return _mask_win(self._x, shifts, k) or _mask_win(self._o, shifts, k)
+
+    def check_move(self, m: Move) -> bool:
+        """Return True if the move just played completed a winning sequence
+
+        Only the mover's mask can have gained a line, and checking the whole
+        mask is cheaper than walking outward from the cell.
+        """
+        mask = self._x if m.piece is Piece.X else self._o
+        return _mask_win(mask, self._shifts, self.win_count)
+
+    def apply_move(self, m: Move) -> None:
+        piece = m.piece
+        if piece is Piece._:
+            raise IllegalMove(f"piece cannot be blank ({m=})")
+
+        rows, cols = self.size
+        row, col = m.cell
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise CellBoundsException(f"cell out of bounds ({m=} b={self})")
+
+        bit = 1 << (row * self._stride + col)
+        if (self._x | self._o) & bit:
+            raise IllegalMove(f"cell already occupied by piece ({m=})")
+
+        heights = self._heights
+        stacks = self.placement_rule == PlacementRule.COLUMN_STACK
+        if stacks and row != rows - heights[col] - 1:
+            raise IllegalMove(f"move must stack ({m=})")
+
+        if piece is Piece.X:
+            self._x |= bit
+        else:
+            self._o |= bit
+
+        self._num_pieces += 1
+        heights[col] += 1
+        idx = row * cols + col
+        self._hash_move(m, idx)
+        if self._tally is not None:
+            self._tally.add(idx, piece)
+
+    def undo_move(self, m: Move) -> None:
+        """Take back a move.
+
+        The move must be the most recently applied move that hasn't already
+        been undone, which is what lets us restore the running counts in O(1).
+        """
+        rows, cols = self.size
+        row, col = m.cell
+        if not (0 <= row < rows and 0 <= col < cols):
+            raise IllegalMove(f"move isn't on the board ({m=})")
+
+        bit = 1 << (row * self._stride + col)
+        if m.piece is Piece.X:
+            if not self._x & bit:
+                raise IllegalMove(f"move isn't on the board ({m=})")
+        elif not self._o & bit:
+            raise IllegalMove(f"move isn't on the board ({m=})")
+
+        heights = self._heights
+        stacks = self.placement_rule == PlacementRule.COLUMN_STACK
+        if stacks and row != rows - heights[col]:
+            raise IllegalMove(f"move must be top of its column ({m=})")
+
+        if m.piece is Piece.X:
+            self._x ^= bit
+        else:
+            self._o ^= bit
+
+        self._num_pieces -= 1
+        heights[col] -= 1
+        idx = row * cols + col
+        self._hash_move(m, idx)
+        if self._tally is not None:
+            self._tally.remove(idx, m.piece)
+
+    def _hash_move(self, m: Move, idx: int) -> None:
+        """Toggle the move's piece, at cell index `idx`, in the Zobrist key and
+        in the symmetry keys if they're being kept
+        """
+        piece_keys = self._x_keys if m.piece is Piece.X else self._o_keys
+        self.hash_key ^= piece_keys[idx]
+
+        if self._sym_keys is not None:
+            for i, (_, cmap) in enumerate(self._sym_maps):
+                self._sym_keys[i] ^= piece_keys[cmap[idx]]
+
+    def playable_cells(self) -> Generator[Cell]:
+        """Yield all cells which are playable on the board given the specified
+        board's placement_rule.
+        """
+        rows, cols = self.size
+        pr = self.placement_rule
+        if pr == PlacementRule.ANYWHERE:
+            bit_cells = self._bit_cells
+            empty = self._full_mask & ~(self._x | self._o)
+            while empty:
+                low = empty & -empty
+                cell = bit_cells[low.bit_length() - 1]
+                assert cell is not None
+                yield cell
+                empty ^= low
+        elif pr == PlacementRule.COLUMN_STACK:
+            heights = self._heights
+            for col in range(cols):
+                height = heights[col]
+                if height < rows:
+                    yield (rows - height - 1, col)
+        else:
+            raise ValueError(f"unknown placement rule {pr}")
+
+    def copy(self) -> "BitBoard":
+        b1 = self
+
+        # Skip __init__, everything but the masks and running counts is
+        # immutable and can be shared with the original
+        b2 = object.__new__(BitBoard)
+
+        b2.size = b1.size
+        b2.win_count = b1.win_count
+        b2.placement_rule = b1.placement_rule
+        b2.line_table = b1.line_table
+        b2.win_detector = WinDetector(b2)
+        b2.zobrist = b1.zobrist
+        b2._sym_maps = b1._sym_maps
+        b2._x_keys = b1._x_keys
+        b2._o_keys = b1._o_keys
+
+        b2._stride = b1._stride
+        b2._shifts = b1._shifts
+        b2._full_mask = b1._full_mask
+        b2._bit_cells = b1._bit_cells
+        b2._x = b1._x
+        b2._o = b1._o
+
+        b2._num_pieces = b1._num_pieces
+        b2._heights = b1._heights.copy()
+        b2.hash_key = b1.hash_key
+        b2._sym_keys = None if b1._sym_keys is None else b1._sym_keys.copy()
+        b2._tally = None if b1._tally is None else b1._tally.copy()
+
+        return b2
+
+
+def _mask_win(mask: int, shifts: tuple[int, ...], win_count: int) -> bool:
+    """Return True if the mask contains `win_count` set bits in a line along
+    any of the given shifts
+    """
+    for shift in shifts:
+        run = mask
+        for i in range(1, win_count):
+            run &= mask >> (shift * i)
+            if not run:
+                break
+
+        if run:
+            return True
+
+    return False
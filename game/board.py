@@ -1,15 +1,20 @@
-from copy import deepcopy
 import re
 import string
 from typing import Generator
 
+from game.board_backend import BoardBackend
 from game.dim import within_bounds
 from game.exceptions import CellBoundsException, IllegalMove
 from game.game_parameters import GameParameters
+from game.index_set import IndexSet
+from game.line_table import line_table
 from game.move import Move
 from game.placement_rule import PlacementRule
 from game.piece import Piece
+from game.symmetry import Symmetry, symmetry_cell_maps
 from game.typedefs import BoardSize, Cell
+from game.window_tally import WindowTally
+from game.zobrist import zobrist_table
 
 RE_MOVE_CELL = re.compile(r"([a-zA-Z])(\d)")
 
@@ -45,7 +50,13 @@ class Board:
         self.size: BoardSize = size
         self.win_count: int = win_count
         self.placement_rule: PlacementRule = placement_rule
+        self.line_table = line_table(size, win_count)
         self.win_detector = WinDetector(self)
+        self.zobrist = zobrist_table(size)
+
+        # Symmetries other than IDENTITY, which `hash_key` already covers
+        self._sym_maps = symmetry_cell_maps(size, placement_rule)[1:]
+
         self.reset()
 
     def cell_value(self, cell: Cell) -> Piece:
@@ -55,8 +66,38 @@ class Board:
 
     def reset(self) -> None:
         self._remove_pieces_from_board()
+        self._reset_bookkeeping()
         self.win_detector.reset()
 
+    def _reset_bookkeeping(self) -> None:
+        """Reset the running counts we keep so that questions like 'is the
+        board full?' or 'where can I play?' don't require scanning the board.
+        """
+        rows, cols = self.size
+
+        self._num_pieces: int = 0
+
+        # Zobrist hash of the pieces on the board, see `game.zobrist`
+        self.hash_key: int = 0
+
+        # Zobrist hash of the board as seen through each symmetry. Only
+        # `canonical_key` needs these, so they aren't kept up to date until
+        # it's first called
+        self._sym_keys: list[int] | None = None
+
+        # Number of pieces in each column
+        self._heights: list[int] = [0 for _ in range(cols)]
+
+        # For COLUMN_STACK, these are the columns that aren't full, otherwise
+        # they are the indexes of the empty cells
+        if self.placement_rule == PlacementRule.COLUMN_STACK:
+            self._playable = IndexSet(cols)
+        else:
+            self._playable = IndexSet(rows * cols)
+
+        # Built on first use by `window_tally`, most boards never need it
+        self._tally: WindowTally | None = None
+
     def _remove_pieces_from_board(self) -> None:
         rows, cols = self.size
         tbl = []
@@ -65,18 +106,36 @@ class Board:
             tbl.append(row)
         self._tbl = tbl
 
+    def _set_cell_value(self, cell: Cell, piece: Piece) -> None:
+        """Store the piece at the given cell location, no rules are checked"""
+        row, col = cell
+        self._tbl[row][col] = piece
+
+    def _clear_cell_value(self, cell: Cell) -> None:
+        """Remove the piece at the given cell location, no rules are checked"""
+        row, col = cell
+        self._tbl[row][col] = Piece._
+
     def full(self) -> bool:
         """Return True if the board is full of pieces"""
-        for row in self._tbl:
-            for piece in row:
-                if piece == Piece._:
-                    return False
-        return True
+        rows, cols = self.size
+        return self._num_pieces == rows * cols
+
+    def num_empty_cells(self) -> int:
+        """Return how many cells are still empty, an upper bound on how many
+        moves are left in the game
+        """
+        rows, cols = self.size
+        return rows * cols - self._num_pieces
 
     def win(self) -> bool:
         """Return True if a winning sequence is present"""
         return self.win_detector.win()
 
+    def check_move(self, m: Move) -> bool:
+        """Return True if the move just played completed a winning sequence"""
+        return self.win_detector.check_move(m)
+
     @classmethod
     def cell_in_bounds(self, cell: Cell, sz: BoardSize) -> bool:
         """Returns True if the cell is within the bounds of the board"""
@@ -114,9 +173,11 @@ class Board:
 
             pretty_tbl.append(row_heading_str)
 
-        for idx, row in enumerate(self._tbl):
+        rows, _ = self.size
+        for idx in range(rows):
             pretty_row = []
-            for piece in row:
+            for col in range(cols):
+                piece = self.cell_value((idx, col))
                 piece_str = piece.pretty().center(cell_width)
                 pretty_row.append(piece_str)
 
@@ -129,7 +190,7 @@ class Board:
 
             pretty_tbl.append(pretty_row_str)
 
-            last_row = idx == len(self._tbl) - 1
+            last_row = idx == rows - 1
             if not last_row:
                 pretty_tbl.append(horiz_line)
 
@@ -142,10 +203,14 @@ class Board:
         Returns -1 if there are no empty cells in column
         """
         rows, _ = self.size
+
+        # Pieces stack from the bottom so the height tells us where the top is
+        if self.placement_rule == PlacementRule.COLUMN_STACK:
+            return rows - self._heights[col] - 1
+
         for idx in range(rows):
             row = rows - idx - 1
-            piece = self._tbl[row][col]
-            if piece == Piece._:
+            if self.cell_value((row, col)) == Piece._:
                 return row
         return -1
 
@@ -171,14 +236,137 @@ class Board:
         if not Board.cell_in_bounds(m.cell, self.size):
             raise CellBoundsException(f"cell out of bounds ({m=} {b=})")
 
-        r = self._tbl[m.row]
-
-        if r[m.col] != Piece._:
+        if self.cell_value(m.cell) != Piece._:
             raise IllegalMove(f"cell already occupied by piece ({m=})")
 
         self._check_piece_placement_rule(m)
 
-        r[m.col] = m.piece
+        self._set_cell_value(m.cell, m.piece)
+        self._track_move(m)
+
+    def _track_move(self, m: Move) -> None:
+        """Update running counts to account for a newly placed piece"""
+        rows, cols = self.size
+        row, col = m.cell
+
+        self._num_pieces += 1
+        self._heights[col] += 1
+        self._hash_piece(m)
+
+        if self._tally is not None:
+            self._tally.add(row * cols + col, m.piece)
+
+        if self.placement_rule == PlacementRule.COLUMN_STACK:
+            if self._heights[col] == rows:
+                self._playable.remove(col)
+        else:
+            self._playable.remove(row * cols + col)
+
+    def undo_move(self, m: Move) -> None:
+        """Take back a move.
+
+        The move must be the most recently applied move that hasn't already
+        been undone, which is what lets us restore the running counts in O(1).
+        """
+        if self.cell_value(m.cell) != m.piece:
+            raise IllegalMove(f"move isn't on the board ({m=})")
+
+        row, col = m.cell
+        stacks = self.placement_rule == PlacementRule.COLUMN_STACK
+        if stacks and row != self.top_empty_row_for_column(col) + 1:
+            raise IllegalMove(f"move must be top of its column ({m=})")
+
+        self._clear_cell_value(m.cell)
+        self._untrack_move(m)
+
+    def _untrack_move(self, m: Move) -> None:
+        """Update running counts to account for a removed piece"""
+        rows, cols = self.size
+        row, col = m.cell
+
+        if self.placement_rule == PlacementRule.COLUMN_STACK:
+            if self._heights[col] == rows:
+                self._playable.restore(col)
+        else:
+            self._playable.restore(row * cols + col)
+
+        self._num_pieces -= 1
+        self._heights[col] -= 1
+        self._hash_piece(m)
+
+        if self._tally is not None:
+            self._tally.remove(row * cols + col, m.piece)
+
+    def _hash_piece(self, m: Move) -> None:
+        """Toggle the move's piece in the Zobrist keys"""
+        _, cols = self.size
+        row, col = m.cell
+        idx = row * cols + col
+
+        piece_keys = self.zobrist.piece_keys[m.piece]
+        self.hash_key ^= piece_keys[idx]
+
+        sym_keys = self._sym_keys
+        if sym_keys is not None:
+            for i, (_, cmap) in enumerate(self._sym_maps):
+                sym_keys[i] ^= piece_keys[cmap[idx]]
+
+    def _scan_sym_keys(self) -> list[int]:
+        """Return the Zobrist hash of the board as seen through each symmetry,
+        computed from scratch
+        """
+        sym_keys = [0 for _ in self._sym_maps]
+        piece_keys = self.zobrist.piece_keys
+        for idx, cell in enumerate(self.line_table.cells):
+            piece = self.cell_value(cell)
+            if piece == Piece._:
+                continue
+
+            keys = piece_keys[piece]
+            for i, (_, cmap) in enumerate(self._sym_maps):
+                sym_keys[i] ^= keys[cmap[idx]]
+
+        return sym_keys
+
+    def window_tally(self) -> WindowTally:
+        """Return the count of pieces in each win-line window, see
+        `WindowTally`.
+
+        The first call scans the board, after that the tally is kept up to
+        date as moves are applied and undone.
+        """
+        if self._tally is None:
+            tally = WindowTally(self.line_table)
+            for idx, cell in enumerate(self.line_table.cells):
+                piece = self.cell_value(cell)
+                if piece != Piece._:
+                    tally.add(idx, piece)
+            self._tally = tally
+        return self._tally
+
+    def canonical_key(self) -> tuple[int, Symmetry]:
+        """Return the smallest hash key over all of the board's symmetries,
+        along with the symmetry which produced it.
+
+        Positions which are rotations or reflections of each other share a
+        canonical key. To map a move from this board into the canonical frame,
+        use `sym.transform_cell`; to map one back, use the `sym.inverse()`.
+
+        The first call scans the board, after that the symmetry keys are kept
+        up to date as moves are applied and undone.
+        """
+        if self._sym_keys is None:
+            self._sym_keys = self._scan_sym_keys()
+
+        best_key = self.hash_key
+        best_sym = Symmetry.IDENTITY
+
+        for (sym, _), key in zip(self._sym_maps, self._sym_keys):
+            if key < best_key:
+                best_key = key
+                best_sym = sym
+
+        return best_key, best_sym
 
     def _parse_column_letter(self, col_letter: str) -> int:
         """Returns index associated with a given column letter
@@ -246,39 +434,19 @@ class Board:
 
         return self._parse_cell(token)
 
-    def _blank_cells(self) -> Generator[Cell]:
-        """Yield all unoccupied cells on the board"""
-        rows, cols = self.size
-        for row in range(rows):
-            for col in range(cols):
-                cell = (row, col)
-                p = self.cell_value(cell)
-                if p == Piece._:
-                    yield cell
-
-    def _playable_columns(self) -> Generator[int]:
-        """Yield all columns with at least one unoccupied cell"""
-        rows, cols = self.size
-
-        # Most efficient to scan column-wise, bottom up
-        for col in range(cols):
-            row = self.top_empty_row_for_column(col)
-            if row >= 0:
-                yield col
-
     def playable_cells(self) -> Generator[Cell]:
         """Yield all cells which are playable on the board given the specified
         board's placement_rule.
         """
+        rows, cols = self.size
         pr = self.placement_rule
         if pr == PlacementRule.ANYWHERE:
-            for cell in self._blank_cells():
-                yield cell
+            for idx in self._playable:
+                yield divmod(idx, cols)
         elif pr == PlacementRule.COLUMN_STACK:
-            for col in self._playable_columns():
-                row = self.top_empty_row_for_column(col)
-                cell = (row, col)
-                yield cell
+            heights = self._heights
+            for col in self._playable:
+                yield (rows - heights[col] - 1, col)
         else:
             raise Exception("unknown placement rule")
 
@@ -286,22 +454,46 @@ class Board:
         from game.win_detector import WinDetector
 
         b1 = self
-        b2 = Board()
+
+        # Skip __init__ since it would reset a board we're about to overwrite.
+        # Using the class of the original ensures backends copy as themselves
+        b2 = object.__new__(b1.__class__)
 
         b2.size = b1.size
         b2.win_count = b1.win_count
         b2.placement_rule = b1.placement_rule
 
+        b2.line_table = b1.line_table
         b2.win_detector = WinDetector(b2)
-        # Must be a deep copy so that the column lists aren't shared between
-        # copies
-        b2._tbl = deepcopy(b1._tbl)
+        b2.zobrist = b1.zobrist
+        b2._sym_maps = b1._sym_maps
+        b1._copy_pieces(b2)
+
+        b2._num_pieces = b1._num_pieces
+        b2._heights = b1._heights.copy()
+        b2._playable = b1._playable.copy()
+        b2.hash_key = b1.hash_key
+        b2._sym_keys = None if b1._sym_keys is None else b1._sym_keys.copy()
+        b2._tally = None if b1._tally is None else b1._tally.copy()
 
         return b2
 
+    def _copy_pieces(self, b2: "Board") -> None:
+        """Copy the piece storage into another board of the same backend"""
+        # Each row list must be copied so that they aren't shared between
+        # copies
+        b2._tbl = [row.copy() for row in self._tbl]
+
     @classmethod
     def from_game_parameters(cls, params: GameParameters) -> "Board":
-        return cls(
+        board_cls = cls
+        if params.backend == BoardBackend.BITBOARD:
+            # Avoid circular import since BitBoard is a subclass of Board
+            from game.bitboard import BitBoard
+
+            board_cls = BitBoard
+
+        return board_cls(
             size=params.size,
             win_count=params.win_count,
             placement_rule=params.placement_rule,
@@ -0,0 +1,28 @@
+from enum import Enum, auto
+
+
+class BoardBackend(Enum):
+    """
+    A BoardBackend selects how a Board stores its pieces.
+
+    TABLE keeps a list-of-lists of Piece values which is simple and easy to
+    inspect.
+
+    BITBOARD keeps one integer mask per piece which makes moves, copies and
+    win checks cheaper. This is what you want for engine searches, though
+    since a search node is mostly Game and evaluation work, expect the search
+    as a whole to speed up by tens of percent, not by multiples.
+    """
+
+    TABLE = auto()
+    BITBOARD = auto()
+
+    @classmethod
+    def from_str(cls, s: str) -> "BoardBackend":
+        x = s.lower()
+        if x == "table":
+            return cls.TABLE
+        elif x == "bitboard":
+            return cls.BITBOARD
+
+        raise ValueError(f"unknown board backend: '{s}'")
@@ -13,6 +13,7 @@ from game.move import Move
 from game.player import Player
 from game.piece import Piece
 from game.result import Result
+from game.symmetry import Symmetry
 
 
 class GameState(Enum):
@@ -28,6 +29,7 @@ class GameEvent(Enum):
     """
 
     MOVE = auto()
+    UNDO = auto()
     RESET = auto()
 
 
@@ -56,7 +58,7 @@ class Game:
     def generate_moves(self) -> Generator[Move]:
         p = self.cur_piece
         for cell in self.board.playable_cells():
-            yield Move(cell, p)
+            yield Move.of(cell, p)
 
     def reset(self) -> None:
         self.cur_player: Player = Player.P1
@@ -78,6 +80,28 @@ class Game:
         """Return Piece associated with the current player on-move"""
         return self._player2piece[self.cur_player]
 
+    def piece_for_player(self, player: Player) -> Piece:
+        """Return the Piece the given player plays with"""
+        return self._player2piece[player]
+
+    @property
+    def position_key(self) -> int:
+        """Return a 64-bit Zobrist key identifying the position
+
+        Unlike `Board.hash_key`, this accounts for who is on-move and which
+        piece they play, so it's suitable for keying search results.
+        """
+        turn_key = self.board.zobrist.turn_keys[(self.cur_player, self.cur_piece)]
+        return self.board.hash_key ^ turn_key
+
+    def canonical_position_key(self) -> tuple[int, Symmetry]:
+        """Like `position_key`, but the same for every rotation or reflection
+        of the position. Also returns the symmetry, see `Board.canonical_key`.
+        """
+        key, sym = self.board.canonical_key()
+        turn_key = self.board.zobrist.turn_keys[(self.cur_player, self.cur_piece)]
+        return key ^ turn_key, sym
+
     def _end_turn(self) -> None:
         if self.cur_player == Player.P1:
             self.cur_player = Player.P2
@@ -106,8 +130,10 @@ class Game:
         self.result = r
         self.state = GameState.FINISHED
 
-    def _adjust_game_state_post_move(self) -> None:
-        if self.board.win():
+    def _adjust_game_state_post_move(self, m: Move) -> None:
+        # Any win must run through the move just played, so there's no need to
+        # rescan the whole board
+        if self.board.check_move(m):
 
             if self.cur_player == Player.P1:
                 self._finish_game(Result.PLAYER1_VICTORY)
@@ -158,13 +184,38 @@ class Game:
 
         self.move_history.append(m)
 
-        self._adjust_game_state_post_move()
+        self._adjust_game_state_post_move(m)
 
         self._notify_event(GameEvent.MOVE)
 
         if self.state == GameState.PLAYING:
             self._end_turn()
 
+    def undo_move(self) -> Move:
+        """Take back the last move and return it
+
+        Together with `apply_move` this lets a search make and unmake moves on
+        a single Game rather than copying the game for every position.
+        """
+        if not self.move_history:
+            raise IllegalMove("no moves to undo")
+
+        m = self.move_history.pop()
+
+        self.board.undo_move(m)
+
+        if self.move_history:
+            self.state = GameState.PLAYING
+        else:
+            self.state = GameState.PIECES_CHOSEN
+
+        self.result = Result.UNFINISHED
+        self.cur_player = self._piece2player[m.piece]
+
+        self._notify_event(GameEvent.UNDO)
+
+        return m
+
     def create_move(self, placement_location: str) -> Move:
         """Place the current players piece at the location described by
         the location.
@@ -174,21 +225,21 @@ class Game:
         In Connect Four, the location can just be a column letter.
         """
         cell = self.board.parse_piece_placement(placement_location)
-        return Move(cell, self.cur_piece)
+        return Move.of(cell, self.cur_piece)
 
     def possible_moves(self) -> Generator[Move]:
         """Generate all possible moves for the current player"""
         for cell in self.board.playable_cells():
-            yield Move(cell, self.cur_piece)
+            yield Move.of(cell, self.cur_piece)
 
     def copy(self) -> "Game":
         """Make a full copy of a game"""
         g1 = self
 
-        # Use a dummy board to initialize, we'll overwrite with a proper copy
-        # of the Board object afterward. This keeps initialization semantics
-        # clean
-        g2 = Game(Board())
+        # Skip __init__, resetting a throwaway board only to overwrite it is a
+        # large part of the cost of a copy. Event listeners aren't copied.
+        g2 = object.__new__(g1.__class__)
+        g2._event_listeners = []
 
         g2.cur_player = g1.cur_player
         g2._player2piece = g1._player2piece.copy()
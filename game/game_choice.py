@@ -1,5 +1,6 @@
 from enum import Enum, auto
 
+from game.board_backend import BoardBackend
 from game.game_parameters import GameParameters
 from game.placement_rule import PlacementRule
 
@@ -65,11 +66,17 @@ class GameChoice(Enum):
         """
         if self == GameChoice.TIC_TAC_TOE:
             return GameParameters(
-                size=(3, 3), win_count=3, placement_rule=PlacementRule.ANYWHERE
+                size=(3, 3),
+                win_count=3,
+                placement_rule=PlacementRule.ANYWHERE,
+                backend=BoardBackend.BITBOARD,
             )
         elif self == GameChoice.CONNECT_FOUR:
             return GameParameters(
-                size=(6, 7), win_count=4, placement_rule=PlacementRule.COLUMN_STACK
+                size=(6, 7),
+                win_count=4,
+                placement_rule=PlacementRule.COLUMN_STACK,
+                backend=BoardBackend.BITBOARD,
             )
 
         return None
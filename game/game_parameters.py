@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 
+from game.board_backend import BoardBackend
 from game.placement_rule import PlacementRule
 from game.typedefs import BoardSize
 
@@ -13,8 +14,12 @@ class GameParameters:
 
     For example: Connect Four is rows=6, cols=7, win_count=4,
     PlacementRule.COLUMN_STACK
+
+    The backend doesn't change the rules of the game, just how the Board
+    stores pieces.
     """
 
     size: BoardSize
     win_count: int
     placement_rule: PlacementRule
+    backend: BoardBackend = BoardBackend.TABLE
@@ -0,0 +1,54 @@
+from collections.abc import Generator
+
+
+class IndexSet:
+    """
+    A set of the integers [0, n) which iterates in ascending order.
+
+    Members live in a doubly linked list (think 'dancing links') so removing a
+    member is O(1) and iterating is proportional to the number of members
+    rather than to `n`.
+
+    A removed member keeps its own links, so `restore` can put it back in
+    O(1) provided removals are undone in the reverse order they were made.
+    That's exactly the pattern of making and unmaking moves during a search.
+    """
+
+    def __init__(self, n: int) -> None:
+        # Index `n` is a sentinel which acts as both the head and the tail
+        self._n = n
+        self._next = [i + 1 for i in range(n)] + [0]
+        self._prev = [n] + [i for i in range(n)]
+        self._len = n
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Generator[int]:
+        nxt = self._next
+        i = nxt[self._n]
+        while i != self._n:
+            yield i
+            i = nxt[i]
+
+    def remove(self, i: int) -> None:
+        """Unlink a member of the set"""
+        nxt, prev = self._next, self._prev
+        nxt[prev[i]] = nxt[i]
+        prev[nxt[i]] = prev[i]
+        self._len -= 1
+
+    def restore(self, i: int) -> None:
+        """Relink a member removed by the most recent outstanding `remove`"""
+        nxt, prev = self._next, self._prev
+        nxt[prev[i]] = i
+        prev[nxt[i]] = i
+        self._len += 1
+
+    def copy(self) -> "IndexSet":
+        s = object.__new__(IndexSet)
+        s._n = self._n
+        s._next = self._next.copy()
+        s._prev = self._prev.copy()
+        s._len = self._len
+        return s
@@ -0,0 +1,82 @@
+"""
+Precomputed win-line geometry.
+
+For a given board size and win count, the set of k-length windows a player
+could fill to win never changes. Rather than rediscovering them by scanning
+the board, we build them once per process and share them.
+"""
+
+from game.game_parameters import GameParameters
+from game.typedefs import BoardSize, Cell
+
+
+class LineTable:
+    """
+    Every k-length window on the board, as flat cell indexes.
+
+    A cell index is `row * cols + col`. `cells` maps an index back to a Cell.
+
+    `windows[w]` is the tuple of cell indexes making up window `w`, ordered
+    along the line.
+
+    `cell_windows[i]` is the tuple of window ids which contain cell `i`, which
+    is what you want when only the cells around the last move matter.
+    """
+
+    def __init__(self, size: BoardSize, win_count: int) -> None:
+        rows, cols = size
+        k = win_count
+
+        self.size = size
+        self.win_count = win_count
+        self.cells: list[Cell] = [
+            (row, col) for row in range(rows) for col in range(cols)
+        ]
+
+        windows: list[tuple[int, ...]] = []
+
+        # -, |, \ and /
+        for row_delta, col_delta in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            for row in range(rows):
+                for col in range(cols):
+                    end_row = row + row_delta * (k - 1)
+                    end_col = col + col_delta * (k - 1)
+                    if not (0 <= end_row < rows and 0 <= end_col < cols):
+                        continue
+
+                    window = tuple(
+                        (row + row_delta * i) * cols + (col + col_delta * i)
+                        for i in range(k)
+                    )
+                    windows.append(window)
+
+        self.windows: list[tuple[int, ...]] = windows
+
+        cell_windows: list[list[int]] = [[] for _ in range(rows * cols)]
+        for w, window in enumerate(windows):
+            for idx in window:
+                cell_windows[idx].append(w)
+
+        self.cell_windows: list[tuple[int, ...]] = [tuple(x) for x in cell_windows]
+
+    @classmethod
+    def from_game_parameters(cls, params: GameParameters) -> "LineTable":
+        return line_table(params.size, params.win_count)
+
+
+_tables: dict[tuple[BoardSize, int], LineTable] = {}
+
+
+def line_table(size: BoardSize, win_count: int) -> LineTable:
+    """Return the LineTable for the given geometry, building it the first time
+    it's requested
+
+    The placement rule doesn't change which windows exist, so tic-tac-toe
+    style and Connect Four style boards of the same shape share a table.
+    """
+    key = (size, win_count)
+    tbl = _tables.get(key)
+    if tbl is None:
+        tbl = LineTable(size, win_count)
+        _tables[key] = tbl
+    return tbl
@@ -6,6 +6,16 @@ from game.typedefs import Cell
 
 
 class Move:
+    """
+    A piece placed at a cell.
+
+    Moves are immutable values: they compare and hash by cell and piece, so
+    they can be used as dict keys. Prefer `Move.of` in hot paths like move
+    generation, which returns a shared instance instead of allocating.
+    """
+
+    __slots__ = ("cell", "piece")
+
     cell: Cell
     piece: Piece
 
@@ -18,6 +28,29 @@ class Move:
         self.cell = cell
         self.piece = piece
 
+    @classmethod
+    def of(cls, cell: Cell, piece: Piece) -> "Move":
+        """Return the shared (flyweight) Move for the cell and piece
+
+        There's one instance per (cell, piece) pair. Cells are the same
+        across board sizes, so a table built up while playing on a large
+        board also serves the smaller ones.
+        """
+        key = (cell, piece)
+        m = _flyweights.get(key)
+        if m is None:
+            m = cls(cell, piece)
+            _flyweights[key] = m
+        return m
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Move):
+            return NotImplemented
+        return self.cell == other.cell and self.piece == other.piece
+
+    def __hash__(self) -> int:
+        return hash((self.cell, self.piece))
+
     @property
     def row(self) -> int:
         return self.cell[0]
@@ -39,4 +72,6 @@ class Move:
         return self.pretty()
 
 
+_flyweights: dict[tuple[Cell, Piece], Move] = {}
+
 NULL_MOVE = Move((0, 0), Piece._)
@@ -0,0 +1,111 @@
+from enum import Enum, auto
+
+from game.placement_rule import PlacementRule
+from game.typedefs import BoardSize, Cell
+
+
+class Symmetry(Enum):
+    """
+    A Symmetry is a rearrangement of the board which preserves which cells
+    form lines, so a position and its image under the symmetry have the same
+    game-theoretic value.
+
+    A square board has the 8 symmetries of a square. A non-square board only
+    has 4, since rotating by 90 degrees changes its shape. Under COLUMN_STACK
+    only the left-right mirror applies, since flipping the board vertically
+    would make pieces fall up.
+    """
+
+    IDENTITY = auto()
+    ROT90 = auto()
+    ROT180 = auto()
+    ROT270 = auto()
+
+    # Left-right
+    MIRROR = auto()
+
+    # Top-bottom
+    FLIP = auto()
+
+    # About the \ diagonal
+    TRANSPOSE = auto()
+
+    # About the / diagonal
+    ANTI_TRANSPOSE = auto()
+
+    def transform_cell(self, cell: Cell, size: BoardSize) -> Cell:
+        """Return where the cell ends up after applying the symmetry"""
+        row, col = cell
+        rows, cols = size
+        last_row = rows - 1
+        last_col = cols - 1
+
+        if self == Symmetry.IDENTITY:
+            return (row, col)
+        elif self == Symmetry.ROT90:
+            return (col, last_row - row)
+        elif self == Symmetry.ROT180:
+            return (last_row - row, last_col - col)
+        elif self == Symmetry.ROT270:
+            return (last_col - col, row)
+        elif self == Symmetry.MIRROR:
+            return (row, last_col - col)
+        elif self == Symmetry.FLIP:
+            return (last_row - row, col)
+        elif self == Symmetry.TRANSPOSE:
+            return (col, row)
+        elif self == Symmetry.ANTI_TRANSPOSE:
+            return (last_col - col, last_row - row)
+
+        raise ValueError(f"unknown symmetry {self}")
+
+    def inverse(self) -> "Symmetry":
+        """Return the symmetry which undoes this one"""
+        if self == Symmetry.ROT90:
+            return Symmetry.ROT270
+        elif self == Symmetry.ROT270:
+            return Symmetry.ROT90
+
+        # Everything else is its own inverse
+        return self
+
+    @classmethod
+    def for_board(
+        cls, size: BoardSize, placement_rule: PlacementRule
+    ) -> list["Symmetry"]:
+        """Return the symmetries valid for a board, IDENTITY always first"""
+        if placement_rule == PlacementRule.COLUMN_STACK:
+            return [cls.IDENTITY, cls.MIRROR]
+
+        rows, cols = size
+        if rows != cols:
+            return [cls.IDENTITY, cls.ROT180, cls.MIRROR, cls.FLIP]
+
+        return list(cls)
+
+
+type CellMap = list[int]
+
+_cell_maps: dict[tuple[BoardSize, PlacementRule], list[tuple[Symmetry, CellMap]]] = {}
+
+
+def symmetry_cell_maps(
+    size: BoardSize, placement_rule: PlacementRule
+) -> list[tuple[Symmetry, CellMap]]:
+    """Return each valid symmetry along with a map from flat cell index to
+    transformed flat cell index, building them the first time they're
+    requested
+    """
+    key = (size, placement_rule)
+    maps = _cell_maps.get(key)
+    if maps is None:
+        rows, cols = size
+        maps = []
+        for sym in Symmetry.for_board(size, placement_rule):
+            cmap = []
+            for idx in range(rows * cols):
+                row, col = sym.transform_cell(divmod(idx, cols), size)
+                cmap.append(row * cols + col)
+            maps.append((sym, cmap))
+        _cell_maps[key] = maps
+    return maps
@@ -1,9 +1,9 @@
 from enum import Enum, auto
-from typing import Generator, Tuple
+from typing import Tuple
 
 from game.board import Board
+from game.move import Move
 from game.piece import Piece
-from game.typedefs import BoardSize, Cell
 
 
 class Direction(Enum):
@@ -48,174 +48,85 @@ class Direction(Enum):
             raise ValueError(f"unknown direction {self}")
 
 
+# The four lines through a cell, each as a pair of opposite directions
+LINE_DIRECTIONS: list[Tuple[Direction, Direction]] = [
+    (Direction.W_E, Direction.E_W),
+    (Direction.N_S, Direction.S_N),
+    (Direction.SW_NE, Direction.NE_SW),
+    (Direction.NW_SE, Direction.SE_NW),
+]
+
+
 class WinDetector:
     """
     This class is repsonsible for detecting if a player has won the game.
 
-    This involves scanning in various directions according to the
-    dimensionality of the board. For a 2D board, we scan horizontal, vertical,
-    forward slash diagonally and backslash diagonally.
+    A full check looks at every k-length window on the board, which come
+    precomputed from the board's LineTable. After a move, `check_move` only
+    needs to look along the four lines through the cell that was played.
     """
 
     def __init__(self, b: Board) -> None:
         self.board = b
-        self.seq_detector = PieceSequenceDetector(b)
 
     def reset(self) -> None:
-        self.seq_detector.reset()
+        """WinDetector keeps no state between checks, so this is a no-op"""
 
     def win(self) -> bool:
         """Return True if a winning sequence is present"""
-        # - direction
-        if self._row_win():
-            return True
-
-        # | direction
-        if self._col_win():
-            return True
-
-        # / direction
-        if self._slash_win():
-            return True
-
-        # \ direction
-        if self._backslash_win():
-            return True
-
-        return False
-
-    def _row_win(self) -> bool:
-        sz = self.board.size
-        origin = (0, 0)
-
-        for r1, c1 in _directional_scan(origin, Direction.N_S, sz):
-            self.seq_detector.reset()
-
-            for r2, c2 in _directional_scan((r1, 0), Direction.W_E, sz):
-                piece = self.board.cell_value((r2, c2))
-
-                if self.seq_detector.put(piece):
-                    return True
-
-        return False
-
-    def _col_win(self) -> bool:
-        sz = self.board.size
-        origin = (0, 0)
-
-        for r1, c1 in _directional_scan(origin, Direction.W_E, sz):
-            self.seq_detector.reset()
-
-            for r2, c2 in _directional_scan((0, c1), Direction.N_S, sz):
-                piece = self.board.cell_value((r2, c2))
-
-                if self.seq_detector.put(piece):
-                    return True
-
-        return False
+        lt = self.board.line_table
+        cells = lt.cells
+        cell_value = self.board.cell_value
 
-    def _slash_win(self) -> bool:
-        sz = self.board.size
-        origin = (0, 0)
+        for window in lt.windows:
+            piece = cell_value(cells[window[0]])
+            if piece == Piece._:
+                continue
 
-        # Scan | down
-        for r1, c1 in _directional_scan(origin, Direction.N_S, sz):
-            self.seq_detector.reset()
-
-            # Scan / up
-            for r2, c2 in _directional_scan((r1, 0), Direction.SW_NE, sz):
-                piece = self.board.cell_value((r2, c2))
-
-                if self.seq_detector.put(piece):
-                    return True
-
-        # Scan - right
-        last_row_idx = sz[0] - 1
-        for r1, c1 in _directional_scan((last_row_idx, 1), Direction.W_E, sz):
-            self.seq_detector.reset()
-
-            # Scan / up from last row, start at col 1 since we already did col 0
-            # in the previous pass
-            for r2, c2 in _directional_scan((r1, c1), Direction.SW_NE, sz):
-                piece = self.board.cell_value((r2, c2))
-
-                if self.seq_detector.put(piece):
-                    return True
+            for idx in window:
+                if cell_value(cells[idx]) != piece:
+                    break
+            else:
+                return True
 
         return False
 
-    def _backslash_win(self) -> bool:
-        sz = self.board.size
-        origin = (0, 0)
-
-        # Scan | down
-        for r1, c1 in _directional_scan(origin, Direction.N_S, sz):
-            self.seq_detector.reset()
-
-            # Scan \ down
-            for r2, c2 in _directional_scan((r1, 0), Direction.NW_SE, sz):
-                piece = self.board.cell_value((r2, c2))
-
-                if self.seq_detector.put(piece):
-                    return True
-
-        # Scan - right on first row, start at col 1 since we already did col 0
-        # in the previous pass
-        for r1, c1 in _directional_scan((0, 1), Direction.W_E, sz):
-            self.seq_detector.reset()
-
-            for r2, c2 in _directional_scan((r1, c1), Direction.SW_NE, sz):
-                piece = self.board.cell_value((r2, c2))
+    def check_move(self, m: Move) -> bool:
+        """Return True if the move just played completed a winning sequence
 
-                if self.seq_detector.put(piece):
-                    return True
-
-        return False
-
-
-class PieceSequenceDetector:
-    """Class for detecting if a sequence of k pieces are seen in a row"""
-
-    def __init__(self, board: Board) -> None:
-        self.board = board
-        self.reset()
+        Only a win through the cell just played can be new, so rather than
+        rescanning the board we count matching pieces outward from that cell
+        along each of the four lines.
+        """
+        k = self.board.win_count
+        for dir1, dir2 in LINE_DIRECTIONS:
+            run_count = 1
+            run_count += self._run_length(m, dir1, k - 1)
+            run_count += self._run_length(m, dir2, k - 1)
+            if run_count >= k:
+                return True
 
-    def reset(self) -> None:
-        self.prev_piece: Piece | None = None
-        self.run_count: int = 0
-
-    def put(self, piece: Piece) -> bool:
-        """Returns True if the latest piece caused a win, otherwise False"""
-        if piece == Piece._:
-            self.run_count = 0
-        elif self.prev_piece is None:
-            self.run_count = 1
-        elif self.prev_piece != piece:
-            self.run_count = 1
-        elif self.prev_piece == piece:
-            self.run_count += 1
-
-        if self.run_count >= self.board.win_count:
-            return True
-
-        self.prev_piece = piece
         return False
 
+    def _run_length(self, m: Move, dir_: Direction, limit: int) -> int:
+        """Return how many of the move's pieces are adjacent to the move in
+        the given direction, stopping at `limit`
+        """
+        rows, cols = self.board.size
+        row, col = m.cell
+        row_delta, col_delta = dir_.transform()
 
-def _directional_scan(origin: Cell, dir_: Direction, sz: BoardSize) -> Generator[Cell]:
-    """Scan cells starting at origin in the given direction until board
-    boundary is hit
-    """
-    row, col = origin
-    row_delta, col_delta = dir_.transform()
+        count = 0
+        while count < limit:
+            row += row_delta
+            col += col_delta
 
-    while True:
-        cell = (row, col)
+            if not (0 <= row < rows and 0 <= col < cols):
+                break
 
-        if not Board.cell_in_bounds(cell, sz):
-            return
+            if self.board.cell_value((row, col)) != m.piece:
+                break
 
-        yield cell
+            count += 1
 
-        row += row_delta
-        col += col_delta
+        return count
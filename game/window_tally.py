@@ -0,0 +1,75 @@
+from game.line_table import LineTable
+from game.piece import Piece
+
+
+class WindowTally:
+    """
+    How many of each player's pieces are in every k-length window.
+
+    A window holding pieces from both players can never be won, so what
+    matters for evaluating a position is the windows which are still 'open'
+    for one player. `open_windows[piece][n]` is the number of windows holding
+    exactly `n` of that piece and none of the opponent's. Empty windows
+    aren't counted, so `open_windows[piece][0]` is always 0.
+
+    Placing or removing a piece only touches the windows through its cell, so
+    the tally is kept up to date one move at a time rather than by scanning
+    the board.
+    """
+
+    def __init__(self, line_table: LineTable) -> None:
+        self.line_table = line_table
+
+        num_windows = len(line_table.windows)
+        k = line_table.win_count
+
+        self.counts: dict[Piece, list[int]] = {
+            p: [0 for _ in range(num_windows)] for p in Piece.selectable()
+        }
+        self.open_windows: dict[Piece, list[int]] = {
+            p: [0 for _ in range(k + 1)] for p in Piece.selectable()
+        }
+
+    def _adjust(self, idx: int, piece: Piece, delta: int) -> None:
+        other = Piece.O if piece == Piece.X else Piece.X
+
+        counts = self.counts[piece]
+        other_counts = self.counts[other]
+        open_windows = self.open_windows[piece]
+        other_open_windows = self.open_windows[other]
+
+        for w in self.line_table.cell_windows[idx]:
+            n = counts[w]
+            n_other = other_counts[w]
+
+            # Take the window out of the histogram under its old counts...
+            if n_other == 0:
+                if n > 0:
+                    open_windows[n] -= 1
+            elif n == 0:
+                other_open_windows[n_other] -= 1
+
+            n += delta
+            counts[w] = n
+
+            # ...and put it back under its new ones
+            if n_other == 0:
+                if n > 0:
+                    open_windows[n] += 1
+            elif n == 0:
+                other_open_windows[n_other] += 1
+
+    def add(self, idx: int, piece: Piece) -> None:
+        """Account for a piece placed on the given flat cell index"""
+        self._adjust(idx, piece, 1)
+
+    def remove(self, idx: int, piece: Piece) -> None:
+        """Account for a piece removed from the given flat cell index"""
+        self._adjust(idx, piece, -1)
+
+    def copy(self) -> "WindowTally":
+        t2 = object.__new__(WindowTally)
+        t2.line_table = self.line_table
+        t2.counts = {p: c.copy() for p, c in self.counts.items()}
+        t2.open_windows = {p: c.copy() for p, c in self.open_windows.items()}
+        return t2
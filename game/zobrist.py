@@ -0,0 +1,53 @@
+"""
+Zobrist hashing of positions.
+
+Each (cell, piece) pair is assigned a random 64-bit key and a position's hash
+is the XOR of the keys of every piece on the board. Since XOR is its own
+inverse, placing or removing a piece updates the hash in O(1).
+"""
+
+from random import Random
+
+from game.piece import Piece
+from game.player import Player
+from game.typedefs import BoardSize
+
+ZOBRIST_BITS = 64
+
+
+class ZobristTable:
+    """The random keys for a given board size"""
+
+    def __init__(self, size: BoardSize) -> None:
+        rows, cols = size
+
+        # Seed from the board size so keys are stable across runs and across
+        # processes, which matters for anything that persists or shares keys
+        rng = Random(f"zobrist:{rows}x{cols}")
+
+        def key() -> int:
+            return rng.getrandbits(ZOBRIST_BITS)
+
+        # piece -> cell index -> key
+        self.piece_keys: dict[Piece, list[int]] = {
+            p: [key() for _ in range(rows * cols)] for p in Piece.selectable()
+        }
+
+        # Who is on-move and which piece they play
+        self.turn_keys: dict[tuple[Player, Piece], int] = {
+            (player, p): key() for player in Player for p in Piece.selectable()
+        }
+
+
+_tables: dict[BoardSize, ZobristTable] = {}
+
+
+def zobrist_table(size: BoardSize) -> ZobristTable:
+    """Return the ZobristTable for the board size, generating it the first time
+    it's requested
+    """
+    tbl = _tables.get(size)
+    if tbl is None:
+        tbl = ZobristTable(size)
+        _tables[size] = tbl
+    return tbl
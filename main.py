@@ -3,6 +3,7 @@ import logging
 
 import battle.cli
 import play.cli
+import solve.cli
 import tests.cli
 
 
@@ -44,6 +45,7 @@ def main():
     # Register subparsers for each command
     battle.cli.add_subparser(subparsers)
     play.cli.add_subparser(subparsers)
+    solve.cli.add_subparser(subparsers)
     tests.cli.add_subparser(subparsers)
 
     args = parser.parse_args()
@@ -53,6 +53,8 @@ def _play(args) -> None:
         difficulty=args.difficulty,
         p1_piece=p1_piece,
         first_move=first_move,
+        time_limit_ms=args.time_limit_ms,
+        max_nodes=args.max_nodes,
     )
 
 
@@ -77,3 +79,14 @@ def add_subparser(subparsers) -> None:
     _add_p1_piece(p)
 
     _add_first_move(p)
+
+    p.add_argument(
+        "--time-limit-ms",
+        type=int,
+        help="how long the computer may think per move, overrides difficulty",
+    )
+    p.add_argument(
+        "--max-nodes",
+        type=int,
+        help="how many positions the computer may visit per move, overrides difficulty",
+    )
@@ -82,7 +82,13 @@ def _input_move(g: Game) -> Move:
     return _parse_move(g, cell_str)
 
 
-def _pick_engine(g: Game, first_move: FirstMove, difficulty: int) -> Engine:
+def _pick_engine(
+    g: Game,
+    first_move: FirstMove,
+    difficulty: int,
+    time_limit_ms: int | None = None,
+    max_nodes: int | None = None,
+) -> Engine:
     if first_move == FirstMove.HUMAN:
         p = Player.P2
     elif first_move == FirstMove.ENGINE:
@@ -95,8 +101,19 @@ def _pick_engine(g: Game, first_move: FirstMove, difficulty: int) -> Engine:
     if difficulty == 1:
         return create_engine(Dummy, g, p)
 
-    max_plies = difficulty - 1
-    return create_engine(Winimaxer, g, p, max_plies=max_plies)
+    # With a budget the engine searches as deep as the budget allows
+    max_plies = None
+    if time_limit_ms is None and max_nodes is None:
+        max_plies = difficulty - 1
+
+    return create_engine(
+        Winimaxer,
+        g,
+        p,
+        max_plies=max_plies,
+        time_limit_ms=time_limit_ms,
+        max_nodes=max_nodes,
+    )
 
 
 def _print_result(g: Game, eng: Engine) -> None:
@@ -145,6 +162,8 @@ def start_loop(
     difficulty: int = 5,
     p1_piece: Piece = Piece.X,
     first_move: FirstMove = FirstMove.COIN_TOSS,
+    time_limit_ms: int | None = None,
+    max_nodes: int | None = None,
 ) -> None:
     """
     :param game_choice: which game to play
@@ -152,6 +171,10 @@ def start_loop(
     max_plies
     :param p1_piece: whether player 1 is 'X' or 'O'
     :param first_move: whether the engine or human goes first, or coin toss
+    :param time_limit_ms: how long the engine may think per move, overrides
+    the search depth implied by difficulty
+    :param max_nodes: how many positions the engine may visit per move,
+    overrides the search depth implied by difficulty
     """
     b = Board()
 
@@ -163,7 +186,9 @@ def start_loop(
 
     g.choose_player1_piece(p1_piece)
 
-    eng = _pick_engine(g, first_move, difficulty)
+    eng = _pick_engine(
+        g, first_move, difficulty, time_limit_ms=time_limit_ms, max_nodes=max_nodes
+    )
 
     _show_board(g.board)
 
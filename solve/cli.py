@@ -0,0 +1,111 @@
+import argparse
+from functools import partial
+from time import monotonic
+
+from game.game_choice import GameChoice
+from game.game_parameters import GameParameters
+from game.placement_rule import PlacementRule
+from solve.solve import solve
+from solve.store import DEFAULT_MEMORY_MB
+
+
+def _parse_grid(s: str) -> tuple[int, int]:
+    """Like 7x6 corresponding to 7 columns by 6 rows, as in AT3"""
+    try:
+        cols, rows = map(int, s.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"grid must look like 4x3, not '{s}'")
+
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError(f"grid needs at least one cell, not '{s}'")
+
+    return rows, cols
+
+
+def _game_parameters(args) -> GameParameters:
+    if args.grid is None:
+        params = GameChoice.from_abbrev(args.game).parameters()
+        assert params is not None
+        return params
+
+    placement_rule = PlacementRule.ANYWHERE
+    if args.column_stack:
+        placement_rule = PlacementRule.COLUMN_STACK
+
+    return GameParameters(
+        size=args.grid,
+        win_count=args.win,
+        placement_rule=placement_rule,
+    )
+
+
+def _solve(p: argparse.ArgumentParser, args) -> None:
+    if args.grid is not None:
+        if args.win is None:
+            p.error("--grid needs --win")
+
+        rows, cols = args.grid
+        if not 1 <= args.win <= max(rows, cols):
+            p.error(f"--win must be between 1 and {max(rows, cols)} on this grid")
+
+    params = _game_parameters(args)
+
+    start = monotonic()
+    solution = solve(params, memory_mb=args.memory_mb, spill_dir=args.spill_dir)
+    elapsed = monotonic() - start
+
+    rows, cols = params.size
+    print(f"{cols}x{rows}, {params.win_count} in a row: {solution.result.pretty()}")
+    print("best first moves:", " ".join(m.pretty() for m in solution.best_moves))
+
+    if not args.quiet:
+        stats = solution.stats
+        print(
+            f"nodes={stats.nodes} cutoffs={stats.cutoffs} tt_hits={stats.tt_hits}"
+            f" time={elapsed:.2f}s"
+        )
+
+
+def add_subparser(subparsers) -> None:
+    p = subparsers.add_parser(
+        "solve",
+        aliases=["s"],
+        help="find the result of a game with perfect play",
+    )
+    p.set_defaults(func=partial(_solve, p))
+
+    choices = [x.abbrev() for x in GameChoice.selectable()]
+    p.add_argument(
+        "--game",
+        "-g",
+        default=GameChoice.TIC_TAC_TOE.abbrev(),
+        choices=choices,
+        help="which game to solve, ignored if --grid is given",
+    )
+
+    p.add_argument(
+        "--grid",
+        type=_parse_grid,
+        help="board size as columns x rows, like 4x3",
+    )
+    p.add_argument(
+        "--win",
+        type=int,
+        help="how many in a row wins, required with --grid",
+    )
+    p.add_argument(
+        "--column-stack",
+        action="store_true",
+        help="pieces drop to the bottom of their column, as in Connect Four",
+    )
+
+    p.add_argument(
+        "--memory-mb",
+        type=float,
+        default=DEFAULT_MEMORY_MB,
+        help="how much memory solved positions may use before spilling to disk",
+    )
+    p.add_argument(
+        "--spill-dir",
+        help="where to spill solved positions, default is a temporary directory",
+    )
@@ -0,0 +1,179 @@
+"""
+Solving small m,n,k games: finding the result of the start position with
+perfect play by both sides.
+
+The solver is negamax alpha-beta over just three values, win, draw and loss
+for the player on-move, so any window is narrow and cutoffs are frequent.
+Results are kept in a StateStore keyed by canonical position key, so each
+position is solved once for all of its rotations and reflections.
+"""
+
+import logging
+from dataclasses import dataclass, field
+
+from engine.search_stats import SearchStats
+from engine.transposition_table import Bound, score_bound
+from game.board import Board
+from game.game import Game, GameState
+from game.game_parameters import GameParameters
+from game.move import Move
+from game.piece import Piece
+from game.result import Result
+from solve.store import DEFAULT_MEMORY_MB, StateStore
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# Values, from the point of view of the player on-move
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+_BOUNDS = list(Bound)
+
+
+def _pack(value: int, bound: Bound) -> int:
+    return (value + 1) * len(_BOUNDS) + _BOUNDS.index(bound)
+
+
+def _unpack(entry: int) -> tuple[int, Bound]:
+    value, bound_idx = divmod(entry, len(_BOUNDS))
+    return value - 1, _BOUNDS[bound_idx]
+
+
+@dataclass
+class Solution:
+    """The result of a game with perfect play, and the first moves which
+    achieve it
+    """
+
+    result: Result
+    best_moves: list[Move]
+    stats: SearchStats = field(default_factory=SearchStats)
+
+
+class Solver:
+    """
+    Solves the game described by `params`, keeping at most `memory_mb` of
+    solved positions in memory and spilling the rest to disk in `spill_dir`.
+
+    Call `close` when done to remove the spill file.
+    """
+
+    def __init__(
+        self,
+        params: GameParameters,
+        memory_mb: float = DEFAULT_MEMORY_MB,
+        spill_dir: str | None = None,
+    ) -> None:
+        self.game = Game(Board.from_game_parameters(params))
+        self.game.choose_player1_piece(Piece.X)
+        self.store = StateStore(memory_mb, spill_dir)
+        self.stats = SearchStats()
+
+        # Center cells take part in the most lines, so try them first
+        rows, cols = params.size
+        center = ((rows - 1) / 2, (cols - 1) / 2)
+        self._rank = {
+            (row, col): abs(row - center[0]) + abs(col - center[1])
+            for row in range(rows)
+            for col in range(cols)
+        }
+
+    def close(self) -> None:
+        self.store.close()
+
+    def _ordered_moves(self) -> list[Move]:
+        rank = self._rank
+        return sorted(self.game.generate_moves(), key=lambda m: rank[m.cell])
+
+    def _negamax(self, alpha: int, beta: int) -> int:
+        g = self.game
+        stats = self.stats
+        stats.nodes += 1
+
+        key, _ = g.canonical_position_key()
+        entry = self.store.get(key)
+        if entry is not None:
+            value, bound = _unpack(entry)
+            if (
+                bound == Bound.EXACT
+                or (bound == Bound.LOWER and value >= beta)
+                or (bound == Bound.UPPER and value <= alpha)
+            ):
+                stats.tt_hits += 1
+                return value
+
+        moves = self._ordered_moves()
+
+        # Winning on the spot beats anything a deeper search could find
+        for m in moves:
+            g.apply_move(m)
+            won = g.state == GameState.FINISHED and g.winner() is not None
+            g.undo_move()
+            if won:
+                self.store.put(key, _pack(WIN, Bound.EXACT))
+                return WIN
+
+        alpha_orig = alpha
+        value = LOSS - 1
+        for m in moves:
+            g.apply_move(m)
+            if g.state == GameState.FINISHED:
+                # Not a win, we checked, so the board filled up
+                score = DRAW
+            else:
+                score = -self._negamax(-beta, -alpha)
+            g.undo_move()
+
+            value = max(value, score)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                stats.cutoffs += 1
+                break
+
+        self.store.put(key, _pack(value, score_bound(value, alpha_orig, beta)))
+        return value
+
+    def _value_after(self, m: Move) -> int:
+        """Return the exact value of playing `m`, for the player playing it"""
+        g = self.game
+        g.apply_move(m)
+        if g.state == GameState.FINISHED:
+            value = WIN if g.winner() is not None else DRAW
+        else:
+            value = -self._negamax(LOSS, WIN)
+        g.undo_move()
+        return value
+
+    def solve(self) -> Solution:
+        """Solve the start position"""
+        value = self._negamax(LOSS, WIN)
+        DEBUG(f"solve: {value=} nodes={self.stats.nodes}")
+
+        best_moves = [m for m in self._ordered_moves() if self._value_after(m) == value]
+
+        if value == WIN:
+            result = Result.PLAYER1_VICTORY
+        elif value == LOSS:
+            result = Result.PLAYER2_VICTORY
+        else:
+            result = Result.DRAW
+
+        return Solution(result=result, best_moves=best_moves, stats=self.stats)
+
+
+def solve(
+    params: GameParameters,
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    spill_dir: str | None = None,
+) -> Solution:
+    """Return the result of the game with perfect play by both sides, along
+    with player 1's best first moves
+    """
+    solver = Solver(params, memory_mb=memory_mb, spill_dir=spill_dir)
+    try:
+        return solver.solve()
+    finally:
+        solver.close()
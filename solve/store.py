@@ -0,0 +1,117 @@
+import logging
+import os
+import sqlite3
+import tempfile
+
+logger = logging.getLogger(__name__)
+DEBUG = logger.debug
+
+
+# Roughly what a dict entry costs, counting the int key object and the
+# dict's spare capacity
+ENTRY_BYTES = 100
+
+DEFAULT_MEMORY_MB = 256.0
+
+_SIGN_BIT = 1 << 63
+
+
+def _signed(key: int) -> int:
+    """SQLite integers are signed 64-bit, so store keys as such"""
+    return key - (1 << 64) if key & _SIGN_BIT else key
+
+
+class StateStore:
+    """
+    Maps 64-bit position keys to small int entries, keeping at most
+    `memory_mb` worth of them in memory.
+
+    When memory fills up, every entry is written out to an SQLite file and
+    memory starts over empty. Lookups which miss in memory fall back to the
+    file. Entries come back to memory only when they're stored again, so the
+    ones a search keeps updating stay cheap to reach.
+
+    The file lives in `spill_dir`, the system's temporary directory by
+    default, and is deleted by `close`.
+    """
+
+    def __init__(
+        self,
+        memory_mb: float = DEFAULT_MEMORY_MB,
+        spill_dir: str | None = None,
+    ) -> None:
+        self.max_entries = max(1, int(memory_mb * 1024 * 1024 / ENTRY_BYTES))
+        self.spill_dir = spill_dir
+
+        self._entries: dict[int, int] = {}
+        self._db: sqlite3.Connection | None = None
+        self._path: str | None = None
+
+        # Counts, for reporting
+        self.spills = 0
+        self.spilled = 0
+        self.disk_hits = 0
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            fd, self._path = tempfile.mkstemp(
+                prefix="solve-", suffix=".sqlite3", dir=self.spill_dir
+            )
+            os.close(fd)
+
+            db = sqlite3.connect(self._path)
+
+            # The file is scratch space, there's nothing to recover after a
+            # crash
+            db.execute("PRAGMA journal_mode = OFF")
+            db.execute("PRAGMA synchronous = OFF")
+            db.execute("CREATE TABLE entries (key INTEGER PRIMARY KEY, entry INTEGER)")
+            self._db = db
+        return self._db
+
+    def get(self, key: int) -> int | None:
+        entry = self._entries.get(key)
+        if entry is not None or self._db is None:
+            return entry
+
+        row = self._db.execute(
+            "SELECT entry FROM entries WHERE key = ?", (_signed(key),)
+        ).fetchone()
+        if row is None:
+            return None
+
+        self.disk_hits += 1
+        return row[0]
+
+    def put(self, key: int, entry: int) -> None:
+        entries = self._entries
+        entries[key] = entry
+        if len(entries) >= self.max_entries:
+            self._spill()
+
+    def _spill(self) -> None:
+        db = self._open()
+        with db:
+            db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?)",
+                ((_signed(k), v) for k, v in self._entries.items()),
+            )
+
+        self.spills += 1
+        self.spilled += len(self._entries)
+        DEBUG(f"store: spilled {len(self._entries)} entries to {self._path}")
+
+        self._entries = {}
+
+    def __len__(self) -> int:
+        """Return the number of entries held in memory"""
+        return len(self._entries)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+        if self._path is not None:
+            os.unlink(self._path)
+            self._path = None
@@ -1,7 +1,50 @@
+import logging
+import os
+from collections import Counter
+from random import Random
+
+import numpy as np
+
+from at3.file_extensions import valid_file_extension
+from at3.parse import parse
+from engine.alphabeta import alphabeta, search_alphabeta
+from engine.exceptions import EngineException
+from engine.batch_playouts import batch_playouts
+from engine.c4.bitmaxer import Bitmaxer, BitSearch
+from engine.game_tree import GameTree, Node
+from engine.iterative_deepening import iterative_deepening
+from engine.lazy_smp import LazySMPSearch
+from engine.mcts import MCTSTree, random_playout
+from engine.minimax import minimax, search_minimax
+from engine.mnk.dummy import Dummy
+from engine.mnk.heuristics import eval_end_state, eval_windows
+from engine.mnk.montecarlo import Montecarlo
+from engine.mnk.winibetamaxer import Winibetamaxer
+from engine.move_ordering import MoveOrdering
+from engine.mtdf import search_mtdf
+from engine.parallel import ParallelSearch
+from engine.pvs import search_pvs
+from engine.search_budget import SearchBudget
+from engine.search_context import SearchContext
+from engine.search_stats import SearchStats
+from engine.t3.oracle import Oracle, lookup
+from engine.shared_tt import SharedTranspositionTable
+from engine.threaded import ThreadedSearch
+from engine.transposition_table import Bound, TranspositionTable
+from game.bitboard import BitBoard
+from game.exceptions import IllegalMove
 from game.board import Board
+from game.game import Game, GameState, generate_moves
+from game.game_choice import GameChoice
+from game.game_parameters import GameParameters
+from game.line_table import LineTable
 from game.move import Move
 from game.placement_rule import PlacementRule
+from game.player import Player
+from game.result import Result
+from game.symmetry import Symmetry
 from game.piece import Piece
+from solve.solve import Solver
 from tests.context import TestContext
 from tests.assertions import assert_cells
 
@@ -44,6 +87,1223 @@ def test_playable_cells_column_stack():
     assert_cells(t, wanted, got)
 
 
+def test_playable_cells_anywhere():
+    t = TestContext(
+        description="test_playable_cells_anywhere",
+    )
+
+    b = Board(size=(2, 2), win_count=2)
+
+    b.apply_move(Move((0, 1), Piece.X))
+    b.apply_move(Move((1, 0), Piece.O))
+
+    got = list(b.playable_cells())
+    wanted = [(0, 0), (1, 1)]
+    assert_cells(t, wanted, got)
+    assert not b.full()
+
+    b.apply_move(Move((1, 1), Piece.X))
+    b.apply_move(Move((0, 0), Piece.O))
+
+    assert_cells(t, [], list(b.playable_cells()))
+    assert b.full()
+
+
+def test_bitboard_matches_table():
+    t = TestContext(
+        description="test_bitboard_matches_table",
+    )
+
+    rng = Random(0)
+
+    for placement_rule in (PlacementRule.ANYWHERE, PlacementRule.COLUMN_STACK):
+        for _ in range(20):
+            kwargs = dict(size=(5, 6), win_count=4, placement_rule=placement_rule)
+            b1 = Board(**kwargs)
+            b2 = BitBoard(**kwargs)
+            piece = Piece.X
+
+            while not (b1.win() or b1.full()):
+                cells = list(b1.playable_cells())
+                assert_cells(t, cells, list(b2.playable_cells()))
+
+                m = Move(rng.choice(cells), piece)
+                b1.apply_move(m)
+                b2.copy().apply_move(m)
+                b2.apply_move(m)
+                piece = piece.next()
+
+                won = b1.check_move(m)
+                assert won == b2.check_move(m), f"'{t.description}': {m=}"
+                assert b1.win() == b2.win(), f"'{t.description}': {m=}"
+                assert b1.full() == b2.full(), f"'{t.description}': {m=}"
+                assert b1.hash_key == b2.hash_key, f"'{t.description}': {m=}"
+
+                # Playing on top of the move must be rejected by both
+                for b in (b1, b2):
+                    try:
+                        b.apply_move(Move(m.cell, piece))
+                    except IllegalMove:
+                        pass
+                    else:
+                        assert False, f"'{t.description}': {m=}"
+
+            assert b1.pretty() == b2.pretty(), f"'{t.description}'"
+            assert b1.canonical_key() == b2.canonical_key(), f"'{t.description}'"
+
+
+def test_check_move_matches_win():
+    t = TestContext(
+        description="test_check_move_matches_win",
+    )
+
+    rng = Random(1)
+
+    for size, win_count in (((3, 3), 3), ((6, 7), 4), ((5, 4), 3)):
+        for _ in range(20):
+            b = Board(size=size, win_count=win_count)
+            piece = Piece.X
+
+            while True:
+                m = Move(rng.choice(list(b.playable_cells())), piece)
+                b.apply_move(m)
+                piece = piece.next()
+
+                won = b.win_detector.check_move(m)
+                assert won == b.win(), f"'{t.description}': {m=}"
+
+                if won or b.full():
+                    break
+
+
+def test_undo_move():
+    t = TestContext(
+        description="test_undo_move",
+    )
+
+    rng = Random(2)
+
+    for cls in (Board, BitBoard):
+        for placement_rule in (PlacementRule.ANYWHERE, PlacementRule.COLUMN_STACK):
+            b = cls(size=(4, 5), win_count=3, placement_rule=placement_rule)
+            g = Game(b)
+            g.choose_player1_piece(Piece.O)
+
+            empty = b.pretty()
+            history = []
+
+            while g.state != GameState.FINISHED:
+                history.append((b.pretty(), list(b.playable_cells()), g.cur_player))
+                g.apply_move(rng.choice(list(g.generate_moves())))
+
+            while history:
+                pretty, cells, player = history.pop()
+                g.undo_move()
+
+                assert b.pretty() == pretty, f"'{t.description}'"
+                assert_cells(t, cells, list(b.playable_cells()))
+                assert g.cur_player == player, f"'{t.description}'"
+                assert g.result == Result.UNFINISHED, f"'{t.description}'"
+
+            assert b.pretty() == empty, f"'{t.description}'"
+            assert g.state == GameState.PIECES_CHOSEN, f"'{t.description}'"
+            assert g.cur_player == Player.P1, f"'{t.description}'"
+
+
+def test_hash_key():
+    t = TestContext(
+        description="test_hash_key",
+    )
+
+    for cls in (Board, BitBoard):
+        b1 = cls()
+        assert b1.hash_key == 0, f"'{t.description}'"
+
+        g1 = Game(b1)
+        g1.choose_player1_piece(Piece.X)
+        for m in (Move((0, 0), Piece.X), Move((1, 1), Piece.O)):
+            g1.apply_move(m)
+
+        g2 = Game(cls())
+        g2.choose_player1_piece(Piece.X)
+        for m in (Move((1, 2), Piece.X), Move((1, 1), Piece.O)):
+            g2.apply_move(m)
+
+        key = g2.position_key
+        assert b1.hash_key != g2.board.hash_key, f"'{t.description}'"
+
+        # Transpose the moves, same position
+        g2.undo_move()
+        g2.undo_move()
+        for m in (Move((0, 0), Piece.X), Move((1, 1), Piece.O)):
+            g2.apply_move(m)
+
+        assert b1.hash_key == g2.board.hash_key, f"'{t.description}'"
+        assert g1.position_key == g2.position_key, f"'{t.description}'"
+        assert g1.copy().position_key == g1.position_key, f"'{t.description}'"
+        assert key != g2.position_key, f"'{t.description}'"
+
+        # Same pieces, different side on-move
+        g3 = Game(cls())
+        g3.choose_player1_piece(Piece.O)
+        g3.apply_move(Move((1, 1), Piece.O))
+        g3.apply_move(Move((0, 0), Piece.X))
+        assert b1.hash_key == g3.board.hash_key, f"'{t.description}'"
+        assert g1.position_key != g3.position_key, f"'{t.description}'"
+
+        g1.reset()
+        assert b1.hash_key == 0, f"'{t.description}'"
+
+
+def test_line_table():
+    t = TestContext(
+        description="test_line_table",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+    lt = LineTable.from_game_parameters(params)
+    assert len(lt.windows) == 8, f"'{t.description}': {len(lt.windows)=}"
+
+    # The center is on the row, column and both diagonals
+    center = 1 * 3 + 1
+    assert len(lt.cell_windows[center]) == 4, f"'{t.description}'"
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+    lt = LineTable.from_game_parameters(params)
+    assert len(lt.windows) == 69, f"'{t.description}': {len(lt.windows)=}"
+    assert lt is LineTable.from_game_parameters(params), f"'{t.description}'"
+
+    for w, window in enumerate(lt.windows):
+        for idx in window:
+            assert w in lt.cell_windows[idx], f"'{t.description}': {w=} {idx=}"
+
+
+def test_canonical_key():
+    t = TestContext(
+        description="test_canonical_key",
+    )
+
+    rng = Random(3)
+
+    cases = (
+        ((3, 3), PlacementRule.ANYWHERE, 8),
+        ((4, 5), PlacementRule.ANYWHERE, 4),
+        ((6, 7), PlacementRule.COLUMN_STACK, 2),
+    )
+
+    for size, placement_rule, num_syms in cases:
+        syms = Symmetry.for_board(size, placement_rule)
+        assert len(syms) == num_syms, f"'{t.description}': {size=}"
+
+        b = Board(size=size, win_count=size[0] + 1, placement_rule=placement_rule)
+        moves = []
+        piece = Piece.X
+        for _ in range(5):
+            m = Move(rng.choice(list(b.playable_cells())), piece)
+            b.apply_move(m)
+            moves.append(m)
+            piece = piece.next()
+
+        key, sym = b.canonical_key()
+
+        # Every image of the position shares the canonical key
+        for s in syms:
+            b2 = Board(size=size, win_count=size[0] + 1, placement_rule=placement_rule)
+            for m in moves:
+                b2.apply_move(Move(s.transform_cell(m.cell, size), m.piece))
+
+            assert b2.canonical_key()[0] == key, f"'{t.description}': {s=}"
+
+            if s == sym:
+                assert b2.hash_key == key, f"'{t.description}': {s=}"
+
+        # Mapping through the returned symmetry and back is a round trip
+        for m in moves:
+            cell = sym.inverse().transform_cell(sym.transform_cell(m.cell, size), size)
+            assert cell == m.cell, f"'{t.description}': {sym=}"
+
+        # Once tracked, the symmetry keys follow moves and undos
+        for m in reversed(moves):
+            b.undo_move(m)
+            b3 = b.copy()
+            b3._sym_keys = None
+            assert b.canonical_key() == b3.canonical_key(), f"'{t.description}'"
+
+
+def test_move_flyweights():
+    t = TestContext(
+        description="test_move_flyweights",
+    )
+
+    m1 = Move.of((1, 2), Piece.X)
+    m2 = Move.of((1, 2), Piece.X)
+    assert m1 is m2, f"'{t.description}'"
+
+    # Equal by value, even when constructed separately
+    m3 = Move((1, 2), Piece.X)
+    assert m1 == m3, f"'{t.description}'"
+    assert hash(m1) == hash(m3), f"'{t.description}'"
+    assert m1 != Move.of((1, 2), Piece.O), f"'{t.description}'"
+    assert not hasattr(m1, "__dict__"), f"'{t.description}'"
+
+    g = Game(Board())
+    g.choose_player1_piece(Piece.X)
+    moves = list(g.generate_moves())
+    assert moves[0] is Move.of((0, 0), Piece.X), f"'{t.description}'"
+    assert len(set(moves + list(g.generate_moves()))) == 9, f"'{t.description}'"
+
+
+def test_alphabeta_matches_minimax():
+    t = TestContext(
+        description="test_alphabeta_matches_minimax",
+    )
+
+    rng = Random(4)
+    cutoffs = 0
+
+    for _ in range(3):
+        g = Game(Board())
+        g.choose_player1_piece(Piece.X)
+        for _ in range(2):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+
+        max_plies = 5
+        maximizer = g.cur_player == Player.P1
+
+        t1 = GameTree.generate(g, max_plies, generate_moves)
+        wanted = minimax(t1.root, max_plies, maximizer, eval_end_state)
+
+        stats = SearchStats()
+        t2 = GameTree.generate(g, max_plies, generate_moves)
+        got = alphabeta(t2.root, max_plies, maximizer, eval_end_state, stats)
+
+        assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+        assert t1.best_move().move == t2.best_move().move, f"'{t.description}'"
+        cutoffs += stats.cutoffs
+
+    assert cutoffs > 0, f"'{t.description}': {cutoffs=}"
+
+
+def test_search_matches_game_tree():
+    t = TestContext(
+        description="test_search_matches_game_tree",
+    )
+
+    rng = Random(5)
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+
+    for _ in range(3):
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.X)
+        for _ in range(8):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+
+        max_plies = 4
+        maximizer = g.cur_player == Player.P1
+        pretty = g.board.pretty()
+
+        for mFn, sFn in ((minimax, search_minimax), (alphabeta, search_alphabeta)):
+            tree = GameTree.generate(g, max_plies, generate_moves)
+            wanted = mFn(tree.root, max_plies, maximizer, eval_end_state)
+
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+            got, m = sFn(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+            assert tree.best_move().move == m, f"'{t.description}': {m=}"
+
+            # Searching in place must leave the game as we found it
+            assert g.board.pretty() == pretty, f"'{t.description}'"
+
+
+def test_transposition_table():
+    t = TestContext(
+        description="test_transposition_table",
+    )
+
+    rng = Random(11)
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+
+    for _ in range(3):
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.X)
+        for _ in range(6):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+
+        max_plies = 5
+        maximizer = g.cur_player == Player.P1
+
+        for sFn in (search_minimax, search_alphabeta):
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+            wanted, _ = sFn(g, max_plies, maximizer, ctx)
+
+            tt = TranspositionTable(1.0)
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves, tt=tt)
+            got, _ = sFn(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+            assert ctx.stats.tt_hits > 0, f"'{t.description}'"
+
+            # A second search is answered straight from the table
+            tt.new_search()
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves, tt=tt)
+            got, _ = sFn(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+
+    # A forced win scores the same however deep the search starts, so an
+    # entry stored by a deeper search answers a shallower one correctly
+    g = Game(Board())
+    g.choose_player1_piece(Piece.X)
+    for token in ("a1", "a2", "b1", "b2"):
+        g.apply_move(g.create_move(token))
+
+    ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+    wanted, _ = search_alphabeta(g, 1, True, ctx)
+
+    tt = TranspositionTable(1.0)
+    for depth in (5, 3, 1):
+        tt.new_search()
+        ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves, tt=tt)
+        got, m = search_alphabeta(g, depth, True, ctx)
+
+        assert wanted == got, f"'{t.description}': {depth=} {wanted=} {got=}"
+        assert m.cell == (0, 2), f"'{t.description}': {depth=} {m=}"
+
+
+def test_iterative_deepening():
+    t = TestContext(
+        description="test_iterative_deepening",
+    )
+
+    rng = Random(12)
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+
+    for _ in range(3):
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.X)
+        for _ in range(8):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+
+        maximizer = g.cur_player == Player.P1
+        pretty = g.board.pretty()
+
+        # Without running out of budget, we should agree with a fixed depth
+        # search
+        max_plies = 4
+        ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+        wanted, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+
+        ctx = SearchContext(
+            eval_fn=eval_end_state,
+            move_gen=generate_moves,
+            tt=TranspositionTable(1.0),
+            budget=SearchBudget(max_nodes=10_000_000),
+        )
+        got, _ = iterative_deepening(g, max_plies, maximizer, ctx, search_alphabeta)
+
+        assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+        assert ctx.stats.depth == max_plies, f"'{t.description}'"
+
+        # Running out of budget returns the deepest completed search and puts
+        # the game back as it was
+        max_nodes = 500
+        ctx = SearchContext(
+            eval_fn=eval_end_state,
+            move_gen=generate_moves,
+            budget=SearchBudget(max_nodes=max_nodes),
+        )
+        _, m = iterative_deepening(g, 42, maximizer, ctx, search_alphabeta)
+
+        assert 1 <= ctx.stats.depth < 42, f"'{t.description}'"
+        assert m in list(g.generate_moves()), f"'{t.description}': {m=}"
+        assert g.board.pretty() == pretty, f"'{t.description}'"
+
+
+def test_game_tree_reroot():
+    t = TestContext(
+        description="test_game_tree_reroot",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+
+    max_plies = 3
+    tree = GameTree.generate(g, max_plies, generate_moves)
+
+    m = g.create_move("b2")
+    g.apply_move(m)
+    child = next(x for x in tree.root.children if x.move == m)
+
+    assert tree.reroot(m), f"'{t.description}'"
+    assert tree.root is child, f"'{t.description}'"
+    assert tree.root.is_root(), f"'{t.description}'"
+
+    # Extending the re-rooted tree should give the same tree as building it
+    # from scratch
+    tree.build(max_plies, generate_moves)
+    fresh = GameTree.generate(g, max_plies, generate_moves)
+
+    def shape(n: Node) -> list:
+        return [(c.move, shape(c)) for c in n.children]
+
+    assert shape(tree.root) == shape(fresh.root), f"'{t.description}'"
+
+    # A move the tree doesn't know about leaves it alone
+    assert not tree.reroot(g.create_move("b2")), f"'{t.description}'"
+    assert tree.root is child, f"'{t.description}'"
+
+
+def test_mcts():
+    t = TestContext(
+        description="test_mcts",
+    )
+
+    rng = Random(21)
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    for loc in ("a1", "b2", "a2", "c3"):
+        g.apply_move(g.create_move(loc))
+
+    # X wins on the spot with a3, anything else lets O win or draw
+    tree = MCTSTree.for_game(g, size_mb=1.0)
+    for _ in range(1000):
+        tree.playout(g, rng)
+
+    assert len(g.move_history) == 4, f"'{t.description}'"
+    assert tree.visits[0] == 1000, f"'{t.description}'"
+
+    m = tree.best_move(g)
+    assert m == g.create_move("a3"), f"'{t.description}': {m=}"
+
+    # Re-rooting keeps the statistics of the move played
+    g.undo_move()
+    tree = MCTSTree.for_game(g, size_mb=1.0)
+    for _ in range(500):
+        tree.playout(g, rng)
+
+    m = tree.best_move(g)
+    first = tree.first_child[0]
+    child = next(
+        c
+        for c in range(first, first + tree.num_children[0])
+        if tree.cells[tree.cell[c]] == m.cell
+    )
+    visits = tree.visits[child]
+    size = tree.size
+
+    g.apply_move(m)
+    assert tree.reroot(g), f"'{t.description}'"
+    assert tree.matches(g), f"'{t.description}'"
+    assert tree.visits[0] == visits, f"'{t.description}'"
+    assert tree.size < size, f"'{t.description}'"
+
+    if g.state != GameState.FINISHED:
+        tree.playout(g, rng)
+        assert tree.visits[0] == visits + 1, f"'{t.description}'"
+
+
+def test_batch_playouts():
+    t = TestContext(
+        description="test_batch_playouts",
+    )
+
+    np_rng = np.random.default_rng(22)
+
+    for gc, opening in (
+        (GameChoice.TIC_TAC_TOE, ["b2", "a1"]),
+        (GameChoice.CONNECT_FOUR, ["d", "d", "c"]),
+    ):
+        params = gc.parameters()
+        assert params is not None
+
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.O)
+        for loc in opening:
+            g.apply_move(g.create_move(loc))
+
+        n = 2000
+        got = batch_playouts(g, n, np_rng)
+
+        assert got.total() == n, f"'{t.description}': {gc=} {got=}"
+        assert len(g.move_history) == len(opening), f"'{t.description}': {gc=}"
+
+        # Should agree with playing the games out one at a time, give or take
+        # the noise
+        rng = Random(22)
+        wanted = Counter(random_playout(g, rng) for _ in range(n))
+        for r in (Result.PLAYER1_VICTORY, Result.PLAYER2_VICTORY, Result.DRAW):
+            diff = abs(got[r] - wanted[r]) / n
+            assert diff < 0.05, f"'{t.description}': {gc=} {r=} {got=} {wanted=}"
+
+    # With one cell left every game ends the same way
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    for loc in ("a1", "b1", "c1", "a2", "b2", "c3", "b3", "a3"):
+        g.apply_move(g.create_move(loc))
+
+    got = batch_playouts(g, 10, np_rng)
+    g.apply_move(g.create_move("c2"))
+    assert got == Counter({g.result: 10}), f"'{t.description}': {got=}"
+
+    got = batch_playouts(g, 10, np_rng)
+    assert got == Counter({g.result: 10}), f"'{t.description}': {got=}"
+
+
+def test_oracle():
+    t = TestContext(
+        description="test_oracle",
+    )
+
+    rng = Random(23)
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    for piece in Piece.selectable():
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(piece)
+
+        # Tic-tac-toe is a draw
+        value, _ = lookup(g)
+        assert value == 0, f"'{t.description}': {value=}"
+
+        # The oracle agrees with a full depth search from random positions,
+        # and its move keeps the value of the position
+        for _ in range(20):
+            while g.state != GameState.FINISHED:
+                value, m = lookup(g)
+                assert m in list(g.generate_moves()), f"'{t.description}': {m=}"
+
+                maximizer = g.cur_player == Player.P1
+                ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+                score, _ = search_alphabeta(
+                    g, g.board.num_empty_cells(), maximizer, ctx
+                )
+                wanted = 1 if score > 0.5 else -1 if score < -0.5 else 0
+                got = 1 if value > 0 else -1 if value < 0 else 0
+                assert wanted == got, f"'{t.description}': {score=} {value=}"
+
+                g.apply_move(m)
+                child_value, _ = lookup(g)
+                g.undo_move()
+                assert child_value == value, f"'{t.description}': {m=}"
+
+                g.apply_move(rng.choice(list(g.generate_moves())))
+
+            g.reset()
+            g.choose_player1_piece(piece)
+
+    # Only tic-tac-toe is solved
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    try:
+        Oracle(g, Player.P1)
+    except EngineException:
+        pass
+    else:
+        assert False, f"'{t.description}': expected EngineException"
+
+
+def test_bitmaxer():
+    t = TestContext(
+        description="test_bitmaxer",
+    )
+
+    rng = Random(24)
+
+    for size in ((6, 7), (4, 5)):
+        b = Board(size=size, win_count=4, placement_rule=PlacementRule.COLUMN_STACK)
+        g = Game(b)
+        g.choose_player1_piece(Piece.X)
+        s = BitSearch.from_board(b)
+
+        for _ in range(10):
+            while g.state != GameState.FINISHED:
+                current, mask, moves = s.encode(g)
+
+                # Bitboard win detection agrees with the game's
+                for m in list(g.generate_moves()):
+                    _, col = m.cell
+                    got = s.is_winning_move(current, mask, col)
+                    g.apply_move(m)
+                    wanted = g.state == GameState.FINISHED and g.winner() is not None
+                    g.undo_move()
+                    assert got == wanted, f"'{t.description}': {m=}"
+
+                # Near the end of the game, searching to the end agrees with
+                # alpha-beta on who wins
+                empty = b.num_empty_cells()
+                if empty <= 9:
+                    score, col = s.search(current, mask, moves, empty)
+                    maximizer = g.cur_player == Player.P1
+
+                    ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+                    wanted_score, _ = search_alphabeta(g, empty, maximizer, ctx)
+                    if not maximizer:
+                        wanted_score = -wanted_score
+
+                    wanted = (
+                        1 if wanted_score > 0.5 else -1 if wanted_score < -0.5 else 0
+                    )
+                    got = 1 if score > 0 else -1 if score < 0 else 0
+                    assert wanted == got, f"'{t.description}': {score=} {wanted_score=}"
+                    assert s.can_play(mask, col), f"'{t.description}': {col=}"
+
+                g.apply_move(rng.choice(list(g.generate_moves())))
+
+            g.reset()
+            g.choose_player1_piece(Piece.X)
+
+    # Only Connect Four style boards fit
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    try:
+        Bitmaxer(g, Player.P1)
+    except EngineException:
+        pass
+    else:
+        assert False, f"'{t.description}': expected EngineException"
+
+
+def test_engine_resources():
+    t = TestContext(
+        description="test_engine_resources",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+
+    warnings: list[str] = []
+
+    class Handler(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            warnings.append(record.getMessage())
+
+    logger = logging.getLogger("engine.engine")
+    handler = Handler()
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        # Engines which don't search with SEARCH_FN get neither, and say so
+        # when asked for them
+        for cls in (Dummy, Montecarlo, Oracle):
+            eng = cls(g, Player.P1, hash_mb=4.0, workers=2)
+            assert eng.tt is None, f"'{t.description}': {cls=}"
+            assert eng.parallel is None, f"'{t.description}': {cls=}"
+
+            eng = cls(g, Player.P1)
+            assert eng.tt is None, f"'{t.description}': {cls=}"
+
+        assert len(warnings) == 6, f"'{t.description}': {warnings=}"
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    eng = Winibetamaxer(g, Player.P1)
+    assert eng.tt is not None, f"'{t.description}'"
+
+
+def test_solve():
+    t = TestContext(
+        description="test_solve",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    # Tic-tac-toe is a draw, whatever the first move
+    solver = Solver(params)
+    try:
+        solution = solver.solve()
+    finally:
+        solver.close()
+
+    assert solution.result == Result.DRAW, f"'{t.description}': {solution=}"
+    assert len(solution.best_moves) == 9, f"'{t.description}': {solution=}"
+
+    # 3 in a row on a 4x3 board is a win for player 1, from anywhere but the
+    # middle of the short sides. With room for only a few positions in
+    # memory, most of them are spilled to disk along the way, which
+    # shouldn't change the answer.
+    params = GameParameters(
+        size=(3, 4), win_count=3, placement_rule=PlacementRule.ANYWHERE
+    )
+    for memory_mb in (1.0, 0.01):
+        solver = Solver(params, memory_mb=memory_mb)
+        try:
+            solution = solver.solve()
+            spilled = solver.store.spilled
+        finally:
+            solver.close()
+
+        assert solution.result == Result.PLAYER1_VICTORY, f"'{t.description}'"
+        cells = {m.cell for m in solution.best_moves}
+        wanted = {(row, col) for row in range(3) for col in range(4)}
+        wanted -= {(1, 0), (1, 3)}
+        assert cells == wanted, f"'{t.description}': {solution.best_moves=}"
+
+        if memory_mb < 1.0:
+            assert spilled > 0, f"'{t.description}'"
+
+
+def test_move_ordering():
+    t = TestContext(
+        description="test_move_ordering",
+    )
+
+    rng = Random(14)
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+
+    for _ in range(3):
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.X)
+        for _ in range(6):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+
+        max_plies = 5
+        maximizer = g.cur_player == Player.P1
+
+        ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+        wanted, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+        plain_nodes = ctx.stats.nodes
+
+        ctx = SearchContext(
+            eval_fn=eval_end_state, move_gen=generate_moves, ordering=MoveOrdering()
+        )
+        got, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+
+        # Ordering may only change how much we search, not the result
+        assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+        assert ctx.stats.nodes <= plain_nodes, f"'{t.description}'"
+
+    # Killers come first, most recent first, then by history
+    ordering = MoveOrdering()
+    moves = list(g.generate_moves())
+    a, b, c, d = moves[:4]
+
+    ordering.record_cutoff(g, a, 1)
+    ordering.record_cutoff(g, b, 1)
+    ordering.record_cutoff(g, c, 1)
+    ordering.history[d] = 100
+
+    ordering.sort(g, moves)
+    assert moves[:4] == [c, b, d, a], f"'{t.description}': {moves=}"
+
+
+def test_pvs_matches_alphabeta():
+    t = TestContext(
+        description="test_pvs_matches_alphabeta",
+    )
+
+    rng = Random(15)
+
+    for choice, num_moves, max_plies in (
+        (GameChoice.TIC_TAC_TOE, 1, 8),
+        (GameChoice.CONNECT_FOUR, 8, 5),
+    ):
+        params = choice.parameters()
+        assert params is not None
+
+        for _ in range(3):
+            g = Game(Board.from_game_parameters(params))
+            g.choose_player1_piece(Piece.X)
+            for _ in range(num_moves):
+                g.apply_move(rng.choice(list(g.generate_moves())))
+
+            maximizer = g.cur_player == Player.P1
+            pretty = g.board.pretty()
+
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+            wanted, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+
+            for tt in (None, TranspositionTable(1.0)):
+                ctx = SearchContext(
+                    eval_fn=eval_end_state,
+                    move_gen=generate_moves,
+                    tt=tt,
+                    ordering=MoveOrdering(),
+                )
+                got, m = search_pvs(g, max_plies, maximizer, ctx)
+
+                assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+                assert m in list(g.generate_moves()), f"'{t.description}'"
+                assert g.board.pretty() == pretty, f"'{t.description}'"
+
+
+def test_mtdf_matches_winibetamaxer():
+    t = TestContext(
+        description="test_mtdf_matches_winibetamaxer",
+    )
+
+    max_plies = 4
+
+    # Every position along the way in the file-based tests
+    for dirpath, _, filenames in os.walk("tests/data"):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if not valid_file_extension(path):
+                continue
+
+            with open(path) as f:
+                obj = parse(f.read(), path=path)
+
+            b = Board(
+                size=obj.size,
+                win_count=obj.win_count,
+                placement_rule=obj.placement_rule,
+            )
+            g = Game(b)
+            g.choose_player1_piece(obj.player1_piece)
+
+            for move in obj.moves:
+                maximizer = g.cur_player == Player.P1
+
+                ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+                wanted, _ = Winibetamaxer.SEARCH_FN(g, max_plies, maximizer, ctx)
+
+                ctx = SearchContext(
+                    eval_fn=eval_end_state,
+                    move_gen=generate_moves,
+                    tt=TranspositionTable(1.0),
+                    ordering=MoveOrdering(),
+                )
+                got, m = search_mtdf(g, max_plies, maximizer, ctx)
+
+                assert wanted == got, f"'{t.description}': {path} {wanted=} {got=}"
+                assert m in list(g.generate_moves()), f"'{t.description}': {path}"
+
+                g.apply_move(move)
+
+
+def test_window_tally():
+    t = TestContext(
+        description="test_window_tally",
+    )
+
+    rng = Random(17)
+
+    for choice in (GameChoice.TIC_TAC_TOE, GameChoice.CONNECT_FOUR):
+        params = choice.parameters()
+        assert params is not None
+
+        g = Game(Board.from_game_parameters(params))
+        g.choose_player1_piece(Piece.X)
+
+        # Build the tally up front so that it's maintained incrementally
+        tally = g.board.window_tally()
+
+        for i in range(6):
+            g.apply_move(rng.choice(list(g.generate_moves())))
+            if i % 3 == 2:
+                g.undo_move()
+
+            # A fresh scan of a copy of the board must agree with the tally
+            b2 = g.board.copy()
+            b2._tally = None
+            fresh = b2.window_tally()
+
+            assert tally.counts == fresh.counts, f"'{t.description}'"
+            assert tally.open_windows == fresh.open_windows, f"'{t.description}'"
+
+            copied = g.board.copy().window_tally()
+            assert copied is not tally, f"'{t.description}'"
+            assert copied.counts == tally.counts, f"'{t.description}'"
+
+    # X in the center of tic-tac-toe is open in 4 lines, O has none
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    g.apply_move(g.create_move("b2"))
+
+    open_windows = g.board.window_tally().open_windows
+    assert open_windows[Piece.X] == [0, 4, 0, 0], f"'{t.description}'"
+    assert open_windows[Piece.O] == [0, 0, 0, 0], f"'{t.description}'"
+
+    score = eval_windows(g, 0, False)
+    assert 0.0 < score < 1.0, f"'{t.description}': {score=}"
+
+    # O in a corner only spoils some of X's windows
+    g.apply_move(g.create_move("a1"))
+    score = eval_windows(g, 0, True)
+    assert 0.0 < score < 1.0, f"'{t.description}': {score=}"
+
+
+def test_parallel_search():
+    t = TestContext(
+        description="test_parallel_search",
+    )
+
+    rng = Random(18)
+
+    params = GameChoice.CONNECT_FOUR.parameters()
+    assert params is not None
+
+    parallel = ParallelSearch(2, hash_mb=1.0)
+    try:
+        for _ in range(3):
+            g = Game(Board.from_game_parameters(params))
+            g.choose_player1_piece(Piece.X)
+            for _ in range(8):
+                g.apply_move(rng.choice(list(g.generate_moves())))
+
+            max_plies = 4
+            maximizer = g.cur_player == Player.P1
+
+            ctx = SearchContext(eval_fn=eval_windows, move_gen=generate_moves)
+            wanted, wanted_move = search_alphabeta(g, max_plies, maximizer, ctx)
+
+            ctx = SearchContext(eval_fn=eval_windows, move_gen=generate_moves)
+            got, m = parallel.search(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+            assert wanted_move == m, f"'{t.description}': {wanted_move=} {m=}"
+
+        # Workers search with the SearchFn they're given
+        for search_fn in (search_pvs, search_mtdf):
+            other = ParallelSearch(2, search_fn, hash_mb=1.0)
+            try:
+                ctx = SearchContext(eval_fn=eval_windows, move_gen=generate_moves)
+                wanted, _ = search_fn(g, max_plies, maximizer, ctx)
+
+                ctx = SearchContext(eval_fn=eval_windows, move_gen=generate_moves)
+                got, m = other.search(g, max_plies, maximizer, ctx)
+
+                assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+                assert m in list(g.generate_moves()), f"'{t.description}': {m=}"
+            finally:
+                other.shutdown()
+
+        # Workers are reused from one search to the next
+        executor = parallel._executor
+        assert executor is not None, f"'{t.description}'"
+        parallel.search(g, 2, maximizer, ctx)
+        assert parallel._executor is executor, f"'{t.description}'"
+
+        # Workers split the node budget rather than each getting all of it
+        max_nodes = 2000
+        ctx = SearchContext(
+            eval_fn=eval_windows,
+            move_gen=generate_moves,
+            budget=SearchBudget(max_nodes=max_nodes),
+        )
+        iterative_deepening(g, 42, maximizer, ctx, parallel.search)
+        assert ctx.stats.nodes <= max_nodes, f"'{t.description}': {ctx.stats=}"
+    finally:
+        parallel.shutdown()
+
+
+def test_shared_transposition_table():
+    t = TestContext(
+        description="test_shared_transposition_table",
+    )
+
+    tt = SharedTranspositionTable(0.01)
+    try:
+        key = 0xDEADBEEF_CAFEF00D
+        m = Move.of((5, 3), Piece.O)
+        tt.store(key, 7, -0.97, Bound.LOWER, m)
+
+        # Another handle on the same memory sees the entry
+        tt2 = SharedTranspositionTable.attach(tt.name)
+        entry = tt2.probe(key)
+        assert entry is not None, f"'{t.description}'"
+        assert entry.depth == 7, f"'{t.description}': {entry=}"
+        assert entry.score == -0.97, f"'{t.description}': {entry=}"
+        assert entry.bound == Bound.LOWER, f"'{t.description}': {entry=}"
+        assert entry.move is m, f"'{t.description}': {entry=}"
+
+        # A key which maps to the same slot doesn't match
+        assert tt2.probe(key + tt.capacity) is None, f"'{t.description}'"
+
+        # A torn write no longer matches its key
+        offset = 2 + (key % tt.capacity) * 3
+        tt._words[offset + 1] ^= 1
+        assert tt2.probe(key) is None, f"'{t.description}'"
+
+        # Clearing empties every slot but keeps the header
+        tt.store(key, 7, -0.97, Bound.LOWER, m)
+        tt.clear()
+        assert tt2.probe(key) is None, f"'{t.description}'"
+        assert tt2.capacity == tt.capacity, f"'{t.description}'"
+
+        tt2.close()
+    finally:
+        tt.close()
+        tt.unlink()
+
+
+def test_lazy_smp():
+    t = TestContext(
+        description="test_lazy_smp",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    g.apply_move(g.create_move("a1"))
+    g.apply_move(g.create_move("b2"))
+
+    max_plies = g.board.num_empty_cells()
+    maximizer = g.cur_player == Player.P1
+
+    ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+    wanted, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+
+    lazy = LazySMPSearch(2, search_alphabeta, hash_mb=1.0)
+    tt = TranspositionTable(1.0)
+    try:
+        for _ in range(2):
+            ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves, tt=tt)
+            got, m = lazy.search(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+            assert m in list(g.generate_moves()), f"'{t.description}': {m=}"
+            assert ctx.stats.nodes > 0, f"'{t.description}'"
+
+            # The result goes back into the caller's table, which seeds the
+            # next search
+            entry = tt.probe(g.position_key)
+            assert entry is not None and entry.move is m, f"'{t.description}'"
+
+        # Workers split the node budget rather than each getting all of it
+        max_nodes = 500
+        ctx = SearchContext(
+            eval_fn=eval_end_state,
+            move_gen=generate_moves,
+            budget=SearchBudget(max_nodes=max_nodes),
+        )
+        iterative_deepening(g, max_plies, maximizer, ctx, lazy.search)
+        assert ctx.stats.nodes <= max_nodes, f"'{t.description}': {ctx.stats=}"
+    finally:
+        lazy.shutdown()
+
+    # Without a shared table the workers search on their own
+    lazy = LazySMPSearch(2, search_alphabeta, hash_mb=0)
+    try:
+        ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+        got, _ = lazy.search(g, max_plies, maximizer, ctx)
+
+        assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+        assert lazy._tt is None, f"'{t.description}'"
+    finally:
+        lazy.shutdown()
+
+
+def test_threaded_search():
+    t = TestContext(
+        description="test_threaded_search",
+    )
+
+    params = GameChoice.TIC_TAC_TOE.parameters()
+    assert params is not None
+
+    g = Game(Board.from_game_parameters(params))
+    g.choose_player1_piece(Piece.X)
+    g.apply_move(g.create_move("a1"))
+    g.apply_move(g.create_move("b2"))
+
+    max_plies = g.board.num_empty_cells()
+    maximizer = g.cur_player == Player.P1
+
+    ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+    wanted, _ = search_alphabeta(g, max_plies, maximizer, ctx)
+
+    # Threads run whether or not the GIL is enabled, they just don't run at
+    # the same time with it
+    threaded = ThreadedSearch(2, search_alphabeta)
+    tt = TranspositionTable(1.0)
+    ordering = MoveOrdering()
+    try:
+        for _ in range(2):
+            ctx = SearchContext(
+                eval_fn=eval_end_state,
+                move_gen=generate_moves,
+                tt=tt,
+                ordering=ordering,
+            )
+            got, m = threaded.search(g, max_plies, maximizer, ctx)
+
+            assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+            assert m in list(g.generate_moves()), f"'{t.description}': {m=}"
+            assert ctx.stats.nodes > 0, f"'{t.description}'"
+
+        # Workers share the caller's tables rather than keeping their own
+        entry = tt.probe(g.position_key)
+        assert entry is not None, f"'{t.description}': root not in shared tt"
+        assert ordering.history, f"'{t.description}': shared history is empty"
+    finally:
+        threaded.shutdown()
+
+    # With hash_mb=0 and no table in the context, workers search without one
+    threaded = ThreadedSearch(2, search_alphabeta, hash_mb=0)
+    try:
+        ctx = SearchContext(eval_fn=eval_end_state, move_gen=generate_moves)
+        got, _ = threaded.search(g, max_plies, maximizer, ctx)
+
+        assert wanted == got, f"'{t.description}': {wanted=} {got=}"
+        assert threaded._tt is None, f"'{t.description}'"
+    finally:
+        threaded.shutdown()
+
+
 def run_unit_tests():
     test_top_empty_row()
     test_playable_cells_column_stack()
+    test_playable_cells_anywhere()
+    test_bitboard_matches_table()
+    test_check_move_matches_win()
+    test_undo_move()
+    test_hash_key()
+    test_line_table()
+    test_canonical_key()
+    test_move_flyweights()
+    test_alphabeta_matches_minimax()
+    test_search_matches_game_tree()
+    test_transposition_table()
+    test_iterative_deepening()
+    test_game_tree_reroot()
+    test_mcts()
+    test_batch_playouts()
+    test_oracle()
+    test_bitmaxer()
+    test_engine_resources()
+    test_solve()
+    test_move_ordering()
+    test_pvs_matches_alphabeta()
+    test_mtdf_matches_winibetamaxer()
+    test_window_tally()
+    test_parallel_search()
+    test_shared_transposition_table()
+    test_lazy_smp()
+    test_threaded_search()